@@ -0,0 +1,207 @@
+# bench_scoring.py
+"""
+Scoring hot-path benchmark on seeded synthetic catalogs (see `benchmarks.synthetic`).
+
+For each catalog size a shirt CSV is generated once, then timed (best of `--repeat`):
+
+- `load_shirt_data` on the CSV,
+- `score_fit`, per row, over the first `--fit_rows` shirts,
+- `score_fit_records` for each scenario (core, bulk, style),
+- `score_shirts` without and with the style profile,
+- `evaluate_fit` end to end (load, score, write the results CSV).
+
+Results go to a JSON file together with the git commit and library versions, so
+runs from different commits can be compared:
+
+Usage:
+    python -m benchmarks.bench_scoring --rows 1e3,1e4,1e5 --out bench.json
+    python -m benchmarks.bench_scoring --compare before.json after.json
+
+At 1e6+ rows `score_shirts` / `evaluate_fit` hold every result row in memory;
+`--no-rationale` keeps that smaller.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_bodies, write_shirts_csv
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+DEFAULT_ROWS = "1e3,1e4,1e5"
+# Slowdown (new / old - 1) reported as a regression by --compare
+DEFAULT_THRESHOLD = 0.10
+
+
+def _best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def _write_body_csv(path, body):
+    pd.DataFrame({"Measurement": list(body), "Value": list(body.values())}).to_csv(path, index=False)
+    return path
+
+
+def bench_size(rows, workdir, seed=0, missing=0.1, style_profile="relaxed", repeat=3,
+               fit_rows=20_000, rationale=True):
+    """Timings (seconds) for one catalog size; `workdir` holds the generated files."""
+    from evaluate import evaluate_fit, load_models, score_shirts
+    from models.batch import score_fit_records
+    from models.fit_model import bulk_projection_profile, score_fit
+    from utils.data_loader import load_shirt_data
+
+    body = make_bodies(1, seed=seed).drop(columns="BodyId").iloc[0].to_dict()
+    body_path = _write_body_csv(Path(workdir) / "body.csv", body)
+    shirt_path = write_shirts_csv(Path(workdir) / f"shirts_{rows}.csv", rows, seed=seed, missing=missing)
+    out_path = Path(workdir) / "fit_results.csv"
+
+    shirts = load_shirt_data(shirt_path)
+    core_model, style_model = load_models(style_profile)
+    bulk_body = bulk_projection_profile(body, core_model)
+    sample = shirts.head(fit_rows).to_dict(orient="records")
+
+    def score_rows():
+        for shirt in sample:
+            score_fit(body, shirt, core_model)
+
+    result = {"rows": rows, "load_shirt_data_s": _best_of(lambda: load_shirt_data(shirt_path), repeat)}
+    result["score_fit_rows"] = len(sample)
+    result["score_fit_per_row_s"] = _best_of(score_rows, repeat) / max(len(sample), 1)
+    result["score_fit_records_s"] = {
+        "core": _best_of(lambda: score_fit_records(body, shirts, core_model), repeat),
+        "bulk": _best_of(lambda: score_fit_records(bulk_body, shirts, core_model), repeat),
+        "style": _best_of(lambda: score_fit_records(body, shirts, style_model), repeat),
+    }
+    result["score_shirts_s"] = {
+        "core_bulk": _best_of(lambda: score_shirts(body, shirts, rationale=rationale), repeat),
+        "core_bulk_style": _best_of(
+            lambda: score_shirts(body, shirts, style_profile=style_profile, rationale=rationale), repeat
+        ),
+    }
+    result["evaluate_fit_s"] = _best_of(
+        lambda: evaluate_fit(body_path, shirt_path, out_path, style_profile=style_profile, rationale=rationale),
+        repeat,
+    )
+    result["shirts_per_s"] = rows / result["evaluate_fit_s"] if result["evaluate_fit_s"] else None
+    return result
+
+
+def run(sizes, seed=0, missing=0.1, style_profile="relaxed", repeat=3, fit_rows=20_000, rationale=True):
+    """Benchmarks every catalog size; returns the JSON-ready result dict."""
+    meta = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "seed": seed,
+        "missing": missing,
+        "style_profile": style_profile,
+        "repeat": repeat,
+        "rationale": rationale,
+    }
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench_scoring_") as workdir:
+        for rows in sizes:
+            results.append(bench_size(rows, workdir, seed, missing, style_profile, repeat, fit_rows, rationale))
+    return {"meta": meta, "results": results}
+
+
+def _flatten(results):
+    """{(rows, metric): seconds} over every *_s timing, nested scenarios as 'metric.scenario'."""
+    flat = {}
+    for entry in results:
+        for key, value in entry.items():
+            if isinstance(value, dict):
+                for sub, seconds in value.items():
+                    flat[(entry["rows"], f"{key}.{sub}")] = seconds
+            elif key.endswith("_s"):
+                flat[(entry["rows"], key)] = value
+    return flat
+
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD):
+    """
+    Lines comparing two result dicts metric by metric (ratio = new / old), plus the
+    number of metrics that got slower by more than `threshold`.
+    """
+    old_flat, new_flat = _flatten(old["results"]), _flatten(new["results"])
+    lines = [f"{old['meta'].get('commit')} -> {new['meta'].get('commit')}"]
+    regressions = 0
+    for key in sorted(old_flat.keys() & new_flat.keys()):
+        before, after = old_flat[key], new_flat[key]
+        ratio = after / before if before else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        lines.append(f"{key[0]:>10} {key[1]:<35} {before:11.4g} {after:11.4g} {ratio:6.2f}x{flag}")
+    return lines, regressions
+
+
+def _parse_sizes(text):
+    return [int(float(part)) for part in text.split(",") if part.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scoring throughput benchmark on synthetic catalogs.")
+    parser.add_argument("--rows", type=str, default=DEFAULT_ROWS, help="Comma-separated catalog sizes (1e3..1e7)")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+    parser.add_argument("--missing", type=float, default=0.1, help="Share of blank measurements")
+    parser.add_argument("--style_profile", type=str, default="relaxed", help="Profile for the style scenario")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per timing (best is kept)")
+    parser.add_argument("--fit_rows", type=int, default=20_000, help="Rows timed with per-row score_fit")
+    parser.add_argument("--no-rationale", dest="rationale", action="store_false",
+                        help="Time score_shirts / evaluate_fit without rationale text")
+    parser.add_argument("--out", type=str, default=None, help="Write the JSON results here (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files and exit")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown reported as a regression by --compare (0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        old, new = (json.loads(Path(p).read_text()) for p in args.compare)
+        lines, regressions = compare(old, new, args.threshold)
+        print("\n".join(lines))
+        return 1 if regressions else 0
+
+    # Scorers warn once per missing measurement; at 1e5+ rows that floods stderr
+    logging.disable(logging.WARNING)
+    result = run(_parse_sizes(args.rows), args.seed, args.missing, args.style_profile,
+                 args.repeat, args.fit_rows, args.rationale)
+    text = json.dumps(result, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+# bench_startup.py
+"""
+Startup benchmark: import time of `models.fit_model`, cost of the first
+`score_fit` call (which loads the config) and steady-state per-call overhead.
+
+Each import measurement runs in a fresh interpreter so nothing is cached.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat 5] [--calls 20000]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+BODY = {"ChestWidth": 18.5, "ShoulderWidth": 17.0, "TorsoLength": 27.0,
+        "HemWidth": 18.0, "SleeveLength": 8.0}
+SHIRT = {"ShirtName": "bench", "ChestWidth": 21.0, "ShoulderWidth": 18.5,
+         "BodyLength": 28.0, "HemWidth": 20.5, "SleeveLength": 8.5, "Weight": 6.0}
+
+# Run in a fresh interpreter; prints import and first-call times in seconds.
+_STARTUP_SCRIPT = f"""
+import json, time
+t0 = time.perf_counter()
+import models.fit_model as fm
+t1 = time.perf_counter()
+fm.score_fit({BODY!r}, {SHIRT!r})
+t2 = time.perf_counter()
+print(json.dumps({{"import_s": t1 - t0, "first_call_s": t2 - t1}}))
+"""
+
+
+def measure_startup(repeat, cwd):
+    """Import/first-call timings over `repeat` fresh interpreters started in `cwd`."""
+    env = dict(os.environ, PYTHONPATH=str(ROOT_DIR))
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _STARTUP_SCRIPT],
+            cwd=cwd, env=env, capture_output=True, text=True, check=True,
+        )
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        key: statistics.median(run[key] for run in runs)
+        for key in ("import_s", "first_call_s")
+    }
+
+
+def measure_calls(calls):
+    """Per-call time (seconds) of score_fit and of a scalar scorer on default params."""
+    import timeit
+    from models.fit_model import score_fit
+    from models.scorers import score_chest
+
+    score_fit(BODY, SHIRT)  # load the default model outside the timing
+    fit = min(timeit.repeat(lambda: score_fit(BODY, SHIRT), number=calls, repeat=3)) / calls
+    scorer = min(timeit.repeat(lambda: score_chest(18.5, 21.0), number=calls, repeat=3)) / calls
+    return {"score_fit_call_s": fit, "scorer_call_s": scorer}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Startup and per-call overhead benchmark.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per import measurement")
+    parser.add_argument("--calls", type=int, default=20000, help="Calls per per-call timing")
+    args = parser.parse_args(argv)
+
+    result = {"repo_root": measure_startup(args.repeat, ROOT_DIR)}
+    # Importing from elsewhere must work too (the config is found relative to the package)
+    result["other_cwd"] = measure_startup(args.repeat, ROOT_DIR.parent)
+    result.update(measure_calls(args.calls))
+    print(json.dumps(result, indent=2))
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# synthetic.py
+"""
+Seeded synthetic body and shirt tables for benchmarks.
+
+Shirts are generated the way real catalogs look: a set of base garments (cut,
+brand, fabric weight), each graded across sizes XS-XXL and repeated in a few
+colorways, so measurements repeat and stay correlated (chest, shoulder, length
+and sleeve grow together). Bodies draw one latent size per person and derive
+correlated half-chest, shoulder, torso, hem and sleeve values from it.
+
+Every measurement is blanked independently with probability `missing`. The same
+(`n`, `seed`, `missing`) always gives the same table, and `write_shirts_csv`
+writes large tables chunk by chunk so 1e7 rows never sit in memory at once.
+"""
+
+import numpy as np
+import pandas as pd
+
+SIZES = ("XS", "S", "M", "L", "XL", "XXL")
+COLORS = ("black", "white", "heather grey", "navy", "olive", "maroon")
+BRANDS = ("Bella & Canvas", "Gildan", "Comfort Colors", "Uniqlo", "Vintage / Unknown")
+
+# Size-M center and per-size grade (inches) of each shirt measurement
+_SHIRT_BASE = {
+    "ChestWidth": (20.5, 1.0),
+    "ShoulderWidth": (18.0, 0.6),
+    "BodyLength": (28.5, 0.75),
+    "SleeveLength": (8.25, 0.25),
+    "SleeveOpening": (6.75, 0.25),
+    "NeckOpening": (7.0, 0.125),
+    "HemWidth": (20.5, 1.0),
+}
+# Per-garment cut offset (boxy/cropped/slim cuts) and per-row tolerance (inches)
+_CUT_SPREAD = {"ChestWidth": 1.5, "ShoulderWidth": 1.25, "BodyLength": 2.0, "SleeveLength": 0.75,
+               "SleeveOpening": 0.5, "NeckOpening": 0.25, "HemWidth": 1.5}
+_TOLERANCE = 0.125
+
+# Mean at latent size 0 and change per unit of latent size for body measurements
+_BODY_BASE = {
+    "ChestWidth": (19.0, 1.4),
+    "ShoulderWidth": (17.5, 0.7),
+    "TorsoLength": (27.5, 0.9),
+    "HemWidth": (18.5, 1.5),
+    "SleeveLength": (8.0, 0.3),
+}
+
+SHIRT_COLUMNS = ["ShirtName", "Brand", "Primary Color", "Tag Size", "WeightOz", *_SHIRT_BASE]
+BODY_COLUMNS = ["BodyId", *_BODY_BASE]
+
+
+# Random draws come in fixed blocks seeded by block number, so any slice of the
+# table is generated identically however the rows are chunked
+_ROW_BLOCK = 1 << 16
+_GARMENT_BLOCK = 1 << 12
+
+
+def _blank(rng, values, missing):
+    if missing > 0:
+        values[rng.random(len(values)) < missing] = np.nan
+    return values
+
+
+def _block_draws(first, stop, block, draw):
+    """Concatenates `draw(b)` (arrays of `block` items) over the blocks covering [first, stop)."""
+    b0, b1 = first // block, max(stop - 1, first) // block
+    parts = [draw(b) for b in range(b0, b1 + 1)]
+    lo, hi = first - b0 * block, stop - b0 * block
+    return {key: np.concatenate([p[key] for p in parts], axis=-1)[..., lo:hi] for key in parts[0]}
+
+
+def make_shirts(n, seed=0, missing=0.1, colorways=3, start=0):
+    """
+    `n` catalog rows: base garments x sizes x `colorways`, in catalog order.
+    `start` offsets row numbering, so chunks generated with consecutive `start`
+    values concatenate to the same table as one call.
+    """
+    if not 1 <= colorways <= len(COLORS):
+        raise ValueError(f"colorways must be between 1 and {len(COLORS)}, got {colorways}")
+    per_garment = len(SIZES) * colorways
+    rows = np.arange(start, start + n)
+    garment, within = np.divmod(rows, per_garment)
+    size = within // colorways - SIZES.index("M")
+    color = within % colorways
+    cut_cols = list(_CUT_SPREAD)
+
+    def garment_draw(b):
+        rng = np.random.default_rng([seed, 0, b])
+        return {
+            "weight": np.round(rng.uniform(3.2, 7.5, _GARMENT_BLOCK), 2),
+            "brand": rng.integers(len(BRANDS), size=_GARMENT_BLOCK),
+            "cut": rng.normal(0.0, 1.0, (len(cut_cols), _GARMENT_BLOCK))
+            * np.array([_CUT_SPREAD[c] for c in cut_cols])[:, None],
+        }
+
+    def row_draw(b):
+        rng = np.random.default_rng([seed, 1, b])
+        return {
+            "noise": rng.normal(0.0, _TOLERANCE, (len(_SHIRT_BASE), _ROW_BLOCK)),
+            "blank": rng.random((len(_SHIRT_BASE) + 1, _ROW_BLOCK)),
+        }
+
+    g_first = int(garment[0]) if n else 0
+    g_stop = int(garment[-1]) + 1 if n else 0
+    garments = _block_draws(g_first, g_stop, _GARMENT_BLOCK, garment_draw)
+    row = _block_draws(start, start + n, _ROW_BLOCK, row_draw)
+    g = garment - g_first
+    blank = row["blank"] < missing
+
+    weight = garments["weight"][g]
+    weight[blank[0]] = np.nan
+    df = pd.DataFrame({
+        "ShirtName": [f"Tee {gi} {SIZES[s]} {COLORS[c]}" for gi, s, c in
+                      zip(garment.tolist(), (size + SIZES.index("M")).tolist(), color.tolist())],
+        "Brand": np.asarray(BRANDS)[garments["brand"][g]],
+        "Primary Color": np.asarray(COLORS)[color],
+        "Tag Size": np.asarray(SIZES)[size + SIZES.index("M")],
+        "WeightOz": weight,
+    })
+    for i, (col, (center, grade)) in enumerate(_SHIRT_BASE.items()):
+        offset = garments["cut"][cut_cols.index(col)][g]
+        # Quarter-inch measurements, as tape readings are recorded
+        values = np.round((center + grade * size + offset + row["noise"][i]) * 4) / 4
+        values[blank[i + 1]] = np.nan
+        df[col] = values
+    return df
+
+
+def make_bodies(n, seed=0, missing=0.0):
+    """`n` body profiles with a 'BodyId' column and correlated measurements."""
+    rng = np.random.default_rng([seed, 2])
+    latent = rng.normal(0.0, 1.0, n)
+    df = pd.DataFrame({"BodyId": np.arange(n)})
+    for col, (mean, per_size) in _BODY_BASE.items():
+        values = np.round((mean + per_size * latent + rng.normal(0, 0.3, n)) * 4) / 4
+        df[col] = _blank(rng, values, missing)
+    return df
+
+
+def write_shirts_csv(path, n, seed=0, missing=0.1, chunksize=500_000):
+    """Writes `make_shirts(n, seed, missing)` to `path` in chunks; returns `path`."""
+    with open(path, "w", newline="") as f:
+        for start in range(0, max(n, 1), chunksize):
+            chunk = make_shirts(min(chunksize, n - start), seed, missing, start=start)
+            chunk.to_csv(f, index=False, header=start == 0)
+    return path
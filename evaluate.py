@@ -5,160 +5,727 @@ with optional style profile overlay.
 """
 
 import os
+import heapq
+from collections import Counter
+from dataclasses import replace
+import hashlib
 import logging
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 from tabulate import tabulate
-from utils.data_loader import load_body_measurements, load_shirt_data
-from models.fit_model import score_fit, bulk_projection_profile
-from utils.config_loader import load_model_config
+from utils.data_loader import load_body_measurements, load_shirt_data, load_body_table, iter_shirt_chunks
+from models.fit_model import score_fit
+from models.batch import SharedPass, top_k_fits, merge_top_k
+from models.catalog_index import CatalogIndex
+from models.compiled import compile_model
+from models.memo import ScoreMemo
+from models.projections import column_label, load_projections, model_projection, score_projections
+from models.sizing import best_sizes, load_size_chart
+from models.uncertainty import load_noise, score_uncertainty
+from utils.config_loader import load_model_config, compile_profiles, list_style_profiles, load_size_grading
+from utils.result_writer import ResultWriter, read_results, write_results
+from utils.profiling import PROFILE_ENV_VAR, PipelineProfiler, stage
+from utils.fingerprint import digest, load_run_state, model_fingerprint, row_fingerprints, save_run_state
+from utils.result_cache import DEFAULT_MAX_ENTRIES, ResultCache, fingerprint_items
 from pathlib import Path
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
 )
+logger = logging.getLogger(__name__)
 
+# Catalog rows read per chunk in streaming mode (--chunksize)
+DEFAULT_CHUNKSIZE = 50_000
 
-def score_shirts(body, shirts, style_profile=None):
+
+def score_shirts_rowwise(body, shirts, model=None, memo=None, missing=None):
+    """
+    Reference per-row path: one `score_fit` call per shirt.
+    With `memo` (a ScoreMemo), repeated measurement values reuse cached aspect scores;
+    `missing` (a Counter) counts the aspects skipped for missing inputs.
+    Returns a DataFrame shaped like `score_fit_batch` output.
+    """
+    records = [score_fit(body, row.to_dict(), model, memo, missing=missing) for _, row in shirts.iterrows()]
+    return pd.DataFrame(records, index=shirts.index, columns=["FitScore", "Confidence", "Tags", "Rationale"])
+
+
+# Determine project‐root so config_loader knows where to find “config/model_config.yaml” etc.
+ROOT_DIR = Path(__file__).resolve().parent
+
+
+# (style_profile, config_dir) -> (frozen config it was compiled from, model)
+_MODEL_CACHE = {}
+
+
+def _compiled(style_profile, config_dir):
+    config = load_model_config(style_profile=style_profile, config_dir=config_dir, frozen=True)
+    key = (style_profile, str(config_dir))
+    cached = _MODEL_CACHE.get(key)
+    # The config loader hands back the same frozen object until a file changes
+    if cached is None or cached[0] is not config:
+        cached = (config, compile_model(config, name=style_profile or "core"))
+        _MODEL_CACHE[key] = cached
+    return cached[1]
+
+
+def load_models(style_profile=None, config_dir=ROOT_DIR):
+    """
+    Compiles the base config (for “core”) and the style config if requested.
+    Returns (core_model, style_model or None); compiled models are reused until
+    the underlying YAML changes.
+    """
+    core_model = _compiled(None, config_dir)
+    style_model = _compiled(style_profile, config_dir) if style_profile else None
+    return core_model, style_model
+
+
+def style_profile_names(style_profile, config_dir=ROOT_DIR):
+    """
+    Normalizes a style profile selection to a list of names: None, one name, a
+    comma-separated string or list of names, or "all" (every profile in config).
+    """
+    if not style_profile:
+        return []
+    if isinstance(style_profile, str):
+        if style_profile == "all":
+            return list_style_profiles(config_dir)
+        return [name.strip() for name in style_profile.split(",") if name.strip()]
+    return list(style_profile)
+
+
+def load_style_models(style_profile, config_dir=ROOT_DIR):
+    """Compiled model for every profile in the selection (see `style_profile_names`)."""
+    return [_compiled(name, config_dir) for name in style_profile_names(style_profile, config_dir)]
+
+
+def _primary_score_col(style_models):
+    # One profile ranks by its own score; several are compared against core
+    return "StyleFitScore" if len(style_models) == 1 else "CoreFitScore"
+
+
+def score_shirts(body, shirts, style_profile=None, vectorized=True, workers=1,
+                 rationale=True, top_k=None, projections=None, cache=None):
     """
     Scores each shirt for both core, bulk, and optional style profiles.
     Returns a list of dicts, one per shirt.
+
+    `style_profile` is one profile name (Style* columns plus StyleProfile), or
+    several as a list / comma-separated string / "all": then every profile gets
+    `Style{Label}FitScore`, `Style{Label}Confidence`, ... columns (e.g.
+    StyleVintage90sFitScore), all scored in one `SharedPass` with the core model.
+
+    `projections` (Projection list, see `models.projections`) adds one scenario per
+    projection as `{Label}FitScore`, `{Label}Confidence`, ... columns; a projection
+    labelled "Bulk" replaces the default Bulk scenario from `projection_config`.
+
+    With `vectorized=True` (default) each scenario is one batch scoring call over
+    the whole DataFrame; `vectorized=False` falls back to per-row `score_fit`.
+    `workers > 1` shards the catalog across a process pool (same output, same order).
+    `rationale=False` leaves out the *Rationale columns and skips rendering them.
+    With `top_k`, only the best `top_k` shirts (by the single style profile's score,
+    else core score) are rendered and returned, best first; ties keep catalog order.
+
+    With `cache` (a `utils.result_cache.ResultCache`), rendered rows are looked up
+    by (configs + options + body, shirt measurements) first; only missing shirts are
+    scored (each distinct measurement row once) and then stored.
     """
-    # Determine project‐root so config_loader knows where to find “config/model_config.yaml” etc.
-    root_dir = Path(__file__).resolve().parent
-    # Preload base config (for “core”) and style config if requested
-    core_config = load_model_config(config_dir=root_dir)
-    if style_profile:
-        style_config = load_model_config(style_profile=style_profile, config_dir=root_dir)
-    else:
-        style_config = None
+    if cache is not None:
+        return _score_shirts_cached(
+            body, shirts, style_profile, vectorized, workers, rationale, top_k, projections, cache
+        )
+    if workers > 1 and len(shirts) > 1:
+        return _score_shirts_parallel(
+            body, shirts, style_profile, vectorized, workers, rationale, top_k, projections
+        )
+    core_model, _ = load_models()
+    return _score_shirts_with_models(
+        body, shirts, core_model, load_style_models(style_profile), vectorized, rationale, top_k,
+        projections=projections,
+    )
 
-    bulk_profile = bulk_projection_profile(body)
-    results = []
 
-    for idx, row in shirts.iterrows():
-        shirt = row.to_dict()
-
-        # Core fit
-        core_result = score_fit(body, shirt)
-        # Bulk fit
-        bulk_result = score_fit(bulk_profile, shirt)
-
-        row_data = {
-            "ShirtName": shirt.get("ShirtName", f"Shirt_{idx}"),
-            "CoreFitScore": core_result["FitScore"],
-            "CoreConfidence": core_result["Confidence"],
-            "CoreTags": "; ".join(core_result.get("Tags", [])),
-            "CoreRationale": core_result.get("Rationale", ""),
-            "BulkFitScore": bulk_result["FitScore"],
-            "BulkConfidence": int(round(bulk_result["Confidence"] * 0.85)),
-            "BulkTags": "; ".join(bulk_result.get("Tags", [])),
-            "BulkRationale": bulk_result.get("Rationale", ""),
-            # Legacy keys for existing tests:
-            "FitScore": core_result["FitScore"],
-            "Confidence": core_result["Confidence"],
-        }
-
-        if style_config:
-            # --- BEGIN style-overlay injection ---
-            import models.fit_model as fit_model_mod
-            import models.scorers as scorers_mod
-
-            # 1) Inject style_config into fit_model.py globals
-            fit_model_mod.MODEL_CONFIG = style_config
-            fit_model_mod.ASPECTS = list(style_config["aspects"].keys())
-            fit_model_mod.SCORING_PARAMS = style_config["scoring_params"]
-            fit_model_mod.INTERACTION_ADJUSTMENTS = style_config["interaction_adjustments"]
-            fit_model_mod.PROJECTION_CONFIG = style_config.get("projection_config", {})
-            fit_model_mod.WEIGHTS = {
-                k: v["weight"] for k, v in style_config["aspects"].items()
-            }
-            fit_model_mod.ASPECT_SCORERS = {
-                aspect: {
-                    "scorer": aspect_cfg["scorer"],
-                    "body_field": aspect_cfg["body_field"],
-                    "shirt_field": aspect_cfg["shirt_field"],
-                    "weight": aspect_cfg["weight"],
-                    "params": style_config["scoring_params"].get(aspect, {}),
-                }
-                for aspect, aspect_cfg in style_config["aspects"].items()
-            }
-            fit_model_mod.ASPECTS_NEED_CHEST = {
-                aspect
-                for aspect, cfg in style_config["aspects"].items()
-                if cfg.get("needs_chest", False)
-            }
-
-            # 2) Also inject style_config into scorers.py globals
-            scorers_mod.config = style_config
-            scorers_mod.scoring_params = style_config["scoring_params"]
-            scorers_mod.adjustments = style_config["interaction_adjustments"]
-
-            # 3) Now call score_fit(...) (it will use the *new* style_config everywhere)
-            style_result = score_fit(body, shirt)
-            row_data.update({
-                "StyleFitScore": style_result.get("FitScore"),
-                "StyleConfidence": style_result.get("Confidence"),
-                "StyleTags": "; ".join(style_result.get("Tags", [])),
-                "StyleRationale": style_result.get("Rationale", ""),
-                "StyleProfile": style_profile,
-            })
-
-            # 4) Reset fit_model.py globals back to core_config
-            fit_model_mod.MODEL_CONFIG = core_config
-            fit_model_mod.ASPECTS = list(core_config["aspects"].keys())
-            fit_model_mod.SCORING_PARAMS = core_config["scoring_params"]
-            fit_model_mod.INTERACTION_ADJUSTMENTS = core_config["interaction_adjustments"]
-            fit_model_mod.PROJECTION_CONFIG = core_config.get("projection_config", {})
-            fit_model_mod.WEIGHTS = {
-                k: v["weight"] for k, v in core_config["aspects"].items()
-            }
-            fit_model_mod.ASPECT_SCORERS = {
-                aspect: {
-                    "scorer": aspect_cfg["scorer"],
-                    "body_field": aspect_cfg["body_field"],
-                    "shirt_field": aspect_cfg["shirt_field"],
-                    "weight": aspect_cfg["weight"],
-                    "params": core_config["scoring_params"].get(aspect, {}),
-                }
-                for aspect, aspect_cfg in core_config["aspects"].items()
-            }
-            fit_model_mod.ASPECTS_NEED_CHEST = {
-                aspect
-                for aspect, cfg in core_config["aspects"].items()
-                if cfg.get("needs_chest", False)
-            }
-
-            # 5) Reset scorers.py globals back to core_config as well
-            scorers_mod.config = core_config
-            scorers_mod.scoring_params = core_config["scoring_params"]
-            scorers_mod.adjustments = core_config["interaction_adjustments"]
-            # --- END style-overlay injection ---
+def _score_shirts_cached(body, shirts, style_profile, vectorized, workers, rationale, top_k, projections,
+                         cache):
+    core_model, _ = load_models()
+    style_models = load_style_models(style_profile)
+    scope = cache.scope(
+        model_fingerprint(core_model), [model_fingerprint(m) for m in style_models],
+        projections or [], body, rationale,
+    )
+    # Names are not scored, so colorways with equal measurements share one entry
+    items = fingerprint_items(row_fingerprints(shirts, sorted(_catalog_columns(core_model, style_models))))
+    found = cache.get_many(scope, items)
+    first = {}
+    for position, item in enumerate(items):
+        if item not in found:
+            first.setdefault(item, position)
+    if first:
+        logger.info(f"Result cache: scoring {len(first)} of {len(shirts)} shirts")
+        fresh = score_shirts(
+            body, shirts.iloc[list(first.values())], style_profile, vectorized, workers, rationale,
+            projections=projections,
+        )
+        entries = {item: {k: v for k, v in row.items() if k != "ShirtName"} for item, row in zip(first, fresh)}
+        cache.put_many(scope, entries)
+        found.update(entries)
+    names = _shirt_names(shirts, np.arange(len(shirts)))
+    results = [{"ShirtName": name, **found[item]} for name, item in zip(names, items)]
+    if top_k is not None:
+        results = _top_rows(results, style_profile, top_k)
+    return results
+
 
+def _style_labels(style_models):
+    """{column label: model}: "Style" for a single profile, "Style{Label}" for several."""
+    if len(style_models) == 1:
+        return {"Style": style_models[0]}
+    return {f"Style{column_label(model.name)}": model for model in style_models}
+
+
+def _log_missing(missing, n_shirts):
+    """One summary line instead of a warning per shirt and aspect."""
+    counts = ", ".join(f"{aspect} {count}" for aspect, count in missing.items() if count)
+    if counts:
+        logger.info(f"Missing data (shirts of {n_shirts} per aspect, scored as 50): {counts}")
+
+
+def _projection_scenarios(core_model, projections, taken=()):
+    """{column label: Projection}: Bulk from `projection_config` first, then `projections`."""
+    scenarios = {"Bulk": model_projection(core_model)}
+    for projection in projections or ():
+        if projection.label in ("Core", "Style") or projection.label in taken:
+            raise ValueError(f"Projection '{projection.name}' would overwrite the {projection.label} columns")
+        scenarios[projection.label] = projection
+    return scenarios
+
+
+def _score_projection_rowwise(body, shirts, projection, model, memo=None):
+    frame = score_shirts_rowwise(projection.project_body(body), projection.project_shirts(shirts), model, memo)
+    frame["Confidence"] = [int(round(c * projection.confidence_mod)) for c in frame["Confidence"]]
+    return frame
+
+
+def _score_shirts_with_models(body, shirts, core_model, style_models=(), vectorized=True,
+                              rationale=True, top_k=None, profiler=None, projections=None):
+    if not isinstance(style_models, (list, tuple)):
+        style_models = [style_models] if style_models else []
+    styles = _style_labels(style_models)
+    style_profile = style_models[0].name if len(style_models) == 1 else None
+    scenarios = _projection_scenarios(core_model, projections, styles)
+
+    # Numbers first; tag/rationale strings only for the rows that are returned
+    scored = {}
+    # Catalogs repeat measurements across colorways/sizes; score each value pair once
+    memo = None if vectorized else ScoreMemo()
+    # Core and every style profile share shirt columns and identical aspects
+    shared = SharedPass(body, shirts) if vectorized else None
+    with stage(profiler, "score.core", len(shirts)):
+        if vectorized:
+            scored["Core"] = shared.records(core_model)
+            missing = scored["Core"].missing_counts()
+        else:
+            missing = Counter(dict.fromkeys(core_model.aspect_names, 0))
+            scored["Core"] = score_shirts_rowwise(body, shirts, core_model, memo, missing)
+    _log_missing(missing, len(shirts))
+    if styles:
+        with stage(profiler, "score.style", len(shirts) * len(styles)):
+            for label, model in styles.items():
+                if vectorized:
+                    scored[label] = shared.records(model)
+                else:
+                    scored[label] = score_shirts_rowwise(body, shirts, model, memo)
+
+    # Every projection (Bulk included) in one stacked pass
+    with stage(profiler, "score.projections", len(shirts) * len(scenarios)):
+        if vectorized:
+            by_name = score_projections(body, shirts, list(scenarios.values()), core_model)
+            for label, projection in scenarios.items():
+                scored[label] = by_name[projection.name]
+        else:
+            for label, projection in scenarios.items():
+                scored[label] = _score_projection_rowwise(body, shirts, projection, core_model, memo)
+
+    positions = np.arange(len(shirts))
+    if top_k is not None:
+        primary = scored["Style" if "Style" in scored else "Core"]
+        ranking = primary.ranking() if vectorized else _score_sort_key(primary["FitScore"]).to_numpy()
+        positions = np.argsort(-ranking, kind="stable")[:top_k]
+
+    with stage(profiler, "render", len(positions)):
+        return _result_rows(shirts, scored, positions, vectorized, rationale, style_profile)
+
+
+def _shirt_names(shirts, positions):
+    if "ShirtName" in shirts.columns:
+        all_names = shirts["ShirtName"].tolist()
+        return [all_names[p] for p in positions.tolist()]
+    return [f"Shirt_{idx}" for idx in shirts.index[positions]]
+
+
+def _scenario_columns(label, cols, i, rationale):
+    row = {
+        f"{label}FitScore": cols["FitScore"][i],
+        f"{label}Confidence": cols["Confidence"][i],
+        f"{label}Tags": "; ".join(cols["Tags"][i]),
+    }
+    if rationale:
+        row[f"{label}Rationale"] = cols["Rationale"][i]
+    return row
+
+
+def _result_rows(shirts, scored, positions, vectorized, rationale, style_profile):
+    cols = {}
+    for key, result in scored.items():
+        frame = result.to_frame(positions, rationale) if vectorized else result.iloc[positions]
+        cols[key] = {col: frame[col].tolist() for col in frame.columns}
+    core_cols, style_cols = cols["Core"], cols.get("Style")
+    extra = [key for key in cols if key not in ("Core", "Bulk", "Style")]
+
+    names = _shirt_names(shirts, positions)
+    results = []
+    for i in range(len(positions)):
+        row_data = {"ShirtName": names[i]}
+        row_data.update(_scenario_columns("Core", core_cols, i, rationale))
+        # Bulk confidence is already scaled by projection_config.confidence_mod
+        row_data.update(_scenario_columns("Bulk", cols["Bulk"], i, rationale))
+        row_data.update({
+            # Legacy keys for existing tests:
+            "FitScore": core_cols["FitScore"][i],
+            "Confidence": core_cols["Confidence"][i],
+        })
+        if style_cols is not None:
+            row_data.update(_scenario_columns("Style", style_cols, i, rationale))
+            row_data["StyleProfile"] = style_profile
+        for label in extra:
+            row_data.update(_scenario_columns(label, cols[label], i, rationale))
         results.append(row_data)
 
     return results
 
 
-def evaluate_fit(body_path, shirt_path, out_path, style_profile=None):
-    body = load_body_measurements(body_path)
-    shirts = load_shirt_data(shirt_path)
-    results = score_shirts(body, shirts, style_profile=style_profile)
+# --- Process-pool evaluation ---
+# Each worker compiles its models once in the initializer; shards are contiguous
+# slices handed out in order, so concatenating results reproduces the serial output.
+_WORKER_MODELS = {}
+
+
+def _init_worker(style_profile, config_dir):
+    core_model, _ = load_models(config_dir=config_dir)
+    _WORKER_MODELS["core"] = core_model
+    _WORKER_MODELS["styles"] = load_style_models(style_profile, config_dir)
+
+
+def _score_shirt_shard(args):
+    body, shard, vectorized, rationale, top_k, projections = args
+    return _score_shirts_with_models(
+        body, shard, _WORKER_MODELS["core"], _WORKER_MODELS["styles"], vectorized, rationale, top_k,
+        projections=projections,
+    )
+
+
+def _top_k_body_shard(args):
+    bodies, shirts, k, rationale = args
+    styles = _WORKER_MODELS["styles"]
+    model = styles[0] if styles else _WORKER_MODELS["core"]
+    return top_k_fits(bodies, shirts, k=k, model=model, rationale=rationale)
+
 
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    df = pd.DataFrame(results)
+def _shard_bounds(n, workers):
+    """Contiguous [start, stop) slices; a few per worker to even out stragglers."""
+    parts = min(n, workers * 4)
+    edges = np.linspace(0, n, parts + 1).astype(int)
+    return [(a, b) for a, b in zip(edges[:-1], edges[1:]) if b > a]
 
-    # Sort by the chosen score
-    if style_profile:
-        df = df.sort_values(by="StyleFitScore", ascending=False)
+
+def _make_pool(workers, style_profile):
+    return ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(style_profile, ROOT_DIR)
+    )
+
+
+def _score_shirts_parallel(body, shirts, style_profile, vectorized, workers, rationale=True, top_k=None,
+                           projections=None):
+    shards = [
+        (body, shirts.iloc[a:b], vectorized, rationale, top_k, projections)
+        for a, b in _shard_bounds(len(shirts), workers)
+    ]
+    results = []
+    with _make_pool(workers, style_profile) as pool:
+        for shard_results in pool.map(_score_shirt_shard, shards):
+            results.extend(shard_results)
+    if top_k is not None:
+        # Each shard sent its own best top_k; pick the overall best
+        results = _top_rows(results, style_profile, top_k)
+    return results
+
+
+def _top_rows(results, style_profile, top_k):
+    """The best `top_k` result rows by the primary score, best first; ties keep their order."""
+    score_col = _primary_score_col(style_profile_names(style_profile))
+    order = np.argsort(-_score_sort_key(pd.Series([r[score_col] for r in results])).to_numpy(),
+                       kind="stable")
+    return [results[i] for i in order[:top_k]]
+
+
+def _top_k_parallel(bodies, shirts, k, style_profile, workers, rationale=True):
+    shards = [(bodies.iloc[a:b], shirts, k, rationale) for a, b in _shard_bounds(len(bodies), workers)]
+    with _make_pool(workers, style_profile) as pool:
+        frames = list(pool.map(_top_k_body_shard, shards))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _score_sort_key(scores):
+    # Shirts without a score ("") sort below every scored shirt
+    return pd.to_numeric(scores, errors="coerce").fillna(-1)
+
+
+def evaluate_fit(body_path, shirt_path, out_path, style_profile=None, workers=1, top_k=None,
+                 rationale=True, profiler=None, projections=None, incremental=False, cache=None):
+    """
+    Scores every shirt for one body, sorts by the core (or style) score and writes
+    `out_path`. With a `PipelineProfiler`, each stage and, in-process, every aspect
+    scorer is timed. `projections` adds scenario columns (see `score_shirts`).
+
+    With `incremental=True`, a fingerprint of every shirt row's scored fields and
+    a hash of the configs, body and options are saved next to `out_path`. The next
+    incremental run rescores only new or changed rows (everything when the hash
+    changed) and merges them with the previous results; the output is the same as
+    a full run. Not available with `top_k`.
+
+    With `cache` (a `ResultCache`), shirts already scored for this body and config,
+    by this or any earlier run, are served from the cache (see `score_shirts`).
+    """
+    if incremental and top_k is not None:
+        raise ValueError("Incremental runs keep the full results table; top_k is not supported")
+    with stage(profiler, "load_config"):
+        core_model, _ = load_models()
+        style_models = load_style_models(style_profile)
+    with stage(profiler, "load_body") as record:
+        body = load_body_measurements(body_path)
+        record["rows"] = 1
+    with stage(profiler, "load_shirts") as record:
+        # Only the columns the models read are parsed
+        shirts = load_shirt_data(shirt_path, columns=_catalog_columns(core_model, style_models))
+        record["rows"] = len(shirts)
+
+    prior = None
+    if incremental:
+        with stage(profiler, "fingerprint", len(shirts)):
+            run_hash = digest(
+                model_fingerprint(core_model), [model_fingerprint(m) for m in style_models],
+                projections or [], body, rationale,
+            )
+            fingerprints = _shirt_fingerprints(shirts, core_model, style_models)
+            prior = _load_prior_results(out_path, run_hash)
+    if prior is not None:
+        lookup = dict(zip(prior[1].tolist(), range(len(prior[1]))))
+        reuse = np.array([lookup.get(fp, -1) for fp in fingerprints.tolist()], dtype=np.int64)
+        stale = np.flatnonzero(reuse < 0)
+        logger.info(f"Incremental run: rescoring {len(stale)} of {len(shirts)} shirts")
+        to_score = shirts.iloc[stale]
+    else:
+        to_score = shirts
+
+    # With top_k only the winners get tags/rationales rendered
+    with stage(profiler, "score", len(to_score)):
+        if len(to_score) == 0 and prior is not None:
+            results = []
+        elif profiler is not None and cache is None and not (workers > 1 and len(to_score) > 1):
+            core_model = profiler.instrument(core_model)
+            style_models = [profiler.instrument(model) for model in style_models]
+            results = _score_shirts_with_models(
+                body, to_score, core_model, style_models, rationale=rationale, top_k=top_k, profiler=profiler,
+                projections=projections,
+            )
+        else:
+            results = score_shirts(
+                body, to_score, style_profile=style_profile, workers=workers, rationale=rationale, top_k=top_k,
+                projections=projections, cache=cache,
+            )
+
+    with stage(profiler, "sort", len(shirts)):
+        df = pd.DataFrame(results)
+        if prior is not None:
+            df = _merge_prior_results(prior[0], reuse, df, stale)
+        # Sort by the chosen score (stable: ties keep catalog order)
+        score_col = _primary_score_col(style_models)
+        if not df.empty:
+            df = df.sort_values(by=score_col, ascending=False, kind="stable", key=_score_sort_key)
+        if top_k is not None:
+            df = df.head(top_k)
+
+    with stage(profiler, "write", len(df)):
+        write_results(df, out_path)
+        if incremental:
+            # Row labels are catalog positions, so this lists fingerprints in file order
+            save_run_state(out_path, run_hash, fingerprints[df.index.to_numpy()])
+    return df.to_dict(orient="records")
+
+
+def _catalog_columns(core_model, style_models=()):
+    return core_model.shirt_fields.union(*(model.shirt_fields for model in style_models))
+
+
+def _shirt_fingerprints(shirts, core_model, style_models=()):
+    # ShirtName is written to the output; without it rows are named by their index
+    columns = ["ShirtName", *sorted(_catalog_columns(core_model, style_models))]
+    return row_fingerprints(shirts, columns, index="ShirtName" not in shirts.columns)
+
+
+def _load_prior_results(out_path, run_hash, rows_per_fingerprint=1):
+    """(previous results frame, their fingerprints) if `out_path` can be reused, else None."""
+    state = load_run_state(out_path, run_hash)
+    if state is None:
+        return None
+    prior = read_results(out_path)
+    if len(prior) != len(state["fingerprints"]) * rows_per_fingerprint:
+        logger.info(f"'{out_path}' does not match its run state; rescoring everything")
+        return None
+    return prior, state["fingerprints"]
+
+
+def _merge_prior_results(prior, reuse, fresh, stale):
+    """
+    Catalog-ordered results: previous rows where `reuse` points at one, freshly
+    scored rows (for positions `stale`) elsewhere. Labels are catalog positions.
+    """
+    kept = np.flatnonzero(reuse >= 0)
+    old = prior.iloc[reuse[kept]].set_axis(kept)
+    if fresh.empty:
+        return old
+    fresh = fresh.set_axis(stale)
+    return pd.concat([old, fresh]).sort_index(kind="stable")
+
+
+def evaluate_fit_streaming(body_path, shirt_path, out_path, style_profile=None,
+                           chunksize=DEFAULT_CHUNKSIZE, top_k=None, rationale=True, projections=None):
+    """
+    Constant-memory `evaluate_fit` for catalogs too large to load at once.
+
+    The catalog is read `chunksize` rows at a time, parsing only the columns the
+    models read; each chunk is scored and appended to `out_path` in catalog order.
+    With `top_k`, only the best `top_k` shirts are kept (in a bounded heap) and
+    written sorted like `evaluate_fit` (ties keep catalog order); each chunk only
+    renders strings for its own best `top_k` rows.
+
+    Returns:
+        list of dict: The top-K rows, or [] when `top_k` is not set.
+    """
+    body = load_body_measurements(body_path)
+    core_model, _ = load_models()
+    style_models = load_style_models(style_profile)
+    score_col = _primary_score_col(style_models)
+    columns = _catalog_columns(core_model, style_models)
+
+    heap = []  # min-heap of (score, -position, row): the root is the weakest row kept
+    position = 0
+    out_columns = None
+    writer = ResultWriter(out_path) if top_k is None else None
+    try:
+        for chunk in iter_shirt_chunks(shirt_path, chunksize, columns):
+            results = _score_shirts_with_models(
+                body, chunk, core_model, style_models, rationale=rationale, top_k=top_k, projections=projections
+            )
+            if not results:
+                continue
+            if writer is not None:
+                writer.write(pd.DataFrame(results))
+            else:
+                for row in results:
+                    score = row[score_col]
+                    item = (-1 if score == "" else score, -position, row)
+                    if len(heap) < top_k:
+                        heapq.heappush(heap, item)
+                    elif heap and item[:2] > heap[0][:2]:
+                        heapq.heapreplace(heap, item)
+                    position += 1
+            out_columns = out_columns or list(results[0])
+            logger.debug(f"Scored chunk of {len(results)} shirts")
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is not None:
+        return []
+    # (score, -position) keys are unique, so the row dicts are never compared
+    top = [row for _, _, row in sorted(heap, reverse=True)]
+    write_results(pd.DataFrame(top, columns=out_columns), out_path)
+    return top
+
+
+def evaluate_bodies(bodies_path, shirt_path, out_path, top_k=10, style_profile=None, workers=1,
+                    chunksize=None, rationale=True, index=False, incremental=False):
+    """
+    Ranks the catalog for every body profile in `bodies_path` and writes the
+    top-K shirts per body (one row per body x rank).
+    With `workers > 1` the body list is sharded across a process pool.
+    With `chunksize`, the catalog is streamed in chunks instead and each body's
+    top-K is merged chunk by chunk (same result, memory bounded by the chunk size).
+    With `index`, the catalog is loaded into a `CatalogIndex` once and blocks that
+    cannot reach a body's top-K are skipped (same result, scored in-process).
+    Ranking uses a single style profile (or core).
+    With `incremental=True` (not with `chunksize`), only bodies that are new or
+    changed since the last incremental run are ranked, as long as the catalog,
+    config and options are unchanged; see `evaluate_fit`.
+    """
+    if len(style_profile_names(style_profile)) > 1:
+        raise ValueError("evaluate_bodies ranks with one style profile; got several")
+    if incremental and chunksize and not index:
+        raise ValueError("Incremental runs load the catalog to fingerprint it; drop chunksize")
+    bodies = load_body_table(bodies_path)
+    core_model, style_model = load_models(style_profile)
+    model = style_model or core_model
+    if chunksize and not index:
+        df = _top_k_streaming(bodies, shirt_path, top_k, model, chunksize, rationale)
+        write_results(df, out_path)
+        return df.to_dict(orient="records")
+
+    shirts = load_shirt_data(shirt_path, columns=model.shirt_fields)
+    # top_k_fits ranks every shirt, so each body gets exactly this many rows
+    per_body = min(top_k, len(shirts))
+    prior = None
+    if incremental:
+        catalog_hash = hashlib.sha256(_shirt_fingerprints(shirts, model).tobytes()).hexdigest()
+        run_hash = digest(model_fingerprint(model), catalog_hash, top_k, rationale)
+        fingerprints = row_fingerprints(bodies, bodies.columns)
+        prior = _load_prior_results(out_path, run_hash, rows_per_fingerprint=per_body)
+    if prior is not None:
+        lookup = dict(zip(prior[1].tolist(), range(len(prior[1]))))
+        reuse = np.array([lookup.get(fp, -1) for fp in fingerprints.tolist()], dtype=np.int64)
+        stale = np.flatnonzero(reuse < 0)
+        logger.info(f"Incremental run: ranking {len(stale)} of {len(bodies)} bodies")
+        to_rank = bodies.iloc[stale]
+    else:
+        to_rank = bodies
+
+    if index:
+        catalog = CatalogIndex(shirts, model=model)
+        df = catalog.top_k_fits(to_rank, k=top_k, rationale=rationale)
+        logger.info(f"Catalog index scored {catalog.scored_fraction:.1%} of body x shirt pairs")
+    elif workers > 1 and len(to_rank) > 1:
+        df = _top_k_parallel(to_rank, shirts, top_k, style_profile, workers, rationale)
     else:
-        df = df.sort_values(by="CoreFitScore", ascending=False)
+        df = top_k_fits(to_rank, shirts, k=top_k, model=model, rationale=rationale)
+    if prior is not None:
+        df = _merge_prior_rankings(prior[0], reuse, df, stale, per_body)
 
-    df.to_csv(out_path, index=False)
+    write_results(df, out_path)
+    if incremental:
+        save_run_state(out_path, run_hash, fingerprints)
     return df.to_dict(orient="records")
 
 
+def _merge_prior_rankings(prior, reuse, fresh, stale, per_body):
+    """
+    Body-ordered top-K rows: each body's `per_body` rows from the previous results
+    where `reuse` points at them, else from `fresh` (ranked for bodies `stale`).
+    """
+    slot = np.empty(len(reuse), dtype=np.int64)
+    kept = reuse >= 0
+    slot[kept] = reuse[kept]
+    slot[stale] = len(prior) // max(per_body, 1) + np.arange(len(stale))
+    rows = (slot[:, None] * per_body + np.arange(per_body)).ravel()
+    combined = pd.concat([prior, fresh], ignore_index=True) if len(fresh) else prior
+    return combined.iloc[rows].reset_index(drop=True)
+
+
+def evaluate_sizes(chart_path, out_path, body_path=None, bodies_path=None, style_profile=None, grade=False,
+                   rationale=True):
+    """
+    Best size of every garment in a size chart, for the body in `body_path` or every
+    body in `bodies_path`, written to `out_path` (one row per garment, per body).
+
+    The chart is one row per garment and size, or with `grade=True` one measured row
+    per garment expanded by `config/size_chart.yaml`. Every garment x size is scored
+    in one vectorized pass (`models.sizing.best_sizes`) with a single style profile
+    (or core).
+    """
+    if len(style_profile_names(style_profile)) > 1:
+        raise ValueError("evaluate_sizes scores with one style profile; got several")
+    core_model, style_model = load_models(style_profile)
+    grading = load_size_grading(ROOT_DIR) if grade else None
+    chart = load_size_chart(chart_path, grading=grading)
+    logger.info(f"Size chart: {len(chart.garments)} garments x {len(chart.sizes)} sizes")
+    bodies = load_body_table(bodies_path) if bodies_path else load_body_measurements(body_path)
+    df = best_sizes(bodies, chart, model=style_model or core_model, rationale=rationale)
+    if bodies_path is None:
+        # Best garments first, like evaluate_fit
+        df = df.sort_values(by="FitScore", ascending=False, kind="stable", key=_score_sort_key)
+    write_results(df, out_path)
+    return df.to_dict(orient="records")
+
+
+def evaluate_uncertainty(body_path, shirt_path, out_path, style_profile=None, samples=None, seed=None):
+    """
+    Monte Carlo margin of error for every shirt: FitScore plus the mean, standard
+    deviation and central interval of the score under the measurement noise in
+    `config/measurement_noise.yaml` (`samples` / `seed` override it), written to
+    `out_path` best first. Scores with a single style profile (or core).
+    """
+    if len(style_profile_names(style_profile)) > 1:
+        raise ValueError("evaluate_uncertainty scores with one style profile; got several")
+    core_model, style_model = load_models(style_profile)
+    model = style_model or core_model
+    noise = load_noise(ROOT_DIR)
+    if samples is not None:
+        noise = replace(noise, samples=samples)
+    if seed is not None:
+        noise = replace(noise, seed=seed)
+    body = load_body_measurements(body_path)
+    shirts = load_shirt_data(shirt_path, columns=model.shirt_fields)
+    logger.info(f"Margin of error: {noise.samples} samples x {len(shirts)} shirts")
+    stats = score_uncertainty(body, shirts, noise, model=model)
+    df = pd.concat([pd.DataFrame({"ShirtName": _shirt_names(shirts, np.arange(len(shirts)))}, index=shirts.index),
+                    stats.round(2)], axis=1)
+    df = df.sort_values(by="FitScore", ascending=False, kind="stable", key=_score_sort_key)
+    write_results(df, out_path)
+    return df.to_dict(orient="records")
+
+
+def _top_k_streaming(bodies, shirt_path, k, model, chunksize, rationale=True):
+    best = top_k_fits(bodies, pd.DataFrame(), k=k, model=model, rationale=rationale)
+    for chunk in iter_shirt_chunks(shirt_path, chunksize, model.shirt_fields):
+        best = merge_top_k([best, top_k_fits(bodies, chunk, k=k, model=model, rationale=rationale)], k)
+    return best
+
+
+def _run_sizes(args, profiler=None):
+    body_path = args.bodies or args.body
+    if not os.path.exists(body_path) or not os.path.exists(args.size_chart):
+        print("Missing input data. Please check the provided paths.")
+        return
+    if len(style_profile_names(args.style_profile)) > 1:
+        print("--size_chart scores with one style profile at a time.")
+        return
+    with stage(profiler, "evaluate_sizes"):
+        results = evaluate_sizes(
+            args.size_chart, args.out, body_path=args.body, bodies_path=args.bodies,
+            style_profile=args.style_profile, grade=args.grade_sizes, rationale=args.rationale,
+        )
+    columns = (["BodyId"] if args.bodies else []) + ["ShirtName", "Size", "FitScore", "Confidence"]
+    print("\nBest size per garment:\n")
+    print(tabulate(pd.DataFrame(results, columns=columns), headers="keys", tablefmt="fancy_grid", showindex=False))
+
+
+def _run_uncertainty(args, profiler=None):
+    if not os.path.exists(args.body) or not os.path.exists(args.shirts):
+        print("Missing input data. Please check the provided paths.")
+        return
+    if len(style_profile_names(args.style_profile)) > 1:
+        print("--uncertainty scores with one style profile at a time.")
+        return
+    with stage(profiler, "evaluate_uncertainty"):
+        results = evaluate_uncertainty(
+            args.body, args.shirts, args.out, style_profile=args.style_profile, samples=args.samples,
+        )
+    columns = ["ShirtName", "FitScore", "FitScoreMean", "FitScoreLow", "FitScoreHigh", "MarginOfError"]
+    print("\nFit scores with margin of error:\n")
+    print(tabulate(pd.DataFrame(results, columns=columns), headers="keys", tablefmt="fancy_grid", showindex=False))
+
+
 def main():
     # Show full strings in pandas output (no truncation)
     pd.set_option("display.max_colwidth", None)
@@ -182,28 +749,236 @@ def main():
         "--out",
         type=str,
         default="outputs/fit_results.csv",
-        help="Path to output CSV",
+        help="Path to output file; the extension picks the format "
+             "(.csv, or .parquet/.feather with pyarrow installed)",
+    )
+    parser.add_argument(
+        "--bodies",
+        type=str,
+        default=None,
+        help="Path to a table of many body profiles; ranks the catalog for each body",
+    )
+    parser.add_argument(
+        "--top_k",
+        type=int,
+        default=None,
+        help="Shirts kept per body in --bodies mode (default 10); with a single body, "
+             "keep only the best K shirts",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help=f"Stream the shirt catalog in chunks of this many rows (e.g. {DEFAULT_CHUNKSIZE}) "
+             "instead of loading it at once; without --top_k, rows are written in catalog order",
+    )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="In --bodies mode, build a block index over the catalog and skip blocks "
+             "that cannot reach a body's top-K (same output, in-process only)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Keep row fingerprints next to --out and, on the next run with the same config "
+             "and body, rescore only new or changed shirts (or bodies) and merge the results",
+    )
+    parser.add_argument(
+        "--size_chart",
+        type=str,
+        default=None,
+        help="Size chart CSV (one row per garment and size, e.g. a 'Size' column); writes the "
+             "best size of every garment for --body (or every body in --bodies)",
+    )
+    parser.add_argument(
+        "--grade_sizes",
+        action="store_true",
+        help="With --size_chart, treat each row as one measured size and expand it into "
+             "every size in config/size_chart.yaml",
+    )
+    parser.add_argument(
+        "--uncertainty",
+        action="store_true",
+        help="Monte Carlo margin of error: perturb body and shirt measurements with the noise in "
+             "config/measurement_noise.yaml and write each shirt's score mean, std and interval",
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=None,
+        help="With --uncertainty, measurement draws per shirt (default from config/measurement_noise.yaml)",
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default=None,
+        metavar="CACHE.sqlite",
+        help="Persistent result cache shared across runs and processes; shirts already scored "
+             "for the same body, config and options are read from it instead of rescored",
+    )
+    parser.add_argument(
+        "--cache_size",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="Most rows kept in --cache; the least recently used are evicted beyond it",
+    )
+    parser.add_argument(
+        "--no-rationale",
+        dest="rationale",
+        action="store_false",
+        help="Skip rationale text entirely (no *Rationale columns in the output)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        metavar="REPORT.json",
+        help="Write a JSON report of per-stage wall time, rows/sec and peak RSS plus "
+             f"per-aspect scorer counters (or set {PROFILE_ENV_VAR}=REPORT.json)",
+    )
+    parser.add_argument(
+        "--pstats",
+        type=str,
+        default=None,
+        help="Also run under cProfile and dump the stats here (read with python -m pstats)",
+    )
+    parser.add_argument(
+        "--compile_profiles",
+        action="store_true",
+        help="Merge and validate the base config plus every style profile into "
+             "config/compiled_profiles.pkl, then exit",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes; >1 shards the catalog (or body list) across a process pool",
     )
     parser.add_argument(
         "--style_profile",
         type=str,
         default=None,
-        help="Style profile overlay (do not include .yaml extension)",
+        help="Style profile overlay (do not include .yaml extension); a comma-separated "
+             "list or 'all' scores every listed profile in one pass into a wide table",
+    )
+    parser.add_argument(
+        "--projections",
+        type=str,
+        default=None,
+        help="Extra projection scenarios from config/projections/: 'all' or comma-separated "
+             "names (e.g. cut,chest_sweep); each adds {Label}FitScore/Confidence/Tags columns",
     )
     args = parser.parse_args()
+    if args.chunksize and not (args.bodies or args.size_chart or args.uncertainty):
+        # Streaming scores the catalog chunk by chunk in this process and writes as it goes
+        if args.cache:
+            parser.error("--cache is not used when streaming the catalog; drop --chunksize or --cache")
+        if args.workers > 1:
+            parser.error("--workers shards a catalog held in memory; drop --chunksize or --workers")
+        if args.incremental:
+            parser.error("--incremental keeps the full results table in memory; drop --chunksize")
+
+    if args.compile_profiles:
+        out = compile_profiles(config_dir=ROOT_DIR)
+        print(f"Wrote compiled profile bundle to {out}")
+        return
+
+    report_path = args.profile or os.environ.get(PROFILE_ENV_VAR)
+    if not (report_path or args.pstats):
+        _run(args)
+        return
+
+    with PipelineProfiler(cprofile=bool(args.pstats)) as profiler:
+        _run(args, profiler)
+    for line in profiler.summary_lines():
+        logger.info(line)
+    if report_path:
+        profiler.write_report(report_path)
+        logger.info(f"Wrote profile report to {report_path}")
+    if args.pstats:
+        profiler.dump_stats(args.pstats)
+        logger.info(f"Wrote cProfile stats to {args.pstats}")
+
+
+def _run(args, profiler=None):
+    if args.size_chart:
+        _run_sizes(args, profiler)
+        return
+    if args.uncertainty:
+        _run_uncertainty(args, profiler)
+        return
+    if args.bodies:
+        if not os.path.exists(args.bodies) or not os.path.exists(args.shirts):
+            print("Missing input data. Please check the provided paths.")
+            return
+        if len(style_profile_names(args.style_profile)) > 1:
+            print("--bodies ranks with one style profile at a time.")
+            return
+        if args.incremental and args.chunksize and not args.index:
+            print("--incremental needs the catalog in memory; drop --chunksize.")
+            return
+        top_k = 10 if args.top_k is None else args.top_k
+        with stage(profiler, "evaluate_bodies"):
+            results = evaluate_bodies(
+                args.bodies, args.shirts, args.out, top_k=top_k,
+                style_profile=args.style_profile, workers=args.workers, chunksize=args.chunksize,
+                rationale=args.rationale, index=args.index, incremental=args.incremental,
+            )
+        df_display = pd.DataFrame(results)
+        print(f"\nTop {top_k} shirts per body:\n")
+        print(tabulate(
+            df_display[["BodyId", "Rank", "ShirtName", "FitScore", "Confidence"]],
+            headers="keys", tablefmt="fancy_grid", showindex=False,
+        ))
+        return
 
     # Check input files
     if not os.path.exists(args.body) or not os.path.exists(args.shirts):
         print("Missing input data. Please check the provided paths.")
         return
 
-    results = evaluate_fit(
-        args.body, args.shirts, args.out, style_profile=args.style_profile
-    )
+    projections = None
+    if args.projections:
+        names = None if args.projections == "all" else [n for n in args.projections.split(",") if n]
+        projections = load_projections(ROOT_DIR, names)
+
+    if args.incremental and args.top_k is not None:
+        print("--incremental keeps the full results table in memory; drop --top_k.")
+        return
+
+    if args.chunksize:
+        with stage(profiler, "evaluate_fit_streaming"):
+            results = evaluate_fit_streaming(
+                args.body, args.shirts, args.out, style_profile=args.style_profile,
+                chunksize=args.chunksize, top_k=args.top_k, rationale=args.rationale,
+                projections=projections,
+            )
+        if args.top_k is None:
+            print(f"Results written to {args.out}")
+            return
+    else:
+        cache = ResultCache(args.cache, max_entries=args.cache_size) if args.cache else None
+        try:
+            results = evaluate_fit(
+                args.body, args.shirts, args.out, style_profile=args.style_profile,
+                workers=args.workers, top_k=args.top_k, rationale=args.rationale, profiler=profiler,
+                projections=projections, incremental=args.incremental, cache=cache,
+            )
+        finally:
+            if cache is not None:
+                logger.info(f"Result cache: {cache.stats}")
+                cache.close()
 
     # Build display DataFrame depending on style_profile
     df_display = pd.DataFrame(results)
-    if args.style_profile:
+    profiles = style_profile_names(args.style_profile)
+    if len(profiles) > 1:
+        # Show the Core score next to every profile's score
+        display_cols = [("ShirtName", "Shirt name"), ("CoreFitScore", "Core Score")] + [
+            (f"Style{column_label(name)}FitScore", name) for name in profiles
+        ]
+    elif profiles:
         # Show Core and Style columns
         display_cols = [
             ("ShirtName", "Sh irt name"),
@@ -0,0 +1,529 @@
+# batch.py
+"""
+Vectorized (columnar) version of `score_fit`.
+
+Scores a whole shirt DataFrame against one body with NumPy array operations.
+Every aspect is evaluated as: diff -> threshold bucket -> score, and buckets map
+to the same tags/rationales the scalar scorers in `scorers.py` produce, so
+`score_fit_batch(body, shirts)` matches `score_fit(body, row)` row for row.
+
+`score_matrix` and `top_k_fits` broadcast many bodies against the catalog
+(bodies x shirts) in bounded-size blocks. `SharedPass` scores one body under
+several models (e.g. every style profile), reusing aspects they have in common.
+"""
+
+import logging
+from collections.abc import Mapping
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+import models.fit_model as fit_model
+from .scorers import OVERSIZED_TAGS
+
+logger = logging.getLogger(__name__)
+
+NO_DATA_RATIONALE = "No measurements available for this shirt."
+
+# Upper bound on body x shirt cells scored at once (each cell holds a few
+# float64 values per aspect while a block is in flight).
+DEFAULT_BLOCK_CELLS = 1_000_000
+
+TOP_K_COLUMNS = ["BodyId", "Rank", "ShirtName", "FitScore", "Confidence", "Tags", "Rationale"]
+
+
+def _body_value(body, field):
+    val = fit_model.get_val(body.get(field)) if field else None
+    return np.nan if val is None else float(val)
+
+
+def _shirt_column(shirts, field):
+    """Returns a float array for `field`, NaN where missing (or the column is absent)."""
+    if field and field in shirts.columns:
+        return pd.to_numeric(shirts[field], errors="coerce").to_numpy(dtype=float)
+    return np.full(len(shirts), np.nan)
+
+
+def _body_columns(bodies, model):
+    """Body table -> {field: (n, 1) float array} for every body field the model reads."""
+    return {field: _shirt_column(bodies, field)[:, None] for field in model.body_fields}
+
+
+def _shirt_columns(shirts, model):
+    """Shirt table -> {field: (m,) float array} for every shirt field the model reads."""
+    return {field: _shirt_column(shirts, field) for field in model.shirt_fields}
+
+
+def _params_key(value):
+    if isinstance(value, Mapping):
+        return tuple(sorted((k, _params_key(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_params_key(v) for v in value)
+    return value
+
+
+def _aspect_key(spec, keys):
+    """
+    Hashable identity of an aspect evaluation (scorer, inputs, params, and the keys
+    of the aspects it reads, from `keys`), or None.
+    """
+    deps = tuple(keys.get(name) for name in spec.depends_on)
+    if any(dep is None for dep in deps):
+        return None
+    key = (spec.batch_scorer, spec.inputs, _params_key(spec.params), deps)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _batch_args(spec, body_cols, shirt_cols, scores, shape):
+    """Batch scorer arguments for `spec`: its input columns (NaN when absent) and dependency scores."""
+    args = []
+    for source, field in spec.inputs:
+        if source == "score":
+            args.append(scores[field])
+        elif source == "body":
+            args.append(body_cols.get(field, np.nan) if field else np.nan)
+        else:
+            args.append(shirt_cols[field] if field else np.full(shape[-1:], np.nan))
+    return args
+
+
+def _available(spec, args):
+    """Where `spec` has every argument of at least one `requires` alternative (bool array)."""
+    available = False
+    for alternative in spec.requires:
+        complete = True
+        for i in alternative:
+            complete = complete & ~np.isnan(args[i])
+        available = available | complete
+    return np.asarray(available)
+
+
+def _score_available(spec, args, available, no_data_table):
+    """
+    `spec.batch_scorer(*args)` without scoring cells that lack inputs: those get the
+    no-data bucket. A mostly-missing block is scored on its available cells only.
+    """
+    if not available.any():
+        no_data = np.full((), len(no_data_table) - 1, np.int16)
+        return np.full((), 50.0), no_data, np.full((), np.nan), list(no_data_table)
+    if available.all() or 2 * np.count_nonzero(available) >= available.size:
+        return spec.batch_scorer(*args, spec.params)
+    shape = np.broadcast_shapes(available.shape, *[np.shape(a) for a in args])
+    mask = np.broadcast_to(available, shape)
+    subset = [np.broadcast_to(a, shape)[mask] if np.ndim(a) else a for a in args]
+    sub_scores, sub_buckets, sub_diff, table = spec.batch_scorer(*subset, spec.params)
+    scores = np.full(shape, 50.0)
+    buckets = np.full(shape, len(table) - 1, np.int16)
+    diff = np.full(shape, np.nan)
+    scores[mask], buckets[mask], diff[mask] = sub_scores, sub_buckets, sub_diff
+    return scores, buckets, diff, table
+
+
+def _score_arrays(body_cols, shirt_cols, model, shared=None):
+    """
+    Numeric core shared by every batch entry point.
+
+    `body_cols` maps body fields to scalars or (n, 1) arrays, `shirt_cols` maps shirt
+    fields to (m,) arrays; the result arrays have the broadcast shape. `shared` (a
+    dict, only valid for the same body and shirt columns) caches aspect results by
+    scorer, fields and params, so models with identical aspects evaluate them once.
+
+    Returns:
+        dict: fit_score (float, rounded and adjusted), present (int aspect count),
+            confidence (float, rounded) and per_aspect, a list of AspectScores
+            for rendering tags/rationales.
+    """
+    scoring_params = model.scoring_params
+    adjustments = model.interaction_adjustments
+    shape = np.broadcast_shapes(
+        *[np.shape(v) for v in body_cols.values()], *[np.shape(v) for v in shirt_cols.values()]
+    )
+
+    present = np.zeros(shape, dtype=np.int64)
+    no_data = model.no_data_tables
+    # Scored dependencies first (model.order), kept in config order; scorers only
+    # see the cells that have their required inputs
+    results, scored, keys = {}, {}, {}
+    for i in model.order or range(model.aspect_count):
+        spec = model.aspects[i]
+        key = _aspect_key(spec, keys) if shared is not None else None
+        if key is not None and key in shared:
+            scores, buckets, diff, table = shared[key]
+        else:
+            args = _batch_args(spec, body_cols, shirt_cols, scored, shape)
+            scores, buckets, diff, table = _score_available(spec, args, _available(spec, args), no_data[i])
+            if key is not None:
+                shared[key] = (scores, buckets, diff, table)
+        keys[spec.name] = key
+        scored[spec.name] = scores
+        results[i] = (scores, buckets, diff, table)
+    per_aspect = []
+    for i, spec in enumerate(model.aspects):
+        scores, buckets, diff, table = results[i]
+        scores = np.broadcast_to(scores, shape)
+        buckets = np.broadcast_to(buckets, shape)
+        per_aspect.append(AspectScores(spec.name, scores, buckets, np.broadcast_to(diff, shape), table))
+        present += scores != 50
+
+    # Same accumulation order as score_fit, so the floats match exactly
+    weighted = np.zeros(shape, dtype=float)
+    for aspect, scores, _, _, _ in per_aspect:
+        weighted = weighted + scores * model.weights[aspect]
+    fit_score = np.rint(weighted / model.total_weight)
+
+    # Oversize & Weight Adjustments (see adjust_for_oversize_weight)
+    weight_field = model.weight_field
+    shirt_weight = shirt_cols[weight_field] if weight_field else np.full(shape[-1:], np.nan)
+    has_weight = ~np.isnan(shirt_weight)
+    heavy = light = np.zeros(shirt_weight.shape, dtype=bool)
+    if weight_field:
+        heavy = has_weight & (shirt_weight >= scoring_params["weight"]["mid_max"])
+        light = has_weight & (shirt_weight < scoring_params["weight"]["light_max"])
+    oversized = np.zeros(shape, dtype=bool)
+    relaxed = np.zeros(shape, dtype=bool)
+    slim = np.zeros(shape, dtype=bool)
+    for _, _, buckets, _, table in per_aspect:
+        tags = [tag for tag, _ in table]
+        oversized |= np.isin(buckets, [i for i, t in enumerate(tags) if t in OVERSIZED_TAGS])
+        relaxed |= np.isin(buckets, [i for i, t in enumerate(tags) if t == "Relaxed Fit"])
+        slim |= np.isin(buckets, [i for i, t in enumerate(tags) if t == "Slim Fit"])
+    adjusted = fit_score.copy()
+    adjusted += np.where(oversized & heavy, adjustments["oversized_heavy_bonus"], 0)
+    adjusted -= np.where(oversized & ~heavy & light, adjustments["oversized_light_penalty"], 0)
+    adjusted += np.where(relaxed & heavy, adjustments["relaxed_heavy_bonus"], 0)
+    adjusted -= np.where(slim & light, adjustments["slim_light_penalty"], 0)
+    adjusted = np.clip(adjusted, 0, 100)
+    fit_score = np.where((present >= 2) & has_weight, adjusted, fit_score)
+
+    aspect_count = model.aspect_count
+    confidence = np.rint(100 * present / aspect_count) if aspect_count else np.zeros(shape)
+
+    return {
+        "fit_score": fit_score,
+        "present": present,
+        "confidence": confidence,
+        "per_aspect": per_aspect,
+    }
+
+
+def _render_rationale(diff, bucket, table):
+    return table[bucket][1].format(diff=diff)
+
+
+def _render(per_aspect, index, rationale=True):
+    """Tags list and rationale string (None if not wanted) for one cell (`index` into the result arrays)."""
+    tags, parts = [], []
+    for _, _, buckets, diffs, table in per_aspect:
+        b = int(buckets[index])
+        tag, _ = table[b]
+        if tag:
+            tags.append(tag)
+        if rationale:
+            parts.append(_render_rationale(float(diffs[index]), b, table))
+    return tags, " ".join(parts) if rationale else None
+
+
+class AspectScores(NamedTuple):
+    """
+    Structured result of one aspect over a batch: numeric scores, the diff the
+    aspect was judged on, and bucket codes. `table[bucket]` is the (tag, rationale
+    template) of the branch that fired, so strings are only built when rendered.
+    """
+    aspect: str
+    scores: np.ndarray
+    buckets: np.ndarray
+    diffs: np.ndarray
+    table: list
+
+
+class FitResults:
+    """
+    Numeric batch scores for one body against a shirt table, with tags and
+    rationales rendered on demand (for the rows that are actually shown or exported).
+
+    `positions` arguments are row positions (0..n-1); None means every row.
+    """
+
+    def __init__(self, arrays, index):
+        self.fit_score = arrays["fit_score"]
+        self.confidence = arrays["confidence"]
+        self.present = arrays["present"]
+        self.per_aspect = arrays["per_aspect"]
+        self.index = index
+
+    def __len__(self):
+        return len(self.index)
+
+    def _positions(self, positions):
+        return np.arange(len(self)) if positions is None else np.asarray(positions, dtype=np.int64)
+
+    def missing_counts(self, positions=None):
+        """{aspect: number of rows where it could not be scored for missing inputs}."""
+        pos = self._positions(positions)
+        return {
+            rec.aspect: int(np.count_nonzero(rec.buckets[pos] == len(rec.table) - 1)) for rec in self.per_aspect
+        }
+
+    def ranking(self):
+        """FitScore as floats, -1 for shirts with no scorable aspect (they rank last)."""
+        return np.where(self.present > 0, self.fit_score, -1.0)
+
+    def fit_scores(self, positions=None):
+        """FitScore per row: int, or "" when no aspect is measured."""
+        pos = self._positions(positions)
+        fit = self.fit_score[pos].astype(np.int64).tolist()
+        present = self.present[pos].tolist()
+        return [f if p else "" for f, p in zip(fit, present)]
+
+    def confidences(self, positions=None):
+        pos = self._positions(positions)
+        conf = self.confidence[pos].astype(np.int64).tolist()
+        present = self.present[pos].tolist()
+        return [c if p else 0 for c, p in zip(conf, present)]
+
+    def tags(self, positions=None):
+        """Tag lists per row (empty unless at least two aspects are measured)."""
+        pos = self._positions(positions)
+        out = [[] for _ in range(len(pos))]
+        keep = (self.present[pos] >= 2).tolist()
+        for rec in self.per_aspect:
+            names = [tag for tag, _ in rec.table]
+            for i, b in enumerate(rec.buckets[pos].tolist()):
+                if keep[i] and names[b]:
+                    out[i].append(names[b])
+        return out
+
+    def rationales(self, positions=None):
+        pos = self._positions(positions)
+        parts = [[] for _ in range(len(pos))]
+        for rec in self.per_aspect:
+            for i, (b, d) in enumerate(zip(rec.buckets[pos].tolist(), rec.diffs[pos].tolist())):
+                parts[i].append(_render_rationale(d, b, rec.table))
+        present = self.present[pos].tolist()
+        return [" ".join(p) if n else NO_DATA_RATIONALE for p, n in zip(parts, present)]
+
+    def to_frame(self, positions=None, rationale=True):
+        """
+        `score_fit`-shaped DataFrame for the selected rows (in the given order):
+        FitScore, Confidence, Tags and, unless `rationale=False`, Rationale.
+        """
+        pos = self._positions(positions)
+        index = self.index[pos]
+        cols = {
+            "FitScore": pd.Series(self.fit_scores(pos), index=index, dtype=object),
+            "Confidence": pd.Series(self.confidences(pos), index=index, dtype=object),
+            "Tags": pd.Series(self.tags(pos), index=index, dtype=object),
+        }
+        if rationale:
+            cols["Rationale"] = pd.Series(self.rationales(pos), index=index, dtype=object)
+        return pd.DataFrame(cols, index=index)
+
+
+def score_fit_records(body, shirts, model=None):
+    """
+    Vectorized `score_fit` over every row of a shirt DataFrame, without building
+    any strings; see `FitResults` for rendering.
+
+    Args:
+        body (dict): Body measurement data.
+        shirts (pd.DataFrame): One row per shirt, same columns `score_fit` reads.
+        model (CompiledFitModel): Model to score with; defaults to the core model.
+
+    Returns:
+        FitResults
+    """
+    if model is None:
+        model = fit_model.get_default_model()
+    logger.debug(f"Batch scoring {len(shirts)} shirts with model '{model.name}'")
+    body_cols = {field: _body_value(body, field) for field in model.body_fields}
+    return FitResults(_score_arrays(body_cols, _shirt_columns(shirts, model), model), shirts.index)
+
+
+class SharedPass:
+    """
+    Scores one body against one shirt table under several models in a single pass
+    over the catalog: shirt columns are converted once, and an aspect that an
+    earlier model already evaluated with the same scorer, fields and params (style
+    profiles usually change only a few aspects) is reused instead of recomputed.
+
+    `records(model)` returns the same `FitResults` as `score_fit_records(body,
+    shirts, model)`.
+    """
+
+    def __init__(self, body, shirts):
+        self.body = body
+        self.shirts = shirts
+        self._shirt_cols = {}
+        self._aspects = {}
+        self.evaluated = 0
+        self.reused = 0
+
+    def records(self, model=None):
+        if model is None:
+            model = fit_model.get_default_model()
+        for field in model.shirt_fields - self._shirt_cols.keys():
+            self._shirt_cols[field] = _shirt_column(self.shirts, field)
+        body_cols = {field: _body_value(self.body, field) for field in model.body_fields}
+        shirt_cols = {field: self._shirt_cols[field] for field in model.shirt_fields}
+        before = len(self._aspects)
+        arrays = _score_arrays(body_cols, shirt_cols, model, self._aspects)
+        self.evaluated += len(self._aspects) - before
+        self.reused += model.aspect_count - (len(self._aspects) - before)
+        return FitResults(arrays, self.shirts.index)
+
+
+def score_fit_batch(body, shirts, model=None, rationale=True):
+    """
+    Vectorized `score_fit` over every row of a shirt DataFrame.
+
+    Args:
+        body (dict): Body measurement data.
+        shirts (pd.DataFrame): One row per shirt, same columns `score_fit` reads.
+        model (CompiledFitModel): Model to score with; defaults to the core model.
+        rationale (bool): Render the Rationale column (False skips that string work).
+
+    Returns:
+        pd.DataFrame: Indexed like `shirts`, with columns
+            FitScore (int, or "" when no aspect is measured), Confidence (int),
+            Tags (list of str) and Rationale (str, omitted when `rationale=False`).
+    """
+    return score_fit_records(body, shirts, model).to_frame(rationale=rationale)
+
+
+def _block_rows(n_shirts, block_cells):
+    return max(1, block_cells // max(1, n_shirts))
+
+
+def _iter_body_blocks(bodies, shirt_cols, model, block_cells):
+    """Yields (start, stop, result) for consecutive body blocks of bounded cell count."""
+    n = len(bodies)
+    m = len(next(iter(shirt_cols.values())))
+    body_cols = _body_columns(bodies, model)
+    step = _block_rows(m, block_cells)
+    for start in range(0, n, step):
+        stop = min(n, start + step)
+        block = {field: col[start:stop] for field, col in body_cols.items()}
+        yield start, stop, _score_arrays(block, shirt_cols, model)
+
+
+def score_matrix(bodies, shirts, model=None, block_cells=DEFAULT_BLOCK_CELLS):
+    """
+    Fit-score matrix for every body x shirt pair.
+
+    Args:
+        bodies (pd.DataFrame): One row per body profile (measurement columns).
+        shirts (pd.DataFrame): One row per shirt.
+        model (CompiledFitModel): Model to score with; defaults to the core model.
+        block_cells (int): Max body x shirt cells evaluated at once.
+
+    Returns:
+        tuple: (fit_scores, confidences), float32 arrays of shape (n_bodies, n_shirts).
+            FitScore is NaN where a shirt has no scorable aspect for that body.
+    """
+    if model is None:
+        model = fit_model.get_default_model()
+    n, m = len(bodies), len(shirts)
+    fit_scores = np.empty((n, m), dtype=np.float32)
+    confidences = np.empty((n, m), dtype=np.float32)
+    shirt_cols = _shirt_columns(shirts, model)
+    for start, stop, result in _iter_body_blocks(bodies, shirt_cols, model, block_cells):
+        no_data = result["present"] == 0
+        fit_scores[start:stop] = np.where(no_data, np.nan, result["fit_score"])
+        confidences[start:stop] = np.where(no_data, 0, result["confidence"])
+    return fit_scores, confidences
+
+
+def _body_ids(bodies):
+    if "BodyId" in bodies.columns:
+        return bodies["BodyId"].tolist()
+    return bodies.index.tolist()
+
+
+def top_k_fits(bodies, shirts, k=10, model=None, block_cells=DEFAULT_BLOCK_CELLS, rationale=True):
+    """
+    Best `k` shirts per body, ranked by FitScore (ties: higher confidence, then catalog order).
+
+    Scores bodies x shirts in bounded blocks and keeps only each body's winners, so the
+    full matrix is never held; tags/rationales are rendered for the winners only.
+
+    Returns:
+        pd.DataFrame: BodyId, Rank, ShirtName, FitScore, Confidence, Tags, Rationale
+            (Rationale omitted when `rationale=False`).
+    """
+    if model is None:
+        model = fit_model.get_default_model()
+    columns = TOP_K_COLUMNS if rationale else TOP_K_COLUMNS[:-1]
+    m = len(shirts)
+    k = min(k, m)
+    rows = []
+    if k <= 0 or len(bodies) == 0:
+        return pd.DataFrame(rows, columns=columns)
+    if "ShirtName" in shirts.columns:
+        names = shirts["ShirtName"].tolist()
+    else:
+        names = [f"Shirt_{idx}" for idx in shirts.index]
+    body_ids = _body_ids(bodies)
+    shirt_cols = _shirt_columns(shirts, model)
+    positions = np.arange(m)
+
+    for start, stop, result in _iter_body_blocks(bodies, shirt_cols, model, block_cells):
+        present = result["present"]
+        # Unscorable pairs rank last
+        ranking = np.where(present > 0, result["fit_score"], -1.0)
+        confidence = result["confidence"]
+        for r in range(stop - start):
+            if k < m:
+                # Everything tied with the k-th best stays in, so tie-breaking is exact
+                kth = np.partition(ranking[r], m - k)[m - k]
+                candidates = positions[ranking[r] >= kth]
+            else:
+                candidates = positions
+            order = np.lexsort((candidates, -confidence[r][candidates], -ranking[r][candidates]))
+            for rank, j in enumerate(candidates[order][:k], start=1):
+                if present[r, j] == 0:
+                    tags, text, fit, conf = [], NO_DATA_RATIONALE, "", 0
+                else:
+                    tags, text = _render(result["per_aspect"], (r, j), rationale)
+                    tags = tags if present[r, j] >= 2 else []
+                    fit, conf = int(result["fit_score"][r, j]), int(confidence[r, j])
+                row = {
+                    "BodyId": body_ids[start + r],
+                    "Rank": rank,
+                    "ShirtName": names[j],
+                    "FitScore": fit,
+                    "Confidence": conf,
+                    "Tags": "; ".join(tags),
+                }
+                if rationale:
+                    row["Rationale"] = text
+                rows.append(row)
+    return pd.DataFrame(rows, columns=columns)
+
+
+def merge_top_k(frames, k):
+    """
+    Merges `top_k_fits` results for consecutive catalog chunks into each body's best
+    `k` over the whole catalog, with the same ranking and tie-breaking as a single call.
+
+    Args:
+        frames (list of pd.DataFrame): `top_k_fits` outputs, in catalog order.
+        k (int): Shirts kept per body.
+
+    Returns:
+        pd.DataFrame: Same columns as the inputs, Rank renumbered.
+    """
+    df = pd.concat(frames, ignore_index=True)
+    if df.empty:
+        return df
+    body_pos = pd.Series(range(len(df)), index=df["BodyId"]).groupby(level=0, sort=False).transform("min")
+    ranking = pd.to_numeric(df["FitScore"], errors="coerce").fillna(-1.0).to_numpy()
+    confidence = df["Confidence"].to_numpy(dtype=float)
+    # Earlier chunks come first, so the row position carries the catalog order
+    order = np.lexsort((np.arange(len(df)), -confidence, -ranking, body_pos.to_numpy()))
+    df = df.iloc[order]
+    df = df[df.groupby("BodyId", sort=False).cumcount() < k].copy()
+    df["Rank"] = df.groupby("BodyId", sort=False).cumcount() + 1
+    return df.reset_index(drop=True)
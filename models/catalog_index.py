@@ -0,0 +1,342 @@
+# catalog_index.py
+"""
+Prebuilt shirt index for exact top-K retrieval per body profile.
+
+The catalog is sorted by chest width and cut into fixed-size blocks; each block
+keeps the min/max of the chest and shoulder columns plus the best exact score of
+the body-independent aspects (weight). For a body, every block gets an upper
+bound on the FitScore any of its shirts can reach:
+
+- chest / shoulder: the best score over the block's [min, max] range, found by
+  evaluating the scorer at the range ends and at its threshold breakpoints
+  (`scoring_params`), since scores are piecewise linear in the diff,
+- body-independent aspects: the block's best exact score,
+- every other aspect: the highest score its scorer can return,
+
+plus every positive interaction bonus. Blocks are scored best bound first and the
+scan stops once no remaining block can reach the current K-th best, so the result
+(ranking and tie-breaking) is identical to `batch.top_k_fits`.
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+import models.fit_model as fit_model
+from .batch import TOP_K_COLUMNS, _body_value, _shirt_column, _score_arrays, score_fit_records
+from .scorers import (
+    OVERSIZED_TAGS, score_chest_batch, score_shoulder_batch, score_length_batch, score_hem_batch,
+    score_sleeve_batch, score_weight_batch,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 256
+# Chest-sorted groups of this many blocks are re-sorted by shoulder (a 2-level layout)
+GROUP_BLOCKS = 16
+# Rows handed to one `_score_arrays` call while scanning
+SCAN_ROWS = 8192
+
+# Offset used to probe just below a threshold (branches are `diff < threshold`)
+_EPS = 1e-9
+# Slack on the weighted bound so float rounding can never make it too tight
+_SLACK = 1e-6
+
+# Diff thresholds where a scorer switches branch, from its params
+_BREAKPOINTS = {
+    "score_chest": lambda p: [
+        -0.5, 0.0, 0.5, p["relaxed_max"], p["oversized_max"], p["comically_oversized_max"],
+    ],
+    "score_shoulder": lambda p: [-0.5, 0.5, p["drop_max"]],
+}
+
+# Highest score a scorer can return (the missing-data score is 50)
+_SCORE_CEILINGS = {
+    "score_length": lambda p: max(
+        [50, 70, 100, 90, p["very_long_penalty"]]
+        + [bound[1] for bound in p.get("fallback_ratio_bounds") or []]
+    ),
+    "score_hem": lambda p: max(100, 90, p["tapered_penalty"]),
+    "score_sleeve": lambda p: max(50, p["cap_score"], p["short_score"], p["ideal_score"], p["elbow_score"]),
+    "score_weight": lambda p: max(50, p["light_score"], p["mid_score"], p["heavy_score"], p["very_heavy_score"]),
+}
+
+# Scorers that only score an aspect (not 50) when its shirt field is measured
+_NEEDS_SHIRT_FIELD = {
+    score_chest_batch, score_shoulder_batch, score_length_batch, score_hem_batch, score_sleeve_batch,
+    score_weight_batch,
+}
+
+# Tags that trigger interaction adjustments (see adjust_for_oversize_weight)
+_TAG_GROUPS = {
+    "oversized": set(OVERSIZED_TAGS),
+    "relaxed": {"Relaxed Fit"},
+    "slim": {"Slim Fit"},
+}
+
+
+def _body_independent(spec):
+    return all(source == "shirt" for source, _ in spec.inputs)
+
+
+def _aspect_table(spec):
+    """The (tag, rationale) bucket table of an aspect's batch scorer."""
+    nan = np.full(1, np.nan)
+    return spec.batch_scorer(*[nan] * len(spec.inputs), spec.params)[3]
+
+
+def _reduce_blocks(ufunc, values, starts):
+    return ufunc.reduceat(values, starts) if len(values) else values[:0]
+
+
+class CatalogIndex:
+    """
+    Shirt index for one compiled model; query with `top_k` (one body) or
+    `top_k_fits` (a body table, same output as `batch.top_k_fits`).
+
+    `stats` counts queries and shirts actually scored, to see how much was pruned.
+    """
+
+    def __init__(self, shirts, model=None, block_size=DEFAULT_BLOCK_SIZE):
+        if model is None:
+            model = fit_model.get_default_model()
+        self.shirts = shirts
+        self.model = model
+        self.block_size = block_size
+        self.stats = {"queries": 0, "shirts_scored": 0}
+
+        m = len(shirts)
+        self._ranged = {
+            spec.name: spec for spec in model.aspects
+            if spec.scorer_name in _BREAKPOINTS and spec.body_field and spec.shirt_field
+            and spec.inputs == (("body", spec.body_field), ("shirt", spec.shirt_field))
+        }
+        # Sort by the chest field, then by shoulder within groups of GROUP_BLOCKS blocks,
+        # so blocks are narrow in both. NaN sorts last; stable keeps catalog order.
+        fields = sorted(
+            {spec.shirt_field for spec in self._ranged.values()},
+            key=lambda f: f != "ChestWidth",
+        ) or ["ChestWidth"]
+        order = np.argsort(_shirt_column(shirts, fields[0]), kind="stable")
+        if len(fields) > 1:
+            group = np.arange(m) // (block_size * GROUP_BLOCKS)
+            order = order[np.lexsort((_shirt_column(shirts, fields[1])[order], group))]
+        self._order = order
+        self._cols = {field: _shirt_column(shirts, field)[order] for field in model.shirt_fields}
+        self._starts = np.arange(0, m, block_size)
+        starts = self._starts
+
+        self._ranges = {}
+        for name, spec in self._ranged.items():
+            col = self._cols[spec.shirt_field]
+            with np.errstate(invalid="ignore"):
+                lo = _reduce_blocks(np.fmin, col, starts)
+                hi = _reduce_blocks(np.fmax, col, starts)
+            self._ranges[name] = (lo, hi, _reduce_blocks(np.add, np.isnan(col), starts) > 0)
+
+        # Body-independent aspects (weight): exact scores, best per block
+        self._fixed_best = {}
+        for spec in model.aspects:
+            if _body_independent(spec):
+                args = [self._cols[field] if field else np.full(m, np.nan) for _, field in spec.inputs]
+                scores = np.broadcast_to(spec.batch_scorer(*args, spec.params)[0], (m,))
+                self._fixed_best[spec.name] = _reduce_blocks(np.maximum, scores, starts)
+
+        # Confidence can't exceed the share of aspects whose shirt field is present
+        # (other scorers may score without it)
+        measured = sum(
+            (~np.isnan(self._cols[spec.shirt_field]) if spec.shirt_field else np.zeros(m, dtype=bool))
+            if spec.batch_scorer in _NEEDS_SHIRT_FIELD else np.ones(m, dtype=bool)
+            for spec in model.aspects
+        ) if model.aspects else np.zeros(m)
+        max_present = _reduce_blocks(np.maximum, np.asarray(measured, dtype=float), starts)
+        self._confidence_bound = (
+            np.rint(100 * max_present / model.aspect_count) if model.aspect_count else max_present
+        )
+        self._min_position = _reduce_blocks(np.minimum, order, starts)
+
+        # Interaction adjustments a block could receive
+        weight_field = model.weight_field
+        if weight_field:
+            weight_col = self._cols[weight_field]
+            weight_params = model.scoring_params["weight"]
+            with np.errstate(invalid="ignore"):
+                heavy, light = weight_col >= weight_params["mid_max"], weight_col < weight_params["light_max"]
+        else:
+            heavy = light = np.zeros(m, dtype=bool)
+        self._any_heavy = _reduce_blocks(np.add, heavy, starts) > 0
+        self._any_light = _reduce_blocks(np.add, light, starts) > 0
+        self._tables = {spec.name: _aspect_table(spec) for spec in model.aspects}
+        logger.debug(f"Indexed {m} shirts in {len(starts)} blocks for model '{model.name}'")
+
+    def __len__(self):
+        return len(self.shirts)
+
+    def _aspect_bound(self, name, body_val):
+        """
+        Best score of aspect `name` any shirt in each block can get, and the
+        bucket reachable at each probe, shapes (n_blocks,) and (n_blocks, n_probes).
+        """
+        spec = self._ranged[name]
+        lo, hi, has_missing = self._ranges[name]
+        offsets = np.asarray(_BREAKPOINTS[spec.scorer_name](spec.params), dtype=float)
+        probes = np.concatenate([offsets, offsets - _EPS]) + body_val
+        # Range ends plus every breakpoint clipped into the range: the sup of a
+        # piecewise linear function over an interval is attained at one of them,
+        # and every branch the range reaches fires at one of them.
+        points = np.concatenate(
+            [lo[:, None], hi[:, None], np.clip(probes[None, :], lo[:, None], hi[:, None])], axis=1
+        )
+        scores, buckets, _, _ = spec.batch_scorer(body_val, points, spec.params)
+        best = scores.max(axis=1)
+        return np.where(has_missing, np.maximum(best, 50), best), buckets
+
+    def _possible_tags(self, group, reached):
+        """Per block: can any aspect tag a shirt with a tag from `group`?"""
+        tags = _TAG_GROUPS[group]
+        possible = np.zeros(len(self._starts), dtype=bool)
+        for name, table in self._tables.items():
+            codes = [i for i, (tag, _) in enumerate(table) if tag in tags]
+            if not codes:
+                continue
+            if name in reached:
+                possible |= np.isin(reached[name], codes).any(axis=1)
+            else:
+                possible[:] = True
+        return possible
+
+    def block_bounds(self, body):
+        """
+        Upper bounds for `body` on each block's best (FitScore, Confidence), plus the
+        block's first catalog position: no shirt in block b ranks above
+        (score[b], confidence[b], position[b]).
+        """
+        model = self.model
+        n_blocks = len(self._starts)
+        unbounded = (np.full(n_blocks, np.inf), np.full(n_blocks, np.inf), np.zeros(n_blocks))
+        if model.total_weight <= 0 or any(w < 0 for w in model.weights.values()):
+            return unbounded
+        weighted = np.zeros(n_blocks)
+        reached = {}
+        for spec in model.aspects:
+            if spec.name in self._ranged:
+                best, reached[spec.name] = self._aspect_bound(spec.name, _body_value(body, spec.body_field))
+            elif spec.name in self._fixed_best:
+                best = self._fixed_best[spec.name]
+            elif spec.scorer_name in _SCORE_CEILINGS:
+                best = _SCORE_CEILINGS[spec.scorer_name](spec.params)
+            else:
+                return unbounded
+            weighted = weighted + best * spec.weight
+        # rint(x) <= floor(x + 0.5), with slack for float error in the bound itself
+        unadjusted = np.floor(weighted / model.total_weight + 0.5 + _SLACK)
+
+        adjustments = model.interaction_adjustments
+        oversized = self._possible_tags("oversized", reached)
+        bonus = (
+            np.where(oversized & self._any_heavy, max(0, adjustments["oversized_heavy_bonus"]), 0)
+            + np.where(oversized & self._any_light, max(0, -adjustments["oversized_light_penalty"]), 0)
+            + np.where(self._possible_tags("relaxed", reached) & self._any_heavy,
+                       max(0, adjustments["relaxed_heavy_bonus"]), 0)
+            + np.where(self._possible_tags("slim", reached) & self._any_light,
+                       max(0, -adjustments["slim_light_penalty"]), 0)
+        )
+        # Adjusted scores are clipped to 100; unadjusted ones (< 2 aspects or no weight) are not
+        score = np.minimum(unadjusted + bonus, np.maximum(unadjusted, 100.0))
+        return score, self._confidence_bound, self._min_position
+
+    def _block_rows(self, blocks):
+        """Row numbers (in index order) of `blocks`, and which of `blocks` each row is in."""
+        m = len(self)
+        starts = self._starts[blocks]
+        sizes = np.minimum(starts + self.block_size, m) - starts
+        rows = np.concatenate([np.arange(start, start + size) for start, size in zip(starts, sizes)])
+        return rows, np.repeat(np.arange(len(blocks)), sizes)
+
+    def _ranked(self, body, k):
+        """Catalog positions of the best `k` shirts for `body`, best first."""
+        model = self.model
+        k = min(k, len(self))
+        self.stats["queries"] += 1
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        body_cols = {field: _body_value(body, field) for field in model.body_fields}
+        score_ub, conf_ub, first_pos = self.block_bounds(body)
+        # Most promising blocks first, in the same order top_k_fits ranks shirts
+        block_order = np.lexsort((first_pos, -conf_ub, -score_ub))
+        # Start small so a good K-th best is known early, then grow to SCAN_ROWS per call
+        per_scan, max_scan = 1, max(1, SCAN_ROWS // self.block_size)
+
+        ranking = np.empty(0)
+        confidence = np.empty(0)
+        positions = np.empty(0, dtype=np.int64)
+        i = 0
+        while i < len(block_order):
+            blocks = block_order[i:i + per_scan]
+            i += len(blocks)
+            per_scan = min(2 * per_scan, max_scan)
+            if len(positions) < k:
+                rows, _ = self._block_rows(blocks)
+            else:
+                # A block is done for once its bound ranks below the K-th best; since
+                # blocks are visited in bound order, so is every block after it.
+                kth_score, kth_conf, kth_pos = ranking[-1], confidence[-1], positions[-1]
+                beats = (score_ub[blocks] > kth_score) | (
+                    (score_ub[blocks] == kth_score) & (conf_ub[blocks] > kth_conf)
+                )
+                ties = (score_ub[blocks] == kth_score) & (conf_ub[blocks] == kth_conf)
+                alive = beats | (ties & (first_pos[blocks] < kth_pos))
+                if not alive.all():
+                    i = len(block_order)
+                    blocks, beats = blocks[:np.argmin(alive)], beats[:np.argmin(alive)]
+                    if len(blocks) == 0:
+                        break
+                rows, owner = self._block_rows(blocks)
+                # Where a block can at best tie, only shirts listed before the K-th
+                # best can still win the tie-break
+                rows = rows[beats[owner] | (self._order[rows] < kth_pos)]
+            result = _score_arrays(body_cols, {f: col[rows] for f, col in self._cols.items()}, model)
+            self.stats["shirts_scored"] += len(rows)
+            ranking = np.concatenate([ranking, np.where(result["present"] > 0, result["fit_score"], -1.0)])
+            confidence = np.concatenate([confidence, result["confidence"]])
+            positions = np.concatenate([positions, self._order[rows]])
+            # Same order as top_k_fits: score, then confidence, then catalog position
+            keep = np.lexsort((positions, -confidence, -ranking))[:k]
+            ranking, confidence, positions = ranking[keep], confidence[keep], positions[keep]
+        return positions
+
+    def top_k(self, body, k=10, rationale=True):
+        """
+        Best `k` shirts for one body (dict of measurements), best first.
+
+        Returns:
+            pd.DataFrame: ShirtName, FitScore, Confidence, Tags (list) and, unless
+                `rationale=False`, Rationale; indexed like the catalog.
+        """
+        positions = self._ranked(body, k)
+        winners = self.shirts.iloc[positions]
+        frame = score_fit_records(body, winners, self.model).to_frame(rationale=rationale)
+        if "ShirtName" in winners.columns:
+            names = winners["ShirtName"].tolist()
+        else:
+            names = [f"Shirt_{idx}" for idx in winners.index]
+        frame.insert(0, "ShirtName", names)
+        return frame
+
+    def top_k_fits(self, bodies, k=10, rationale=True):
+        """Index-backed `batch.top_k_fits`: same columns, rows and order."""
+        columns = TOP_K_COLUMNS if rationale else TOP_K_COLUMNS[:-1]
+        body_ids = bodies["BodyId"].tolist() if "BodyId" in bodies.columns else bodies.index.tolist()
+        rows = []
+        for body_id, body in zip(body_ids, bodies.to_dict(orient="records")):
+            frame = self.top_k(body, k, rationale)
+            for rank, rec in enumerate(frame.to_dict(orient="records"), start=1):
+                rec["Tags"] = "; ".join(rec["Tags"])
+                rows.append({"BodyId": body_id, "Rank": rank, **rec})
+        return pd.DataFrame(rows, columns=columns)
+
+    @property
+    def scored_fraction(self):
+        """Average share of the catalog scored per query so far."""
+        if not self.stats["queries"] or not len(self):
+            return 0.0
+        return self.stats["shirts_scored"] / (self.stats["queries"] * len(self))
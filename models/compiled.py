@@ -0,0 +1,194 @@
+# compiled.py
+"""
+Immutable, pre-resolved form of a (possibly style-merged) model config.
+
+`compile_model(config)` is done once per config; the resulting `CompiledFitModel`
+holds the resolved scorers (see `registry`) with their inputs, required inputs
+and evaluation order, weights and frozen per-aspect params, and is
+passed explicitly to `score_fit` / `score_fit_batch`. Nothing here touches module
+globals, so several models (core, styles, ...) can be used side by side or shared
+across threads.
+"""
+
+from dataclasses import dataclass
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional, Tuple
+import numpy as np
+
+from utils.config_loader import freeze_config as freeze
+from .registry import SCORERS, SCORER_FUNCS, BATCH_SCORER_FUNCS, parse_input, required_inputs
+
+
+@dataclass(frozen=True)
+class AspectSpec:
+    name: str
+    scorer_name: str
+    scorer: Callable
+    batch_scorer: Callable
+    body_field: Optional[str]
+    shirt_field: Optional[str]
+    weight: float
+    needs_chest: bool
+    params: Mapping[str, Any]
+    # Resolved scorer inputs in argument order: ("body" | "shirt", field) or ("score", aspect)
+    inputs: Tuple[Tuple[str, Optional[str]], ...] = ()
+    depends_on: Tuple[str, ...] = ()  # aspects whose scores the scorer reads
+    # Alternatives of argument positions that must all be present for the aspect to be scored
+    requires: Tuple[Tuple[int, ...], ...] = ()
+
+
+@dataclass(frozen=True)
+class CompiledFitModel:
+    name: str
+    aspects: Tuple[AspectSpec, ...]
+    weights: Mapping[str, float]
+    normalized_weights: Mapping[str, float]
+    total_weight: float
+    scoring_params: Mapping[str, Any]
+    interaction_adjustments: Mapping[str, Any]
+    projection_config: Mapping[str, Any]
+    order: Tuple[int, ...] = ()  # evaluation order (indices into `aspects`), dependencies first
+
+    @cached_property
+    def value_plan(self):
+        """
+        How `score_fit` reads a body and shirt: (readers, spans, weight_at). `readers`
+        lists every scorer input of every aspect as (0 = body | 1 = shirt | -1 = none or
+        score input, field); aspect i's scorer arguments are values[spans[i][0]:spans[i][1]];
+        values[weight_at] is the shirt weight the interaction adjustments read.
+        """
+        readers, spans, weight_at = [], [], None
+        for spec in self.aspects:
+            start = len(readers)
+            for source, field in spec.inputs:
+                if spec.name == "weight" and (source, field) == ("shirt", spec.shirt_field):
+                    weight_at = len(readers)
+                readers.append((("body", "shirt").index(source) if source != "score" and field else -1, field))
+            spans.append((start, len(readers)))
+        return tuple(readers), tuple(spans), weight_at
+
+    @cached_property
+    def weight_field(self):
+        """Shirt column the interaction adjustments read (`value_plan`'s weight_at), or None."""
+        readers, _, weight_at = self.value_plan
+        return readers[weight_at][1] if weight_at is not None else None
+
+    @cached_property
+    def no_data_tables(self):
+        """
+        Per aspect, the table its batch scorer returns when every input is missing;
+        the last entry is the no-data bucket given to aspects that cannot be scored.
+        """
+        tables = []
+        for spec in self.aspects:
+            missing = [np.full(1, np.nan)] * len(spec.inputs)
+            tables.append(tuple(spec.batch_scorer(*missing, spec.params)[3]))
+        return tuple(tables)
+
+    @cached_property
+    def no_data_results(self):
+        """Per aspect, the scalar (score, tag, rationale) of an aspect that cannot be scored."""
+        return tuple((50, *table[-1]) for table in self.no_data_tables)
+
+    @property
+    def evaluation_order(self):
+        """Aspects in the order they are scored: every aspect after the ones it reads."""
+        return tuple(self.aspects[i] for i in self.order) if self.order else self.aspects
+
+    @property
+    def aspect_names(self):
+        return [spec.name for spec in self.aspects]
+
+    @property
+    def aspect_count(self):
+        return len(self.aspects)
+
+    @property
+    def shirt_fields(self):
+        """Shirt columns read by this model (ChestWidth is always read for ratios)."""
+        return {"ChestWidth"} | {
+            field for spec in self.aspects for source, field in spec.inputs if source == "shirt" and field
+        }
+
+    @property
+    def body_fields(self):
+        """Body measurements read by this model."""
+        return {field for spec in self.aspects for source, field in spec.inputs if source == "body" and field}
+
+    def aspect(self, name):
+        for spec in self.aspects:
+            if spec.name == name:
+                return spec
+        raise KeyError(name)
+
+
+def compile_model(config, name="core"):
+    """
+    Builds a CompiledFitModel from a loaded (and optionally style-merged) config dict.
+    The config is deep-copied and frozen; later edits to `config` do not leak in.
+    """
+    scoring_params = freeze(config.get("scoring_params") or {})
+    specs = []
+    for aspect, aspect_cfg in config["aspects"].items():
+        scorer_name = aspect_cfg["scorer"]
+        if scorer_name not in SCORERS:
+            raise ValueError(f"Unknown scorer '{scorer_name}' for aspect '{aspect}'")
+        scorer = SCORERS[scorer_name]
+        fields = {"body": aspect_cfg.get("body_field"), "shirt": aspect_cfg.get("shirt_field")}
+        inputs = []
+        for source, field in map(parse_input, scorer.inputs):
+            inputs.append((source, field if field is not None else fields[source]))
+        params = scoring_params.get(aspect, MappingProxyType({}))
+        specs.append(AspectSpec(
+            name=aspect,
+            scorer_name=scorer_name,
+            scorer=scorer.scalar,
+            batch_scorer=scorer.batch,
+            body_field=fields["body"],
+            shirt_field=fields["shirt"],
+            weight=aspect_cfg["weight"],
+            needs_chest="shirt:ChestWidth" in scorer.inputs,
+            params=params,
+            inputs=tuple(inputs),
+            depends_on=tuple(field for source, field in inputs if source == "score"),
+            requires=required_inputs(scorer, params),
+        ))
+
+    weights = {spec.name: spec.weight for spec in specs}
+    # Same summation order score_fit has always used
+    total_weight = sum(weights[spec.name] for spec in specs)
+    normalized = {k: (w / total_weight if total_weight else 0.0) for k, w in weights.items()}
+
+    return CompiledFitModel(
+        name=name,
+        aspects=tuple(specs),
+        weights=MappingProxyType(weights),
+        normalized_weights=MappingProxyType(normalized),
+        total_weight=total_weight,
+        scoring_params=scoring_params,
+        interaction_adjustments=freeze(config.get("interaction_adjustments") or {}),
+        projection_config=freeze(config.get("projection_config") or {}),
+        order=_evaluation_order(specs),
+    )
+
+
+def _evaluation_order(specs):
+    """
+    Indices of `specs` with every aspect after the aspects it depends on, otherwise
+    in config order. Raises ValueError on unknown or circular dependencies.
+    """
+    index = {spec.name: i for i, spec in enumerate(specs)}
+    for spec in specs:
+        for dep in spec.depends_on:
+            if dep not in index:
+                raise ValueError(f"Aspect '{spec.name}' reads the score of unknown aspect '{dep}'")
+    order, done = [], set()
+    while len(order) < len(specs):
+        ready = [i for i, spec in enumerate(specs) if i not in done and all(index[d] in done for d in spec.depends_on)]
+        if not ready:
+            cycle = sorted(spec.name for i, spec in enumerate(specs) if i not in done)
+            raise ValueError(f"Aspects {cycle} depend on each other's scores")
+        order.append(ready[0])
+        done.add(ready[0])
+    return tuple(order)
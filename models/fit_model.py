@@ -2,35 +2,70 @@
 
 import math
 import logging
+from pathlib import Path
 from .scorers import *
+from .compiled import CompiledFitModel, compile_model, SCORER_FUNCS
+from .registry import register_scorer
 from utils.config_loader import load_model_config
 
-MODEL_CONFIG = load_model_config()
-ASPECTS = list(MODEL_CONFIG["aspects"].keys())
-SCORING_PARAMS = MODEL_CONFIG["scoring_params"]
-INTERACTION_ADJUSTMENTS = MODEL_CONFIG["interaction_adjustments"]
-PROJECTION_CONFIG = MODEL_CONFIG["projection_config"]
-
-# Extract aspect weights from the config, defaulting to 1 if not present
-WEIGHTS = {k: v["weight"] for k, v in MODEL_CONFIG["aspects"].items()}
-
-# Reconstruct ASPECT_SCORERS using config
-ASPECT_SCORERS = {
-    aspect: {
-        "scorer": aspect_cfg["scorer"],
-        "body_field": aspect_cfg["body_field"],
-        "shirt_field": aspect_cfg["shirt_field"],
-        "weight": aspect_cfg["weight"],
-        "params": MODEL_CONFIG["scoring_params"].get(aspect, {}),
+# Repo root, so the default config is found regardless of the working directory
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# The default (core) model is loaded on first use, not at import time.
+_DEFAULT_MODEL = None
+
+
+def get_default_model():
+    """
+    Returns the core CompiledFitModel, loading `config/model_config.yaml` on first use.
+    """
+    global _DEFAULT_MODEL
+    if _DEFAULT_MODEL is None:
+        _DEFAULT_MODEL = compile_model(load_model_config(config_dir=ROOT_DIR, frozen=True))
+    return _DEFAULT_MODEL
+
+
+def reset_default_model():
+    """Forgets the loaded default model; the next use reloads the config."""
+    global _DEFAULT_MODEL
+    _DEFAULT_MODEL = None
+
+
+def _aspect_scorers_view(model):
+    return {
+        spec.name: {
+            "scorer": spec.scorer_name,
+            "body_field": spec.body_field,
+            "shirt_field": spec.shirt_field,
+            "weight": spec.weight,
+            "params": spec.params,
+        }
+        for spec in model.aspects
     }
-    for aspect, aspect_cfg in MODEL_CONFIG["aspects"].items()
-}
 
-ASPECTS_NEED_CHEST = {
-    aspect for aspect, cfg in MODEL_CONFIG["aspects"].items()
-    if cfg.get("needs_chest", False)
+
+# Read-only views of the default model, kept for existing callers and resolved
+# lazily through module __getattr__. Scoring never reads these; pass a
+# CompiledFitModel to use another config.
+_LEGACY_VIEWS = {
+    "DEFAULT_MODEL": lambda m: m,
+    "MODEL_CONFIG": lambda m: load_model_config(config_dir=ROOT_DIR, frozen=True),
+    "ASPECTS": lambda m: m.aspect_names,
+    "SCORING_PARAMS": lambda m: m.scoring_params,
+    "INTERACTION_ADJUSTMENTS": lambda m: m.interaction_adjustments,
+    "PROJECTION_CONFIG": lambda m: m.projection_config,
+    "WEIGHTS": lambda m: m.weights,
+    "ASPECTS_NEED_CHEST": lambda m: {spec.name for spec in m.aspects if spec.needs_chest},
+    "ASPECT_SCORERS": _aspect_scorers_view,
 }
 
+
+def __getattr__(name):
+    if name in _LEGACY_VIEWS:
+        return _LEGACY_VIEWS[name](get_default_model())
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 logger = logging.getLogger(__name__)
 
 """
@@ -71,24 +106,41 @@ def filter_tags(tags, min_aspects, aspect_present):
     return [t for t in tags if t] if aspect_present >= min_aspects else []
 
 
-SCORER_FUNCS = {
-    "score_chest": score_chest,
-    "score_shoulder": score_shoulder,
-    "score_length": score_length,
-    "score_hem": score_hem,
-    "score_sleeve": score_sleeve,
-    "score_weight": score_weight,
-}
+def _has_inputs(requires, args):
+    """True if every argument of at least one `requires` alternative is present."""
+    for alternative in requires:
+        for i in alternative:
+            if args[i] is None:
+                break
+        else:
+            return True
+    return False
+
+
+def _count_missing(model, values, missing):
+    _, spans, _ = model.value_plan
+    for spec, (start, stop) in zip(model.aspects, spans):
+        if not _has_inputs(spec.requires, values[start:stop]):
+            missing[spec.name] += 1
+
+
+def _aspect_args(spec, values, scores):
+    """Scorer arguments: `values` with the scores of the aspects `spec` depends on filled in."""
+    return tuple(scores[name] if source == "score" else value for (source, name), value in zip(spec.inputs, values))
 
 
 # --- Main Fit/Projection Functions ---
-def score_fit(body, shirt):
+def score_fit(body, shirt, model=None, memo=None, missing=None):
     """
     Calculates overall t-shirt fit score for a given body and shirt profile.
 
     Args:
         body (dict): Body measurement data, with expected fields.
         shirt (dict): Shirt measurement data, with expected fields.
+        model (CompiledFitModel): Model to score with; defaults to get_default_model().
+        memo (ScoreMemo): Optional cache of results and per-aspect scores, shared across calls.
+        missing (collections.Counter): Optional; counts, per aspect name, the aspects
+            that could not be scored for missing inputs (instead of a warning each).
 
     Returns:
         dict: {
@@ -98,44 +150,72 @@ def score_fit(body, shirt):
             "Rationale": str
         }
     """
+    if model is None:
+        model = get_default_model()
     logger.debug(f"Scoring fit for shirt: {shirt.get('ShirtName', '[unnamed]')}")
+    readers, _, _ = model.value_plan
+    sources = (body, shirt)
+    values = tuple([get_val(sources[source].get(field)) if source >= 0 else None for source, field in readers])
+    if missing is not None:
+        _count_missing(model, values, missing)
+    if memo is None:
+        return _score_values(model, values)
+    # The result depends only on the values the model reads
+    key = (memo.model_id(model), "fit", values)
+    result = memo.get(key)
+    if result is None:
+        result = _score_values(model, values, memo)
+        memo.put(key, result)
+    return {**result, "Tags": list(result["Tags"])}
+
+
+def _score_values(model, values, memo=None):
     scores, tags, rationale_parts, missing = {}, [], [], []
     aspect_present = 0
-    aspect_count = len(ASPECTS)
-
-    for aspect, config in ASPECT_SCORERS.items():
-        body_field = config["body_field"]
-        shirt_field = config["shirt_field"]
-        body_val = get_val(body.get(body_field)) if body_field else None
-        shirt_val = get_val(shirt.get(shirt_field)) if shirt_field else None
-        scorer_fn = SCORER_FUNCS[config["scorer"]]
-        if aspect in ASPECTS_NEED_CHEST:
-            # Always pass shirt_chest as third arg
-            shirt_chest_val = get_val(shirt.get("ChestWidth"))
-            score, tag, rationale = scorer_fn(body_val, shirt_val, shirt_chest_val)
-        elif aspect == "weight":
-            score, tag, rationale = scorer_fn(shirt_val, scores, ASPECTS)
+    aspect_count = model.aspect_count
+    aspect_names = model.aspect_names
+    model_id = memo.model_id(model) if memo is not None else None
+
+    _, spans, weight_at = model.value_plan
+    no_data = model.no_data_results
+
+    # Scored dependencies first (model.order), recorded in config order; aspects
+    # without their required inputs get the no-data result without calling the scorer
+    results, by_name = [None] * aspect_count, {}
+    for i in model.order or range(aspect_count):
+        spec = model.aspects[i]
+        start, stop = spans[i]
+        args = values[start:stop] if not spec.depends_on else _aspect_args(spec, values[start:stop], by_name)
+        if not _has_inputs(spec.requires, args):
+            result = no_data[i]
+        elif memo is None:
+            result = spec.scorer(*args, spec.params)
         else:
-            score, tag, rationale = scorer_fn(body_val, shirt_val)
-        record_aspect(scores, tags, rationale_parts, missing, aspect, score, tag, rationale)
+            key = (model_id, spec.name, args)
+            result = memo.get(key)
+            if result is None:
+                result = spec.scorer(*args, spec.params)
+                memo.put(key, result)
+        results[i] = result
+        by_name[spec.name] = result[0]
+
+    for spec, (score, tag, rationale) in zip(model.aspects, results):
+        record_aspect(scores, tags, rationale_parts, missing, spec.name, score, tag, rationale)
         if score != 50:
             aspect_present += 1
 
     # --- Final calculation ---
     fit_score = round(
-        sum(scores[aspect] * WEIGHTS[aspect] for aspect in ASPECTS)
-        / sum(WEIGHTS[aspect] for aspect in ASPECTS)
+        sum(scores[aspect] * model.weights[aspect] for aspect in aspect_names)
+        / model.total_weight
     )
 
-    # Get shirt_weight for adjustments (find from shirt or from scores, as in aspect loop)
-    # Best option: get directly from the shirt dict using your aspect config:
-    weight_aspect = "weight"
-    weight_field = ASPECT_SCORERS[weight_aspect]["shirt_field"]
-    shirt_weight = get_val(shirt.get(weight_field)) if weight_field else None
+    # Get shirt_weight for adjustments from the weight aspect's shirt value
+    shirt_weight = values[weight_at] if weight_at is not None else None
 
     # Oversize & Weight Adjustments
     if aspect_present >= 2:
-        fit_score = adjust_for_oversize_weight(tags, shirt_weight, fit_score)
+        fit_score = adjust_for_oversize_weight(tags, shirt_weight, fit_score, model)
 
     confidence = calc_confidence(aspect_present, aspect_count)
     tags = filter_tags(tags, 2, aspect_present)
@@ -156,13 +236,22 @@ def score_fit(body, shirt):
     }
 
 
-def bulk_projection_profile(body):
+def bulk_projection_profile(body, model=None, memo=None):
     """
     Returns a projected bulked-up body profile based on the provided body measurements.
+    With `memo` (a ScoreMemo), repeated bodies reuse the cached projection.
     """
+    if model is None:
+        model = get_default_model()
+    if memo is not None:
+        return memo.projection(model, body, lambda: _project_body(body, model))
+    return _project_body(body, model)
+
+
+def _project_body(body, model):
     logger.debug(f"Generating bulk profile projection from: {body}")
     new_body = body.copy()
-    for field, inc in PROJECTION_CONFIG["increments"].items():
+    for field, inc in model.projection_config["increments"].items():
         if field in new_body and inc:
             new_body[field] = float(new_body[field]) + inc
     return new_body
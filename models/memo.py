@@ -0,0 +1,108 @@
+# memo.py
+"""
+LRU memo for fit scores and projected bodies.
+
+Catalogs repeat the same garment measurements across colorways and sizes, and
+bodies share values, so `score_fit` keeps re-running the same scorers on the same
+inputs. With `score_fit(..., memo=memo)` two kinds of entries are cached:
+
+- the whole result, keyed on (model, every body/shirt value the model reads), so a
+  repeated (body, shirt) pair costs one lookup;
+- each aspect's (score, tag, rationale), keyed on (model, aspect, body value,
+  shirt value, shirt chest), with the chest only for aspects that read it, so a
+  shirt that repeats only some measurements still skips those scorers.
+
+`bulk_projection_profile(..., memo=memo)` caches projected bodies the same way.
+The memo holds at most `maxsize` entries and evicts the least recently used.
+
+Models are told apart by content (`utils.fingerprint.model_fingerprint`), so
+recompiling the same config reuses its entries. The fingerprint is computed once
+per model object and held through a weak reference, so the memo does not keep
+models alive. Lookups and counters are safe to share across threads.
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from utils.fingerprint import model_fingerprint
+
+DEFAULT_MAXSIZE = 100_000
+
+
+class ScoreMemo:
+    """Bounded LRU cache of scorer results with hit/miss/eviction counters."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be at least 1, got {maxsize}")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def model_id(self, model):
+        """Key prefix for `model`: its fingerprint, computed once while the model is alive."""
+        entry = self._models.get(id(model))
+        if entry is None or entry[0]() is not model:
+            entry = (weakref.ref(model, self._forget), model_fingerprint(model))
+            self._models[id(model)] = entry
+        return entry[1]
+
+    def _forget(self, ref):
+        # The model was collected, so its id may be reused. No lock: this can run
+        # from garbage collection in a thread that already holds it.
+        for model_id, (model_ref, _) in list(self._models.items()):
+            if model_ref is ref:
+                self._models.pop(model_id, None)
+
+    def get(self, key):
+        """Cached value for `key` (marked most recently used), or None."""
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def projection(self, model, body, compute):
+        """Projected body for `body`; `compute()` runs on a miss. Returns a fresh dict."""
+        key = (self.model_id(model), "projection", tuple(sorted(body.items())))
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return dict(value)
+
+    def clear(self):
+        """Drops every entry and cached fingerprint; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._models.clear()
+
+    @property
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
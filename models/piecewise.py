@@ -0,0 +1,262 @@
+# piecewise.py
+"""
+Aspect scorers compiled into piecewise lookup tables.
+
+Every scorer in `scorers.py` is a first-match chain of `if diff < threshold`
+branches, each returning a constant or a linear function of the diff. A
+`PiecewiseTable` holds that chain as sorted breakpoints plus one `Piece` per
+bucket, so looking a diff up is a binary search (`bisect` for a float,
+`np.searchsorted` for an array) and one multiply-add:
+
+    score = max(floor, intercept + slope * (diff - origin))
+
+Tables are bit-identical to the chains they replace:
+
+- breakpoints are the running maximum of the chain's thresholds, so a config
+  listing them out of order still picks the first branch that would fire;
+- each linear piece keeps its branch's operands (`85 - (d - o) * p` becomes
+  intercept 85, slope -p, origin o; negation is exact), and constant pieces
+  return their config value untouched.
+
+The multiply and the add are rounded separately, as in the chains; a fused
+multiply-add would round once and could move a score by one ulp.
+
+Tables are compiled once per frozen params mapping (`CompiledFitModel.
+scoring_params`) and cached; plain dicts are compiled on every call.
+"""
+
+import re
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from string import Formatter
+from types import MappingProxyType
+from typing import Any, NamedTuple, Optional, Tuple
+import numpy as np
+
+
+class Piece(NamedTuple):
+    intercept: Any
+    slope: Any = None  # None: a constant piece
+    origin: Any = 0
+    floor: Optional[Any] = None
+    tag: Optional[str] = None
+    template: str = ""
+
+
+_PRINTF_SPEC = re.compile(r"[-+ #0]*\d*(\.\d+)?[eEfFgG]")
+
+
+def _printf_template(template):
+    """
+    (rationale, formatted) for the scalar path: a `{diff:<spec>}` template as the
+    equivalent %-format string (`rationale % d`), or a template without a field as
+    its literal text.
+    """
+    parts, formatted = [], False
+    for literal, name, spec, _ in Formatter().parse(template):
+        parts.append(literal.replace("%", "%%"))
+        if name is not None:
+            if name != "diff" or formatted or not _PRINTF_SPEC.fullmatch(spec):
+                raise ValueError(f"Rationale template needs at most one {{diff:<float spec>}} field: {template!r}")
+            parts.append("%" + spec)
+            formatted = True
+    rationale = "".join(parts)
+    return (rationale, True) if formatted else (rationale.replace("%%", "%"), False)
+
+
+@dataclass(frozen=True, eq=False)
+class PiecewiseTable:
+    thresholds: Tuple[float, ...]  # running max of the chain's thresholds
+    pieces: Tuple[Piece, ...]  # len(thresholds) + 1 buckets
+    table: Tuple[Tuple[Optional[str], str], ...] = field(init=False)  # bucket -> (tag, rationale template)
+    _breaks: np.ndarray = field(init=False, repr=False)
+    _intercepts: np.ndarray = field(init=False, repr=False)
+    _slopes: np.ndarray = field(init=False, repr=False)
+    _origins: np.ndarray = field(init=False, repr=False)
+    _floors: Optional[np.ndarray] = field(init=False, repr=False)
+    _scalar: Tuple[tuple, ...] = field(init=False, repr=False)  # per bucket: piece values, %-rationale
+
+    def __post_init__(self):
+        if len(self.pieces) != len(self.thresholds) + 1:
+            raise ValueError(f"Piecewise table needs {len(self.thresholds) + 1} pieces, got {len(self.pieces)}")
+        set_ = object.__setattr__
+        set_(self, "table", tuple((piece.tag, piece.template) for piece in self.pieces))
+        set_(self, "_scalar", tuple(piece[:5] + _printf_template(piece.template) for piece in self.pieces))
+        set_(self, "_breaks", np.array(self.thresholds, dtype=float))
+        set_(self, "_intercepts", np.array([piece.intercept for piece in self.pieces], dtype=float))
+        slopes = [0 if piece.slope is None else piece.slope for piece in self.pieces]
+        linear = any(piece.slope is not None for piece in self.pieces)
+        set_(self, "_slopes", np.array(slopes, dtype=float) if linear else None)
+        set_(self, "_origins", np.array([piece.origin for piece in self.pieces], dtype=float) if linear else None)
+        floors = [-np.inf if piece.floor is None else piece.floor for piece in self.pieces]
+        floored = any(piece.floor is not None for piece in self.pieces)
+        set_(self, "_floors", np.array(floors, dtype=float) if floored else None)
+
+    @classmethod
+    def from_chain(cls, thresholds, pieces):
+        """Table for the chain `if d < thresholds[i]: pieces[i]`, falling through to `pieces[-1]`."""
+        breaks = tuple(np.maximum.accumulate(np.array(thresholds, dtype=float)).tolist()) if thresholds else ()
+        return cls(breaks, tuple(pieces))
+
+    def bucket(self, d):
+        """Index of the piece a scalar diff falls in (NaN falls through to the last)."""
+        return bisect_right(self.thresholds, d)
+
+    def lookup(self, d):
+        """(score, tag, rationale) for one diff, as the if-chain returns them."""
+        intercept, slope, origin, floor, tag, rationale, formatted = self._scalar[bisect_right(self.thresholds, d)]
+        if slope is None:
+            score = intercept  # the config value, int or float
+        else:
+            score = intercept + slope * (d - origin)
+            if floor is not None and not score > floor:
+                score = floor  # as max(floor, score)
+        return score, tag, rationale % d if formatted else rationale
+
+    def evaluate(self, d):
+        """(float scores, int16 buckets) for an array of diffs (no NaNs)."""
+        buckets = np.searchsorted(self._breaks, d, side="right").astype(np.int16)
+        scores = self._intercepts[buckets]
+        if self._slopes is not None:
+            scores = scores + self._slopes[buckets] * (d - self._origins[buckets])
+        if self._floors is not None:
+            scores = np.maximum(self._floors[buckets], scores)
+        return scores, buckets
+
+
+_TABLES_LOCK = threading.Lock()
+
+
+def _compiled(build):
+    """Caches `build(params)` per frozen params mapping (pinned, so ids stay unique)."""
+    tables = {}
+
+    def table(params):
+        cached = tables.get(id(params))
+        if cached is not None and cached[0] is params:
+            return cached[1]
+        if not isinstance(params, MappingProxyType):
+            return build(params)
+        with _TABLES_LOCK:
+            tables[id(params)] = cached = (params, build(params))
+        return cached[1]
+
+    table.__name__ = build.__name__
+    table.__doc__ = build.__doc__
+    return table
+
+
+@_compiled
+def chest_table(chest):
+    pen = chest["very_oversized_penalty"]
+    return PiecewiseTable.from_chain(
+        [-0.5, 0, 0.5, chest["relaxed_max"], chest["oversized_max"], chest["comically_oversized_max"]],
+        [
+            Piece(100, chest["too_tight_penalty"], 0, 0, "Too Tight", 'Chest: {diff:+.1f}" vs body (tight).'),
+            Piece(100, chest["slim_penalty"], 0, 0, "Slim Fit", 'Chest: {diff:+.1f}" vs body (slim).'),
+            Piece(100, template='Chest: {diff:+.1f}" vs body (close fit).'),
+            Piece(100, tag="Relaxed Fit", template='Chest: {diff:+.1f}" vs body (relaxed).'),
+            Piece(95, tag="Oversized", template='Chest: {diff:+.1f}" vs body (oversized).'),
+            Piece(85, -pen, chest["oversized_max"], None, "Very Oversized",
+                  'Chest: {diff:+.1f}" vs body (very oversized).'),
+            Piece(70, -pen, chest["comically_oversized_max"], None, "Comically Oversized",
+                  'Chest: {diff:+.1f}" vs body (comically oversized).'),
+        ],
+    )
+
+
+@_compiled
+def shoulder_table(shoulder):
+    return PiecewiseTable.from_chain(
+        [-0.5, 0.5, shoulder["drop_max"]],
+        [
+            Piece(100, shoulder["too_narrow_penalty"], 0, 0, "Shoulders Too Narrow",
+                  'Shoulder: {diff:+.1f}" vs body (too narrow).'),
+            Piece(100, template='Shoulder: {diff:+.1f}" vs body (fitted).'),
+            Piece(100, tag="Drop-Shoulder", template='Shoulder: {diff:+.1f}" vs body (drop-shoulder).'),
+            Piece(100, -shoulder["very_oversized_penalty"], shoulder["drop_max"], 60, "Very Oversized Shoulders",
+                  'Shoulder: {diff:+.1f}" vs body (very oversized).'),
+        ],
+    )
+
+
+@_compiled
+def length_table(length):
+    return PiecewiseTable.from_chain(
+        [length["cropped_min"], length["short_max"], length["ideal_max"], length["long_max"]],
+        [
+            Piece(50, tag="Cropped", template='Length: {diff:+.1f}" vs body (cropped).'),
+            Piece(70, tag="Short Length", template='Length: {diff:+.1f}" vs body (short).'),
+            Piece(100, template='Length: {diff:+.1f}" vs body (ideal).'),
+            Piece(90, template='Length: {diff:+.1f}" vs body (long).'),
+            Piece(length["very_long_penalty"], tag="Very Long", template='Length: {diff:+.1f}" vs body (very long).'),
+        ],
+    )
+
+
+def _escape(text):
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+@_compiled
+def length_ratio_table(length):
+    """Length / chest ratio fallback (see `scorers.score_by_ratio`); past the last bound, the last applies."""
+    bounds = length["fallback_ratio_bounds"]
+    return PiecewiseTable.from_chain(
+        [upper for upper, _, _, _ in bounds[:-1]],
+        [Piece(score, tag=tag, template=_escape(rationale)) for _, score, tag, rationale in bounds],
+    )
+
+
+@_compiled
+def hem_body_table(hem):
+    # 100 - abs(d) * p for d < 0 is 100 + d * p
+    return PiecewiseTable.from_chain(
+        [0, hem["flared_min"]],
+        [
+            Piece(100, hem["too_tight_penalty"], 0, 0, "Tight Waist", 'Hem: {diff:+.1f}" vs body.'),
+            Piece(100, template='Hem: {diff:+.1f}" vs body.'),
+            Piece(90, tag="Flared Hem", template='Hem: {diff:+.1f}" vs body.'),
+        ],
+    )
+
+
+@_compiled
+def hem_chest_table(hem):
+    box = hem["box_cut_max"]
+    return PiecewiseTable.from_chain(
+        [-box, box],
+        [
+            Piece(hem["tapered_penalty"], tag="Tapered Waist", template='Hem: {diff:+.1f}" vs chest.'),
+            Piece(100, tag="Boxy Cut", template='Hem: {diff:+.1f}" vs chest.'),
+            Piece(90, tag="Flared Hem", template='Hem: {diff:+.1f}" vs chest.'),
+        ],
+    )
+
+
+@_compiled
+def sleeve_table(sleeve):
+    return PiecewiseTable.from_chain(
+        [sleeve["cap_min"], sleeve["short_max"], sleeve["ideal_max"], sleeve["elbow_max"]],
+        [
+            Piece(sleeve["cap_score"], tag="Cap Sleeve", template='Sleeve: {diff:+.1f}" vs body (cap).'),
+            Piece(sleeve["short_score"], tag="Short Sleeve", template='Sleeve: {diff:+.1f}" vs body (short).'),
+            Piece(sleeve["ideal_score"], template='Sleeve: {diff:+.1f}" vs body (ideal).'),
+            Piece(sleeve["elbow_score"], template='Sleeve: {diff:+.1f}" vs body (long).'),
+            Piece(sleeve["elbow_score"], tag="Elbow Sleeve", template='Sleeve: {diff:+.1f}" vs body (elbow length).'),
+        ],
+    )
+
+
+@_compiled
+def weight_table(weight):
+    return PiecewiseTable.from_chain(
+        [weight["light_max"], weight["mid_max"], weight["heavy_max"]],
+        [
+            Piece(weight["light_score"], tag="Lightweight", template="Weight: {diff:.1f} oz (light)."),
+            Piece(weight["mid_score"], tag="Midweight", template="Weight: {diff:.1f} oz (midweight)."),
+            Piece(weight["heavy_score"], tag="Heavyweight", template="Weight: {diff:.1f} oz (heavyweight)."),
+            Piece(weight["very_heavy_score"], tag="Very Heavy", template="Weight: {diff:.1f} oz (very heavy)."),
+        ],
+    )
@@ -0,0 +1,177 @@
+# projections.py
+"""
+Growth / wear scenarios scored side by side with the core fit.
+
+A `Projection` moves the body (inches added per body field, e.g. after bulking
+up) and optionally the shirt (fractional shrinkage per shirt field, e.g. after a
+hot wash), and scales the confidence of its results by `confidence_mod`.
+Scenarios come from `config/projections/*.yaml` (one file may expand into a
+`sweep` of scenarios) or from a model's `projection_config` (the Bulk scenario).
+
+`score_projections` stacks every scenario body into (S, 1) columns and shrunk
+shirt fields into (S, m) columns, so all S scenarios are scored against the
+catalog in one `_score_arrays` pass; each scenario is then a `FitResults` view
+that renders exactly like `score_fit_records` on the projected body and shirts.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping
+import numpy as np
+import pandas as pd
+import models.fit_model as fit_model
+from utils.config_loader import load_projection_configs
+from .batch import AspectScores, FitResults, _body_value, _shirt_columns, _score_arrays
+
+logger = logging.getLogger(__name__)
+
+
+def column_label(name):
+    """CamelCase column prefix for a scenario or profile name: 'chest_sweep+2' -> 'ChestSweep+2'."""
+    return "".join(part[:1].upper() + part[1:] for part in re.split(r"[_\s]+", name))
+
+
+@dataclass(frozen=True)
+class Projection:
+    name: str
+    increments: Mapping[str, float]
+    shirt_shrinkage: Mapping[str, float] = field(default_factory=dict)
+    confidence_mod: float = 1.0
+    description: str = ""
+
+    def __post_init__(self):
+        object.__setattr__(self, "increments", MappingProxyType(dict(self.increments)))
+        object.__setattr__(self, "shirt_shrinkage", MappingProxyType(dict(self.shirt_shrinkage)))
+
+    def __reduce__(self):
+        # MappingProxyType does not pickle; rebuild from plain dicts (process pools)
+        return (Projection, (self.name, dict(self.increments), dict(self.shirt_shrinkage),
+                             self.confidence_mod, self.description))
+
+    @property
+    def label(self):
+        """Column prefix in evaluate output (see `column_label`)."""
+        return column_label(self.name)
+
+    def project_body(self, body):
+        """Copy of `body` with the increments added (fields the body lacks stay absent)."""
+        new_body = body.copy()
+        for name, inc in self.increments.items():
+            if name in new_body and inc:
+                new_body[name] = float(new_body[name]) + inc
+        return new_body
+
+    def project_shirts(self, shirts):
+        """Copy of the shirt table with shrinkage applied, or `shirts` itself when there is none."""
+        shrink = {name: s for name, s in self.shirt_shrinkage.items() if s and name in shirts.columns}
+        if not shrink:
+            return shirts
+        shirts = shirts.copy()
+        for name, s in shrink.items():
+            shirts[name] = pd.to_numeric(shirts[name], errors="coerce") * (1 - s)
+        return shirts
+
+
+def model_projection(model=None, name="bulk"):
+    """The projection described by a model's `projection_config` (the Bulk scenario)."""
+    if model is None:
+        model = fit_model.get_default_model()
+    config = model.projection_config
+    return Projection(
+        name=name,
+        increments=config.get("increments") or {},
+        confidence_mod=config.get("confidence_mod", 1.0),
+    )
+
+
+def projections_from_config(name, config):
+    """
+    Scenarios described by one projection config: a single Projection, or one per
+    `sweep` value (named e.g. 'chest_sweep-2', 'chest_sweep+1'), each adding the
+    swept amount on top of `increments`.
+    """
+    increments = dict(config.get("increments") or {})
+    common = {
+        "shirt_shrinkage": config.get("shirt_shrinkage") or {},
+        "confidence_mod": config.get("confidence_mod", 1.0),
+        "description": (config.get("description") or "").strip(),
+    }
+    sweep = config.get("sweep")
+    if not sweep:
+        return [Projection(name=name, increments=increments, **common)]
+    (swept, steps), = sweep.items()
+    return [
+        Projection(
+            name=f"{name}{step:+g}",
+            increments={**increments, swept: increments.get(swept, 0.0) + step},
+            **common,
+        )
+        for step in steps
+    ]
+
+
+def load_projections(config_dir=None, names=None):
+    """
+    Every scenario from `config/projections/`, or only those from the files in
+    `names`. Raises ValueError for an unknown name.
+    """
+    configs = load_projection_configs(config_dir)
+    if names is None:
+        names = list(configs)
+    unknown = [n for n in names if n not in configs]
+    if unknown:
+        raise ValueError(
+            f"Unknown projection(s) {', '.join(unknown)} (available: {', '.join(configs) or 'none'})"
+        )
+    projections = []
+    for name in names:
+        projections.extend(projections_from_config(name, configs[name]))
+    return projections
+
+
+def score_projections(body, shirts, projections, model=None):
+    """
+    Scores every scenario in `projections` against the shirt table in one pass.
+
+    Args:
+        body (dict): Body measurement data (before projection).
+        shirts (pd.DataFrame): One row per shirt.
+        projections (list of Projection): Scenarios to score.
+        model (CompiledFitModel): Model to score with; defaults to the core model.
+
+    Returns:
+        dict: {projection name: FitResults}, in `projections` order. Each matches
+            `score_fit_records(p.project_body(body), p.project_shirts(shirts), model)`
+            except that Confidence is scaled by the projection's `confidence_mod`.
+    """
+    if model is None:
+        model = fit_model.get_default_model()
+    if not projections:
+        return {}
+    logger.debug(f"Scoring {len(projections)} projections x {len(shirts)} shirts with model '{model.name}'")
+    body_cols = {}
+    for field in model.body_fields:
+        base = _body_value(body, field)
+        # Same float sum as Projection.project_body, NaN staying NaN
+        body_cols[field] = np.array([base + p.increments.get(field, 0.0) for p in projections])[:, None]
+    shirt_cols = _shirt_columns(shirts, model)
+    for name, col in shirt_cols.items():
+        if any(p.shirt_shrinkage.get(name) for p in projections):
+            shirt_cols[name] = np.stack([col * (1 - p.shirt_shrinkage.get(name, 0.0)) for p in projections])
+
+    arrays = _score_arrays(body_cols, shirt_cols, model)
+    results = {}
+    for s, projection in enumerate(projections):
+        scenario = {
+            "fit_score": arrays["fit_score"][s],
+            "present": arrays["present"][s],
+            "confidence": np.rint(arrays["confidence"][s] * projection.confidence_mod),
+            "per_aspect": [
+                AspectScores(rec.aspect, rec.scores[s], rec.buckets[s], rec.diffs[s], rec.table)
+                for rec in arrays["per_aspect"]
+            ],
+        }
+        results[projection.name] = FitResults(scenario, shirts.index)
+    return results
@@ -0,0 +1,137 @@
+# registry.py
+"""
+Registry of aspect scorers, by the name configs use (`aspects.<name>.scorer`).
+
+A scorer is registered once with a scalar and a vectorized implementation and
+the inputs it reads, in argument order:
+
+- "body" / "shirt": the aspect's configured `body_field` / `shirt_field`,
+- "body:<Field>" / "shirt:<Field>": a fixed field, e.g. "shirt:ChestWidth",
+- "score:<aspect>": the score of another aspect of the same model, which is
+  then always evaluated first.
+
+Both implementations take the input values followed by the aspect's params.
+The scalar one gets numbers or None and returns (score, tag, rationale); the
+batch one gets broadcastable float arrays (NaN = missing) and returns
+(scores, buckets, diffs, table) as described in `scorers.py`. `compile_model`
+resolves every aspect's inputs and evaluation order, so `score_fit` and all
+batch paths (`score_fit_batch`, `score_matrix`, style passes, projections,
+size charts) score a new aspect without per-row fallbacks.
+
+`requires` says when an aspect can be scored at all: alternatives, each a
+tuple of inputs that must all be present (default: every body/shirt input),
+or a function of the aspect's params returning them. Where no alternative is
+complete the scorer is not called; the aspect gets the no-data bucket of its
+table (score 50) and is counted as missing.
+"""
+
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, Tuple, Union
+from .scorers import (
+    score_chest, score_shoulder, score_length, score_hem, score_sleeve, score_weight,
+    score_chest_batch, score_shoulder_batch, score_length_batch, score_hem_batch,
+    score_sleeve_batch, score_weight_batch,
+)
+
+INPUT_SOURCES = ("body", "shirt", "score")
+
+
+@dataclass(frozen=True)
+class Scorer:
+    name: str
+    scalar: Callable
+    batch: Callable
+    inputs: Tuple[str, ...]
+    requires: Union[Tuple[Tuple[str, ...], ...], Callable, None] = None
+
+
+_SCORERS = {}
+_SCALAR = {}
+_BATCH = {}
+_LOCK = threading.Lock()
+
+# Live read-only views: name -> Scorer, and name -> scalar / batch callable
+SCORERS = MappingProxyType(_SCORERS)
+SCORER_FUNCS = MappingProxyType(_SCALAR)
+BATCH_SCORER_FUNCS = MappingProxyType(_BATCH)
+
+
+def parse_input(spec):
+    """("body" | "shirt" | "score", field or aspect name, or None for the aspect's own field)."""
+    source, _, name = spec.partition(":")
+    if source not in INPUT_SOURCES or (source == "score" and not name):
+        raise ValueError(
+            f"Invalid scorer input {spec!r}: use 'body', 'shirt', 'body:<Field>', 'shirt:<Field>' or 'score:<aspect>'"
+        )
+    return source, name or None
+
+
+def required_inputs(scorer, params):
+    """
+    `scorer.requires` for an aspect's params, as alternatives of argument positions.
+    Raises ValueError if an alternative names something other than a body/shirt input.
+    """
+    requires = scorer.requires(params) if callable(scorer.requires) else scorer.requires
+    if requires is None:
+        return (tuple(i for i, spec in enumerate(scorer.inputs) if parse_input(spec)[0] != "score"),)
+    alternatives = []
+    for alternative in requires:
+        if isinstance(alternative, str) or any(
+            spec not in scorer.inputs or parse_input(spec)[0] == "score" for spec in alternative
+        ):
+            raise ValueError(f"Scorer '{scorer.name}' requires {alternative!r}: not a body/shirt input of the scorer")
+        alternatives.append(tuple(scorer.inputs.index(spec) for spec in alternative))
+    return tuple(alternatives)
+
+
+def register_scorer(name, scalar, batch, inputs=("body", "shirt"), requires=None, replace=False):
+    """
+    Registers `scalar` and `batch` under `name` (see the module docstring for
+    `inputs` and `requires`); models compiled afterwards can use it. Raises
+    ValueError if the name is taken (unless `replace`) or an input is malformed.
+    """
+    inputs = tuple(inputs)
+    for spec in inputs:
+        parse_input(spec)
+    if requires is not None and not callable(requires):
+        requires = tuple(tuple(alternative) for alternative in requires)
+    scorer = Scorer(name, scalar, batch, inputs, requires)
+    if not callable(requires):
+        required_inputs(scorer, None)
+    with _LOCK:
+        if name in _SCORERS and not replace:
+            raise ValueError(f"Scorer '{name}' is already registered")
+        _SCORERS[name] = scorer
+        _SCALAR[name] = scalar
+        _BATCH[name] = batch
+    return scorer
+
+
+def get_scorer(name):
+    """The registered Scorer, or KeyError."""
+    return _SCORERS[name]
+
+
+def _score_weight(shirt_weight, params):
+    # score_weight keeps its legacy (weight, scores, aspects, params) signature
+    return score_weight(shirt_weight, None, None, params)
+
+
+def _length_requires(params):
+    # Without ratio bounds there is nothing to fall back on when the body length is missing
+    if params is not None and params.get("fallback_ratio_bounds"):
+        return ("body", "shirt"), ("shirt", "shirt:ChestWidth")
+    return (("body", "shirt"),)
+
+
+register_scorer("score_chest", score_chest, score_chest_batch)
+register_scorer("score_shoulder", score_shoulder, score_shoulder_batch)
+register_scorer("score_length", score_length, score_length_batch, inputs=("body", "shirt", "shirt:ChestWidth"),
+                requires=_length_requires)
+register_scorer("score_hem", score_hem, score_hem_batch, inputs=("body", "shirt", "shirt:ChestWidth"),
+                requires=(("body", "shirt"), ("shirt", "shirt:ChestWidth")))
+register_scorer("score_sleeve", score_sleeve, score_sleeve_batch, inputs=("body", "shirt", "shirt:ChestWidth"),
+                requires=(("body", "shirt"),))
+register_scorer("score_weight", _score_weight, score_weight_batch, inputs=("shirt",))
@@ -1,9 +1,30 @@
-import math
 import logging
+import numpy as np
+from .piecewise import (
+    chest_table, shoulder_table, length_table, length_ratio_table, hem_body_table, hem_chest_table,
+    sleeve_table, weight_table,
+)
 
 logger = logging.getLogger(__name__)
 
 
+# Resolved once on first use (fit_model imports this module, so not at top-level)
+_get_default_model = None
+
+
+def _default_model():
+    global _get_default_model
+    if _get_default_model is None:
+        from models.fit_model import get_default_model
+        _get_default_model = get_default_model
+    return _get_default_model()
+
+
+def _default_params(aspect):
+    """Scoring params for `aspect` from the default model (used when no params are passed)."""
+    return _default_model().scoring_params[aspect]
+
+
 def score_by_ratio(ratio, bounds):
     for upper, score, tag, rationale in bounds:
         if ratio < upper:
@@ -12,121 +33,184 @@ def score_by_ratio(ratio, bounds):
     return last[1], last[2], last[3]
 
 
-def score_chest(body_chest, shirt_chest):
-    # Dynamically import scoring params to avoid circular import at top-level
-    from models.fit_model import SCORING_PARAMS as _scoring_params
-    chest = _scoring_params["chest"]
+def score_chest(body_chest, shirt_chest, params=None):
+    chest = params if params is not None else _default_params("chest")
 
     if body_chest is not None and shirt_chest is not None:
-        chest_diff = shirt_chest - body_chest
-        if chest_diff < -0.5:
-            return (
-                max(0, 100 + chest_diff * chest["too_tight_penalty"]),
-                "Too Tight",
-                f'Chest: {chest_diff:+.1f}" vs body (tight).',
-            )
-        if chest_diff < 0:
-            return (
-                max(0, 100 + chest_diff * chest["slim_penalty"]),
-                "Slim Fit",
-                f'Chest: {chest_diff:+.1f}" vs body (slim).',
-            )
-        if chest_diff < 0.5:
-            return 100, None, f'Chest: {chest_diff:+.1f}" vs body (close fit).'
-        if chest_diff < chest["relaxed_max"]:
-            return 100, "Relaxed Fit", f'Chest: {chest_diff:+.1f}" vs body (relaxed).'
-        if chest_diff < chest["oversized_max"]:
-            return 95, "Oversized", f'Chest: {chest_diff:+.1f}" vs body (oversized).'
-        if chest_diff < chest["comically_oversized_max"]:
-            return (
-                85 - (chest_diff - chest["oversized_max"]) * chest["very_oversized_penalty"],
-                "Very Oversized",
-                f'Chest: {chest_diff:+.1f}" vs body (very oversized).',
-            )
-        return (
-            70 - (chest_diff - chest["comically_oversized_max"]) * chest["very_oversized_penalty"],
-            "Comically Oversized",
-            f'Chest: {chest_diff:+.1f}" vs body (comically oversized).',
-        )
-
-    logger.warning("Missing chest data for scoring.")
+        return chest_table(chest).lookup(shirt_chest - body_chest)
+
+    logger.debug("Missing chest data for scoring.")
     return 50, None, "[No chest data]"
 
 
-def score_shoulder(body_shoulder, shirt_shoulder):
-    from models.fit_model import SCORING_PARAMS as _scoring_params
-    shoulder = _scoring_params["shoulder"]
+def score_shoulder(body_shoulder, shirt_shoulder, params=None):
+    shoulder = params if params is not None else _default_params("shoulder")
 
     if body_shoulder is not None and shirt_shoulder is not None:
-        diff = shirt_shoulder - body_shoulder
-        if diff < -0.5:
-            return (
-                max(0, 100 + diff * shoulder["too_narrow_penalty"]),
-                "Shoulders Too Narrow",
-                f'Shoulder: {diff:+.1f}" vs body (too narrow).',
-            )
-        if diff < 0.5:
-            return 100, None, f'Shoulder: {diff:+.1f}" vs body (fitted).'
-        if diff < shoulder["drop_max"]:
-            return 100, "Drop-Shoulder", f'Shoulder: {diff:+.1f}" vs body (drop-shoulder).'
-        return (
-            max(60, 100 - (diff - shoulder["drop_max"]) * shoulder["very_oversized_penalty"]),
-            "Very Oversized Shoulders",
-            f'Shoulder: {diff:+.1f}" vs body (very oversized).',
-        )
-
-    logger.warning("Missing shoulder data for scoring.")
+        return shoulder_table(shoulder).lookup(shirt_shoulder - body_shoulder)
+
+    logger.debug("Missing shoulder data for scoring.")
     return 50, None, "[No shoulder data]"
 
 
-def score_length(body_length, shirt_length, shirt_chest):
-    from models.fit_model import SCORING_PARAMS as _scoring_params
-    length = _scoring_params["length"]
+def score_length(body_length, shirt_length, shirt_chest, params=None):
+    length = params if params is not None else _default_params("length")
 
     if body_length is not None and shirt_length is not None:
-        diff = shirt_length - body_length
-        if diff < length["cropped_min"]:
-            return 50, "Cropped", f'Length: {diff:+.1f}" vs body (cropped).'
-        if diff < length["short_max"]:
-            return 70, "Short Length", f'Length: {diff:+.1f}" vs body (short).'
-        if diff < length["ideal_max"]:
-            return 100, None, f'Length: {diff:+.1f}" vs body (ideal).'
-        if diff < length["long_max"]:
-            return 90, None, f'Length: {diff:+.1f}" vs body (long).'
-        return (
-            length["very_long_penalty"],
-            "Very Long",
-            f'Length: {diff:+.1f}" vs body (very long).',
-        )
-
-    elif shirt_length is not None and shirt_chest is not None:
-        ratio = shirt_length / shirt_chest
-        bounds = _scoring_params["length"]["fallback_ratio_bounds"]
-        return score_by_ratio(ratio, bounds)
-
-    logger.warning("Missing length data for scoring.")
+        return length_table(length).lookup(shirt_length - body_length)
+
+    elif shirt_length is not None and shirt_chest is not None and length.get("fallback_ratio_bounds"):
+        return length_ratio_table(length).lookup(shirt_length / shirt_chest)
+
+    logger.debug("Missing length data for scoring.")
     return 50, None, "[No length data]"
 
 
-def score_hem(body_hem, shirt_hem, shirt_chest):
-    from models.fit_model import SCORING_PARAMS as _scoring_params
-    hem = _scoring_params["hem"]
+def score_hem(body_hem, shirt_hem, shirt_chest, params=None):
+    hem = params if params is not None else _default_params("hem")
 
     if shirt_hem is not None and ((body_hem is not None) or (shirt_chest is not None)):
         if body_hem is not None:
-            diff = shirt_hem - body_hem
-            if diff < 0:
-                return (
-                    max(0, 100 - abs(diff) * hem["too_tight_penalty"]),
-                    "Tight Waist",
-                    f'Hem: {diff:+.1f}" vs body.',
-                )
-            if diff < hem["flared_min"]:
-                return 100, None, f'Hem: {diff:+.1f}" vs body.'
-            return 90, "Flared Hem", f'Hem: {diff:+.1f}" vs body.'
+            return hem_body_table(hem).lookup(shirt_hem - body_hem)
         else:
-            diff = shirt_hem - shirt_chest
-            if diff < -hem["box_cut_max"]:
-                return hem["tapered_penalty"], "Tapered Waist", f'Hem: {diff:+.1f}" vs chest.'
-            if diff < hem["box_cut_max"]:
-                retu
+            return hem_chest_table(hem).lookup(shirt_hem - shirt_chest)
+
+    logger.debug("Missing hem data for scoring.")
+    return 50, None, "[No hem data]"
+
+
+def score_sleeve(body_sleeve, shirt_sleeve, shirt_chest, params=None):
+    sleeve = params if params is not None else _default_params("sleeve")
+
+    if body_sleeve is not None and shirt_sleeve is not None:
+        return sleeve_table(sleeve).lookup(shirt_sleeve - body_sleeve)
+
+    logger.debug("Missing sleeve data for scoring.")
+    return 50, None, "[No sleeve data]"
+
+
+def score_weight(shirt_weight, scores, aspects, params=None):
+    weight = params if params is not None else _default_params("weight")
+
+    if shirt_weight is not None:
+        return weight_table(weight).lookup(shirt_weight)
+
+    logger.debug("Missing weight data for scoring.")
+    return 50, None, "[No weight data]"
+
+
+OVERSIZED_TAGS = ("Oversized", "Very Oversized", "Comically Oversized")
+
+
+def adjust_for_oversize_weight(tags, shirt_weight, fit_score, model=None):
+    """
+    Applies the interaction_adjustments: heavy fabric rescues an oversized or
+    relaxed cut, light fabric makes an oversized or slim cut look worse.
+    """
+    if model is None:
+        model = _default_model()
+    _adjustments = model.interaction_adjustments
+
+    if shirt_weight is None:
+        return fit_score
+    weight = model.scoring_params["weight"]
+
+    heavy = shirt_weight >= weight["mid_max"]
+    light = shirt_weight < weight["light_max"]
+    oversized = any(tag in OVERSIZED_TAGS for tag in tags)
+
+    if oversized and heavy:
+        fit_score += _adjustments["oversized_heavy_bonus"]
+    elif oversized and light:
+        fit_score -= _adjustments["oversized_light_penalty"]
+    if "Relaxed Fit" in tags and heavy:
+        fit_score += _adjustments["relaxed_heavy_bonus"]
+    if "Slim Fit" in tags and light:
+        fit_score -= _adjustments["slim_light_penalty"]
+
+    return max(0, min(100, fit_score))
+
+
+# --- Vectorized aspect scorers ---
+# Array versions of the scorers above, used by models.batch. Inputs broadcast, so a
+# body column of shape (n, 1) against shirt rows of shape (m,) scores an n x m block.
+# Each returns (scores, buckets, diffs, table); table[bucket] = (tag, rationale template)
+# mirrors the scalar branch that would have fired. The final bucket in every table is
+# the missing-data bucket (score 50). Missing data is logged at debug level only; the
+# scoring engines skip aspects without inputs up front and count them instead.
+
+def _score_diffs(table, diff):
+    """(scores, buckets, valid) of `diff` in a piecewise table; NaN diffs are not valid."""
+    valid = ~np.isnan(diff)
+    scores, buckets = table.evaluate(np.where(valid, diff, 0.0))
+    return scores, buckets, valid
+
+
+def score_chest_batch(body_chest, shirt_chest, params):
+    table = chest_table(params)
+    diff = shirt_chest - body_chest
+    scores, buckets, valid = _score_diffs(table, diff)
+    return _finish(scores, buckets, valid, diff, [*table.table, (None, "[No chest data]")])
+
+
+def score_shoulder_batch(body_shoulder, shirt_shoulder, params):
+    table = shoulder_table(params)
+    diff = shirt_shoulder - body_shoulder
+    scores, buckets, valid = _score_diffs(table, diff)
+    return _finish(scores, buckets, valid, diff, [*table.table, (None, "[No shoulder data]")])
+
+
+def score_length_batch(body_length, shirt_length, shirt_chest, params):
+    diff = shirt_length - body_length
+    scores, buckets, valid = _score_diffs(length_table(params), diff)
+    table = list(length_table(params).table)
+
+    # Ratio fallback when the body length is unknown (see score_by_ratio)
+    fallback = ~valid & ~np.isnan(shirt_length) & ~np.isnan(shirt_chest)
+    if fallback.any() and params.get("fallback_ratio_bounds"):
+        ratios = length_ratio_table(params)
+        ratio = np.where(fallback, shirt_length / np.where(fallback, shirt_chest, 1.0), 0.0)
+        r_scores, r_buckets = ratios.evaluate(ratio)
+        offset = len(table)
+        table += ratios.table
+        scores = np.where(fallback, r_scores, scores)
+        buckets = np.where(fallback, offset + r_buckets, buckets).astype(np.int16)
+        valid = valid | fallback
+
+    return _finish(scores, buckets, valid, diff, table + [(None, "[No length data]")])
+
+
+def score_hem_batch(body_hem, shirt_hem, shirt_chest, params):
+    vs_body, vs_chest = hem_body_table(params), hem_chest_table(params)
+    body_diff = shirt_hem - body_hem
+    chest_diff = shirt_hem - shirt_chest
+    table = [*vs_body.table, *vs_chest.table, (None, "[No hem data]")]
+    scores, buckets, use_body = _score_diffs(vs_body, body_diff)
+    if use_body.all():
+        return _finish(scores, buckets, use_body, body_diff, table)
+    # Chest-diff buckets follow the body-diff ones; the chest diff only counts without a body hem
+    c_scores, c_buckets, use_chest = _score_diffs(vs_chest, chest_diff)
+    scores = np.where(use_body, scores, c_scores)
+    buckets = np.where(use_body, buckets, len(vs_body.table) + c_buckets).astype(np.int16)
+    diff = np.where(use_body, body_diff, chest_diff)
+    return _finish(scores, buckets, use_body | use_chest, diff, table)
+
+
+def score_sleeve_batch(body_sleeve, shirt_sleeve, shirt_chest, params):
+    table = sleeve_table(params)
+    diff = shirt_sleeve - body_sleeve
+    scores, buckets, valid = _score_diffs(table, diff)
+    return _finish(scores, buckets, valid, diff, [*table.table, (None, "[No sleeve data]")])
+
+
+def score_weight_batch(shirt_weight, params):
+    table = weight_table(params)
+    scores, buckets, valid = _score_diffs(table, shirt_weight)
+    return _finish(scores, buckets, valid, shirt_weight, [*table.table, (None, "[No weight data]")])
+
+
+def _finish(scores, buckets, valid, diff, table):
+    missing_bucket = len(table) - 1
+    scores = np.where(valid, scores, 50).astype(float)
+    buckets = np.where(valid, buckets, missing_bucket).astype(np.int16)
+    return scores, buckets, diff, table
@@ -0,0 +1,243 @@
+# sizing.py
+"""
+Size charts: every graded size of every garment, scored at once.
+
+A `SizeChart` holds one (garments, sizes) float array per measurement field,
+plus a mask of the sizes each garment is actually offered in. Charts come from
+a long table with one row per garment and size (`size_chart_from_table`), or
+from one measured row per garment expanded by per-size grades
+(`grade_size_chart`, defaults in `config/size_chart.yaml`).
+
+`best_sizes` flattens the chart into garments x sizes virtual shirts, scores
+them for one body or a whole body table in a single `_score_arrays` pass (in
+bounded blocks of bodies), picks each garment's best offered size and renders
+tags and rationales for that size only. Scores match `score_fit` on the graded
+measurements of that size.
+"""
+
+import logging
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Tuple
+import numpy as np
+import pandas as pd
+import models.fit_model as fit_model
+from utils.data_loader import load_shirt_data
+from .batch import (
+    DEFAULT_BLOCK_CELLS, AspectScores, FitResults, _body_ids, _body_value, _iter_body_blocks, _score_arrays,
+)
+
+logger = logging.getLogger(__name__)
+
+# Conventional order for size labels not covered by a grading config
+SIZE_ORDER = ("XXS", "XS", "S", "M", "L", "XL", "XXL", "3XL", "4XL", "5XL")
+SIZE_LABEL_COLUMNS = ("Size", "Tag Size")
+BEST_SIZE_COLUMNS = ["ShirtName", "Size", "FitScore", "Confidence", "Tags", "Rationale"]
+
+
+@dataclass(frozen=True, eq=False)
+class SizeChart:
+    garments: Tuple[str, ...]
+    sizes: Tuple[str, ...]
+    measurements: Mapping[str, np.ndarray]  # field -> (garments, sizes) floats, NaN = not measured
+    offered: np.ndarray  # (garments, sizes) bool
+
+    @property
+    def shape(self):
+        return len(self.garments), len(self.sizes)
+
+    def __len__(self):
+        return len(self.garments)
+
+    def shirt_columns(self, model):
+        """{field: (garments * sizes,) float array} for every shirt field the model reads."""
+        n = len(self.garments) * len(self.sizes)
+        return {
+            field: self.measurements[field].ravel() if field in self.measurements else np.full(n, np.nan)
+            for field in model.shirt_fields
+        }
+
+    def to_frame(self):
+        """Long table of the offered sizes: ShirtName, Size and one column per field."""
+        g, s = np.nonzero(self.offered)
+        df = pd.DataFrame({
+            "ShirtName": np.array(self.garments, dtype=object)[g],
+            "Size": np.array(self.sizes, dtype=object)[s],
+        })
+        for field, values in self.measurements.items():
+            df[field] = values[g, s]
+        return df
+
+
+def _size_column(df, size_col):
+    if size_col is not None:
+        return size_col
+    for col in SIZE_LABEL_COLUMNS:
+        if col in df.columns:
+            return col
+    return None
+
+
+def _measurement_fields(df, exclude=()):
+    return [col for col in df.columns if col not in exclude and pd.api.types.is_float_dtype(df[col])]
+
+
+def _garment_names(df):
+    if "ShirtName" in df.columns:
+        return df["ShirtName"].astype(str).tolist()
+    return [f"Shirt_{idx}" for idx in df.index]
+
+
+def _order_sizes(labels, sizes=None):
+    """Distinct labels in `sizes` order (default `SIZE_ORDER`), unknown ones last in order seen."""
+    order = {label: i for i, label in enumerate(sizes or SIZE_ORDER)}
+    labels = list(dict.fromkeys(labels))
+    return sorted(labels, key=lambda label: (order.get(label, len(order)), labels.index(label)))
+
+
+def size_chart_from_table(df, size_col=None, sizes=None):
+    """
+    SizeChart from a long table: one row per garment ('ShirtName') and size (the
+    `size_col` column, default 'Size' or 'Tag Size'), measurements in float columns.
+    Rows without a size label are skipped. Raises ValueError when there is no size
+    column or a garment lists the same size twice.
+    """
+    size_col = _size_column(df, size_col)
+    if size_col is None:
+        raise ValueError(f"Size chart needs a size column ({' or '.join(SIZE_LABEL_COLUMNS)})")
+    labels = df[size_col].astype(object).where(df[size_col].notna(), "").astype(str).str.strip()
+    if (labels == "").any():
+        logger.warning(f"Skipping {int((labels == '').sum())} size chart rows without a size label")
+        df, labels = df[labels != ""], labels[labels != ""]
+    names = _garment_names(df)
+    garment_codes, garments = pd.factorize(pd.Series(names, dtype=object), sort=False)
+    size_labels = _order_sizes(labels.tolist(), sizes)
+    size_codes = pd.Categorical(labels, categories=size_labels).codes
+
+    cells = garment_codes.astype(np.int64) * len(size_labels) + size_codes
+    if len(np.unique(cells)) != len(cells):
+        dup = pd.Series(cells).duplicated().to_numpy().argmax()
+        raise ValueError(f"Size chart lists size '{labels.iloc[dup]}' of '{names[dup]}' more than once")
+    shape = (len(garments), len(size_labels))
+    offered = np.zeros(shape, dtype=bool)
+    offered[garment_codes, size_codes] = True
+    measurements = {}
+    for field in _measurement_fields(df, exclude=(size_col,)):
+        values = np.full(shape, np.nan)
+        values[garment_codes, size_codes] = df[field].to_numpy(dtype=float)
+        measurements[field] = values
+    return SizeChart(tuple(garments), tuple(size_labels), measurements, offered)
+
+
+def grade_size_chart(df, grading, size_col=None):
+    """
+    SizeChart from one measured row per garment: each row is taken at its own size
+    label (`size_col`, default 'Size' or 'Tag Size'; `grading['base_size']` when
+    blank or unknown) and every size in `grading['sizes']` gets the measured value
+    plus `grading['grades'][field]` per size step. Ungraded fields keep their value.
+    """
+    sizes = [str(s) for s in grading["sizes"]]
+    base = sizes.index(str(grading["base_size"]))
+    size_col = _size_column(df, size_col)
+    if size_col is not None:
+        labels = df[size_col].astype(object).where(df[size_col].notna(), "").astype(str).str.strip()
+        measured_at = np.array([sizes.index(label) if label in sizes else base for label in labels])
+    else:
+        measured_at = np.full(len(df), base)
+    steps = np.arange(len(sizes))[None, :] - measured_at[:, None]
+    grades = grading.get("grades") or {}
+    measurements = {}
+    for field in _measurement_fields(df, exclude=(size_col,)):
+        values = df[field].to_numpy(dtype=float)[:, None]
+        grade = grades.get(field, 0.0)
+        measurements[field] = values + grade * steps if grade else np.repeat(values, len(sizes), axis=1)
+    offered = np.ones((len(df), len(sizes)), dtype=bool)
+    return SizeChart(tuple(_garment_names(df)), tuple(sizes), measurements, offered)
+
+
+def load_size_chart(path, grading=None, size_col=None):
+    """
+    Reads a size chart CSV (typed like `load_shirt_data`): a long chart with one
+    row per garment and size, or, with `grading` (see `utils.config_loader.
+    load_size_grading`), one measured row per garment to expand into graded sizes.
+    """
+    df = load_shirt_data(path)
+    if df.empty:
+        return SizeChart((), (), {}, np.zeros((0, 0), dtype=bool))
+    if grading is not None:
+        return grade_size_chart(df, grading, size_col)
+    return size_chart_from_table(df, size_col)
+
+
+def best_sizes(bodies, chart, model=None, rationale=True, block_cells=DEFAULT_BLOCK_CELLS):
+    """
+    Best offered size of every garment in `chart`, for one body or many.
+
+    All garments x sizes are scored in one vectorized pass (per block of bodies);
+    the best size has the highest FitScore, then the highest confidence, then is
+    the smallest size. Tags and rationales are rendered for that size only
+    (see `FitResults`).
+
+    Args:
+        bodies (dict or pd.DataFrame): One body's measurements, or one row per body
+            (optional 'BodyId' column, as in `top_k_fits`).
+        chart (SizeChart): Garments and their graded sizes.
+        model (CompiledFitModel): Model to score with; defaults to the core model.
+        rationale (bool): Render the Rationale column.
+        block_cells (int): Max body x garment-size cells evaluated at once.
+
+    Returns:
+        pd.DataFrame: One row per garment (per body, in body order, with a leading
+            'BodyId' column for a body table): ShirtName, Size, FitScore,
+            Confidence, Tags and, unless `rationale=False`, Rationale.
+    """
+    if model is None:
+        model = fit_model.get_default_model()
+    single = isinstance(bodies, Mapping)
+    columns = BEST_SIZE_COLUMNS if rationale else BEST_SIZE_COLUMNS[:-1]
+    if not single:
+        columns = ["BodyId", *columns]
+    n_garments, n_sizes = chart.shape
+    if n_garments == 0 or n_sizes == 0 or (not single and len(bodies) == 0):
+        return pd.DataFrame([], columns=columns)
+    logger.debug(f"Scoring {n_garments} garments x {n_sizes} sizes with model '{model.name}'")
+
+    shirt_cols = chart.shirt_columns(model)
+    if single:
+        body_cols = {field: np.array([[_body_value(bodies, field)]]) for field in model.body_fields}
+        blocks = [(0, 1, _score_arrays(body_cols, shirt_cols, model))]
+        body_ids = [None]
+    else:
+        blocks = _iter_body_blocks(bodies, shirt_cols, model, block_cells)
+        body_ids = _body_ids(bodies)
+
+    unavailable = ~chart.offered.ravel()
+    garments = np.array(chart.garments, dtype=object)
+    sizes = np.array(chart.sizes, dtype=object)
+    frames = []
+    for start, stop, result in blocks:
+        n = stop - start
+        # FitScore first, then confidence; never a size the garment is not made in
+        key = np.where(result["present"] > 0, result["fit_score"], -1.0) * 1000 + result["confidence"]
+        key[:, unavailable] = -np.inf
+        best = key.reshape(n, n_garments, n_sizes).argmax(axis=2)
+        rows = np.repeat(np.arange(n), n_garments)
+        cells = (best + np.arange(n_garments) * n_sizes).ravel()
+        chosen = FitResults({
+            "fit_score": result["fit_score"][rows, cells],
+            "present": result["present"][rows, cells],
+            "confidence": result["confidence"][rows, cells],
+            "per_aspect": [
+                AspectScores(rec.aspect, rec.scores[rows, cells], rec.buckets[rows, cells],
+                             rec.diffs[rows, cells], rec.table)
+                for rec in result["per_aspect"]
+            ],
+        }, pd.RangeIndex(len(cells)))
+        frame = chosen.to_frame(rationale=rationale)
+        frame["Tags"] = ["; ".join(tags) for tags in frame["Tags"]]
+        frame.insert(0, "ShirtName", np.tile(garments, n))
+        frame.insert(1, "Size", sizes[best.ravel()])
+        if not single:
+            frame.insert(0, "BodyId", np.repeat(np.asarray(body_ids[start:stop]), n_garments))
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)[columns]
@@ -0,0 +1,157 @@
+# uncertainty.py
+"""
+Monte Carlo margins of error for fit scores.
+
+Confidence only says how many aspects were measured, not how far a score would
+move if a measurement were a quarter inch off. `score_uncertainty` draws
+`samples` noisy copies of the body and of every shirt (normal noise with a
+standard deviation per field, see `MeasurementNoise`; defaults in
+`config/measurement_noise.yaml`) and scores them all in `_score_arrays` passes
+over (samples, shirts) blocks: body columns are (samples, 1), shirt columns
+(samples, m). Per shirt it reports the mean and standard deviation of FitScore
+over the samples and a central percentile interval.
+
+Every sample is one body measured with error (the same for all shirts), while
+each shirt's errors are drawn independently. Missing measurements stay missing,
+and samples in which no aspect can be scored are left out.
+"""
+
+import logging
+import warnings
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Optional
+import numpy as np
+import pandas as pd
+import models.fit_model as fit_model
+from utils.config_loader import load_measurement_noise
+from .batch import DEFAULT_BLOCK_CELLS, _body_value, _score_arrays, _shirt_columns, score_fit_records
+
+logger = logging.getLogger(__name__)
+
+UNCERTAINTY_COLUMNS = ["FitScore", "FitScoreMean", "FitScoreStd", "FitScoreLow", "FitScoreHigh", "MarginOfError"]
+
+
+@dataclass(frozen=True)
+class MeasurementNoise:
+    body: Mapping[str, float] = field(default_factory=dict)  # body field -> standard deviation
+    shirt: Mapping[str, float] = field(default_factory=dict)  # shirt field -> standard deviation
+    samples: int = 1000
+    interval: float = 0.9  # central interval reported as FitScoreLow / FitScoreHigh
+    seed: Optional[int] = 0
+
+    def __post_init__(self):
+        object.__setattr__(self, "body", MappingProxyType(dict(self.body)))
+        object.__setattr__(self, "shirt", MappingProxyType(dict(self.shirt)))
+
+    @classmethod
+    def from_config(cls, config):
+        """From a (validated) `measurement_noise.yaml` config."""
+        return cls(
+            body=config.get("body") or {},
+            shirt=config.get("shirt") or {},
+            samples=config.get("samples", 1000),
+            interval=config.get("interval", 0.9),
+            seed=config.get("seed"),
+        )
+
+    @property
+    def percentiles(self):
+        """(low, high) percentiles of the central interval, e.g. (5.0, 95.0) for 0.9."""
+        tail = (1 - self.interval) / 2 * 100
+        return tail, 100 - tail
+
+
+def load_noise(config_dir=None):
+    """The MeasurementNoise described by `config/measurement_noise.yaml`."""
+    return MeasurementNoise.from_config(load_measurement_noise(config_dir))
+
+
+def _noisy(values, sd, shape, rng):
+    """`values` plus normal noise of shape `shape` (NaN stays NaN); `values` itself without noise."""
+    if not sd:
+        return values
+    return values + rng.normal(0.0, sd, shape)
+
+
+def _percentiles(scores, percentiles):
+    """
+    Percentiles along axis 0, ignoring NaN (NaN where a column has none), with
+    np.percentile's linear interpolation. Sorts once instead of per column.
+    """
+    ordered = np.sort(scores, axis=0)  # NaN sorts last
+    count = np.count_nonzero(~np.isnan(scores), axis=0)
+    columns = np.arange(scores.shape[1])
+    out = []
+    for q in percentiles:
+        position = q / 100 * np.maximum(count - 1, 0)
+        below = np.floor(position).astype(np.int64)
+        above = np.minimum(below + 1, np.maximum(count - 1, 0))
+        lower, upper = ordered[below, columns], ordered[above, columns]
+        value = lower + (upper - lower) * (position - below)
+        out.append(np.where(count > 0, value, np.nan))
+    return out
+
+
+def score_uncertainty(body, shirts, noise=None, model=None, block_cells=DEFAULT_BLOCK_CELLS):
+    """
+    Monte Carlo FitScore statistics for one body against every row of a shirt table.
+
+    Args:
+        body (dict): Body measurement data.
+        shirts (pd.DataFrame): One row per shirt.
+        noise (MeasurementNoise): Noise per field, samples, interval and seed;
+            defaults to `config/measurement_noise.yaml`.
+        model (CompiledFitModel): Model to score with; defaults to the core model.
+        block_cells (int): Max sample x shirt cells evaluated at once.
+
+    Returns:
+        pd.DataFrame: Indexed like `shirts`, with columns FitScore (the noise-free
+            score: int, or "" when no aspect is measured), FitScoreMean,
+            FitScoreStd, FitScoreLow / FitScoreHigh (the central `noise.interval`
+            of the sampled scores) and MarginOfError (half that interval's width).
+            Statistics are NaN for shirts with no scorable aspect. The same seed
+            and inputs (and `block_cells`) give the same results.
+    """
+    if model is None:
+        model = fit_model.get_default_model()
+    if noise is None:
+        noise = load_noise()
+    samples, n = noise.samples, len(shirts)
+    logger.debug(f"Sampling {samples} measurement draws x {n} shirts with model '{model.name}'")
+    rng = np.random.default_rng(noise.seed)
+
+    # One set of body draws, shared by every shirt block
+    body_cols = {}
+    for name in sorted(model.body_fields):
+        base = np.full((samples, 1), _body_value(body, name))
+        body_cols[name] = _noisy(base, noise.body.get(name, 0), (samples, 1), rng)
+    shirt_cols = _shirt_columns(shirts, model)
+
+    stats = np.full((4, n), np.nan)  # mean, std, low, high
+    step = max(1, block_cells // samples)
+    for start in range(0, n, step):
+        stop = min(n, start + step)
+        block = {
+            name: _noisy(shirt_cols[name][start:stop], noise.shirt.get(name, 0), (samples, stop - start), rng)
+            for name in sorted(shirt_cols)
+        }
+        result = _score_arrays(body_cols, block, model)
+        scores = np.where(result["present"] > 0, result["fit_score"], np.nan)
+        scores = np.broadcast_to(scores, (samples, stop - start))
+        with warnings.catch_warnings():
+            # Shirts with nothing to score: every sample is NaN
+            warnings.simplefilter("ignore", RuntimeWarning)
+            stats[0, start:stop] = np.nanmean(scores, axis=0)
+            stats[1, start:stop] = np.nanstd(scores, axis=0)
+        stats[2, start:stop], stats[3, start:stop] = _percentiles(scores, noise.percentiles)
+
+    mean, std, low, high = stats
+    return pd.DataFrame({
+        "FitScore": pd.Series(score_fit_records(body, shirts, model).fit_scores(), index=shirts.index, dtype=object),
+        "FitScoreMean": mean,
+        "FitScoreStd": std,
+        "FitScoreLow": low,
+        "FitScoreHigh": high,
+        "MarginOfError": (high - low) / 2,
+    }, index=shirts.index)
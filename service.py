@@ -0,0 +1,361 @@
+"""
+service.py
+Resident scoring service: keeps the compiled configs and the shirt catalog in
+memory and answers fit requests over JSON lines (stdin/stdout) or HTTP.
+
+Concurrent requests are micro-batched: the scoring thread waits up to
+`max_wait_ms` for more requests (at most `max_batch`) and ranks every body in a
+batch with one `top_k_fits` call per style profile.
+
+Request:  {"id": 1, "body": {"ChestWidth": 20, ...}, "top_k": 10,
+           "style_profile": "slim", "rationale": true}
+Response: {"id": 1, "results": [{"Rank": 1, "ShirtName": ..., "FitScore": ...}, ...]}
+          or {"id": 1, "error": "..."}
+{"op": "stats"} (GET /stats over HTTP) returns request counts and p50/p99 latency.
+"""
+
+import sys
+import json
+import time
+import queue
+import logging
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+from evaluate import ROOT_DIR, load_models
+from models.batch import TOP_K_COLUMNS, top_k_fits
+from models.catalog_index import CatalogIndex
+from utils.config_loader import list_style_profiles
+from utils.data_loader import load_shirt_data
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_K = 10
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_WAIT_MS = 2.0
+# Recent request latencies kept for the percentile counters
+LATENCY_WINDOW = 10_000
+# Columns of the ranked table; a body measurement may not share a name with them
+RESERVED_BODY_KEYS = frozenset(TOP_K_COLUMNS)
+
+
+class LatencyStats:
+    """Request count plus p50/p99/max over the last `window` latencies (thread-safe)."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, seconds):
+        with self._lock:
+            self._recent.append(seconds)
+            self.count += 1
+
+    def snapshot(self):
+        with self._lock:
+            recent = np.array(self._recent)
+            count = self.count
+        if not len(recent):
+            return {"requests": count, "p50_ms": None, "p99_ms": None, "max_ms": None}
+        p50, p99 = np.percentile(recent, [50, 99]) * 1000.0
+        return {
+            "requests": count,
+            "p50_ms": round(float(p50), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(recent.max()) * 1000.0, 3),
+        }
+
+
+def _parse_request(request, profiles):
+    """Returns (body, top_k, style_profile, rationale); raises ValueError on bad input."""
+    if not isinstance(request, dict):
+        raise ValueError("request must be a JSON object")
+    body = request.get("body")
+    if not isinstance(body, dict) or not body:
+        raise ValueError("'body' must be a non-empty object of measurements")
+    try:
+        body = {str(name): float(value) for name, value in body.items()}
+    except (TypeError, ValueError):
+        raise ValueError("'body' measurements must be numbers") from None
+    reserved = sorted(RESERVED_BODY_KEYS.intersection(body))
+    if reserved:
+        raise ValueError(f"'body' may not contain reserved keys: {', '.join(reserved)}")
+    top_k = request.get("top_k", DEFAULT_TOP_K)
+    if isinstance(top_k, bool) or not isinstance(top_k, int) or top_k < 1:
+        raise ValueError("'top_k' must be a positive integer")
+    style_profile = request.get("style_profile") or None
+    if style_profile is not None and style_profile not in profiles:
+        raise ValueError(f"unknown style profile '{style_profile}' (available: {', '.join(profiles)})")
+    return body, top_k, style_profile, bool(request.get("rationale", True))
+
+
+class ScoringService:
+    """
+    Scores fit requests against an in-memory catalog on a background thread.
+
+    `submit` is thread-safe and returns a Future resolving to the response dict;
+    `handle` is the blocking form. With `index=True` each profile's catalog is
+    served from a `CatalogIndex` (same results, fewer shirts scored per body).
+    """
+
+    def __init__(self, shirts, style_profiles=(), config_dir=ROOT_DIR, max_batch=DEFAULT_MAX_BATCH,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS, index=False):
+        self.shirts = shirts
+        self.config_dir = config_dir
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.use_index = index
+        self.profiles = list_style_profiles(config_dir)
+        self.latency = LatencyStats()
+        self.batches = 0
+        self.batched_requests = 0
+        self._indexes = {}
+        self._queue = queue.Queue()
+        # Compile (and index) up front so the first requests don't pay for it
+        for style_profile in (None, *style_profiles):
+            self._model(style_profile)
+        self._thread = threading.Thread(target=self._run, name="scoring-service", daemon=True)
+        self._thread.start()
+
+    def _model(self, style_profile):
+        core_model, style_model = load_models(style_profile, self.config_dir)
+        model = style_model or core_model
+        if self.use_index and style_profile not in self._indexes:
+            self._indexes[style_profile] = CatalogIndex(self.shirts, model=model)
+        return model
+
+    def submit(self, request):
+        future = Future()
+        start = time.perf_counter()
+        request_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            if isinstance(request, dict) and request.get("op") == "stats":
+                future.set_result({"id": request_id, "stats": self.stats()})
+                return future
+            parsed = _parse_request(request, self.profiles)
+        except ValueError as e:
+            future.set_result({"id": request_id, "error": str(e)})
+            return future
+        self._queue.put((start, request_id, parsed, future))
+        return future
+
+    def handle(self, request):
+        return self.submit(request).result()
+
+    def stats(self):
+        stats = self.latency.snapshot()
+        stats["batches"] = self.batches
+        stats["mean_batch_size"] = round(self.batched_requests / self.batches, 2) if self.batches else None
+        return stats
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.perf_counter() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._score_batch(batch)
+            if stop:
+                return
+
+    def _score_batch(self, batch):
+        self.batches += 1
+        self.batched_requests += len(batch)
+        groups = {}
+        for pos, (_, _, (_, _, style_profile, rationale), _) in enumerate(batch):
+            groups.setdefault((style_profile, rationale), []).append(pos)
+
+        for (style_profile, rationale), members in groups.items():
+            try:
+                results = self._score_group([batch[p][2] for p in members], style_profile, rationale)
+            except Exception as e:
+                logger.exception("Scoring batch failed")
+                results = [{"error": f"scoring failed: {e}"}] * len(members)
+            for pos, result in zip(members, results):
+                start, request_id, _, future = batch[pos]
+                self.latency.record(time.perf_counter() - start)
+                future.set_result({"id": request_id, **result})
+
+    def _score_group(self, requests, style_profile, rationale):
+        """One vectorized ranking for every body in the group; each keeps its own top_k."""
+        model = self._model(style_profile)
+        bodies = pd.DataFrame([body for body, _, _, _ in requests])
+        bodies.insert(0, "BodyId", range(len(requests)))
+        k = max(top_k for _, top_k, _, _ in requests)
+        if self.use_index:
+            ranked = self._indexes[style_profile].top_k_fits(bodies, k=k, rationale=rationale)
+        else:
+            ranked = top_k_fits(bodies, self.shirts, k=k, model=model, rationale=rationale)
+        per_body = {body_id: rows.drop(columns="BodyId") for body_id, rows in ranked.groupby("BodyId")}
+        empty = ranked.drop(columns="BodyId").iloc[:0]
+        return [
+            {"results": per_body.get(i, empty).head(top_k).to_dict(orient="records")}
+            for i, (_, top_k, _, _) in enumerate(requests)
+        ]
+
+
+def serve_jsonl(service, infile=sys.stdin, outfile=sys.stdout):
+    """
+    Reads one JSON request per line from `infile` and writes one response per line
+    to `outfile`, in request order. Lines are submitted as they arrive, so a burst
+    of input is scored in shared batches.
+    """
+    pending = queue.Queue()
+
+    def write_responses():
+        while True:
+            future = pending.get()
+            if future is None:
+                return
+            outfile.write(json.dumps(future.result()) + "\n")
+            outfile.flush()
+
+    writer = threading.Thread(target=write_responses, name="jsonl-writer", daemon=True)
+    writer.start()
+    for line in infile:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            future = Future()
+            future.set_result({"id": None, "error": f"invalid JSON: {e}"})
+        else:
+            future = service.submit(request)
+        pending.put(future)
+    pending.put(None)
+    writer.join()
+
+
+def make_http_server(service, host="127.0.0.1", port=8080):
+    """
+    HTTP front end: POST /score with one request object (or a list of them),
+    GET /stats for the latency counters. Each connection runs on its own thread,
+    so concurrent clients share scoring batches.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, payload):
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._reply(200, service.stats())
+            else:
+                self._reply(404, {"error": f"unknown path '{self.path}'"})
+
+        def do_POST(self):
+            if self.path != "/score":
+                self._reply(404, {"error": f"unknown path '{self.path}'"})
+                return
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            except json.JSONDecodeError as e:
+                self._reply(400, {"error": f"invalid JSON: {e}"})
+                return
+            if isinstance(request, list):
+                futures = [service.submit(r) for r in request]
+                self._reply(200, [f.result() for f in futures])
+            else:
+                response = service.handle(request)
+                self._reply(400 if "error" in response else 200, response)
+
+        def log_message(self, format, *args):
+            logger.debug("%s - %s", self.address_string(), format % args)
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Resident t-shirt fit scoring service (JSON lines on stdin/stdout, or HTTP)."
+    )
+    parser.add_argument("--shirts", type=str, default="data/shirt_data.csv", help="Path to shirts CSV")
+    parser.add_argument(
+        "--style_profile",
+        type=str,
+        default=None,
+        help="Comma-separated style profiles to compile at startup (others load on first use)",
+    )
+    parser.add_argument(
+        "--http",
+        type=str,
+        default=None,
+        metavar="HOST:PORT",
+        help="Serve HTTP on HOST:PORT instead of JSON lines on stdin/stdout",
+    )
+    parser.add_argument(
+        "--max_batch", type=int, default=DEFAULT_MAX_BATCH, help="Most requests scored in one batch"
+    )
+    parser.add_argument(
+        "--max_wait_ms",
+        type=float,
+        default=DEFAULT_MAX_WAIT_MS,
+        help="How long the first request of a batch waits for more to arrive",
+    )
+    parser.add_argument(
+        "--index", action="store_true", help="Serve each profile from a CatalogIndex (see evaluate.py --index)"
+    )
+    args = parser.parse_args()
+
+    # Parse only the columns some profile can read
+    columns = set()
+    for style_profile in (None, *list_style_profiles(ROOT_DIR)):
+        core_model, style_model = load_models(style_profile)
+        columns |= (style_model or core_model).shirt_fields
+    shirts = load_shirt_data(args.shirts, columns=columns)
+    profiles = [p for p in (args.style_profile or "").split(",") if p]
+    service = ScoringService(
+        shirts, style_profiles=profiles, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms, index=args.index
+    )
+    logger.info(f"Loaded {len(shirts)} shirts; ready")
+    with service:
+        if args.http:
+            host, _, port = args.http.rpartition(":")
+            server = make_http_server(service, host or "127.0.0.1", int(port))
+            logger.info(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+        else:
+            serve_jsonl(service)
+    logger.info(f"Service stats: {service.stats()}")
+
+
+if __name__ == "__main__":
+    main()
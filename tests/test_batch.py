@@ -0,0 +1,195 @@
+# tests/test_batch.py
+
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from utils.config_loader import load_model_config
+from utils.data_loader import load_body_measurements, load_shirt_data
+from models.compiled import compile_model
+from models.fit_model import score_fit
+from models.batch import (
+    SharedPass, score_fit_batch, score_fit_records, score_matrix, top_k_fits, merge_top_k,
+)
+from evaluate import score_shirts
+
+DATA_DIR = os.path.dirname(__file__)
+ROOT_DIR = os.path.dirname(DATA_DIR)
+
+
+def random_catalog(n=500, seed=0, missing=0.2):
+    """Synthetic shirts around the sample body, with NaNs and exact threshold hits."""
+    rng = np.random.default_rng(seed)
+    base = {"ChestWidth": 18.5, "ShoulderWidth": 17.0, "BodyLength": 27.0,
+            "HemWidth": 18.0, "SleeveLength": 8.0, "Weight": 5.0}
+    cols = {}
+    for col, center in base.items():
+        vals = center + rng.choice(np.arange(-8, 8.5, 0.5), size=n) + rng.choice([0, 0, 0.13], size=n)
+        vals[rng.random(n) < missing] = np.nan
+        cols[col] = vals
+    df = pd.DataFrame(cols)
+    df.insert(0, "ShirtName", [f"Tee {i}" for i in range(n)])
+    return df
+
+
+def assert_matches_rowwise(body, shirts, model=None):
+    batch = score_fit_batch(body, shirts, model)
+    assert list(batch.index) == list(shirts.index)
+    for idx, row in shirts.iterrows():
+        expected = score_fit(body, row.to_dict(), model)
+        got = batch.loc[idx]
+        assert got["FitScore"] == expected["FitScore"], idx
+        assert got["Confidence"] == expected["Confidence"], idx
+        assert got["Tags"] == expected["Tags"], idx
+        assert got["Rationale"] == expected["Rationale"], idx
+
+
+def test_batch_matches_score_fit_on_sample_data():
+    body = load_body_measurements(os.path.join(DATA_DIR, "sample_body.csv"))
+    shirts = load_shirt_data(os.path.join(DATA_DIR, "sample_shirts.csv"))
+    assert_matches_rowwise(body, shirts)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_batch_matches_score_fit_on_random_catalog(seed):
+    body = load_body_measurements(os.path.join(DATA_DIR, "sample_body.csv"))
+    assert_matches_rowwise(body, random_catalog(seed=seed))
+
+
+def test_batch_matches_with_partial_body():
+    body = {"ChestWidth": 18.5, "ShoulderWidth": 17.0, "TorsoLength": 27.0}
+    assert_matches_rowwise(body, random_catalog(n=200, seed=3, missing=0.4))
+
+
+def test_batch_length_ratio_fallback():
+    config = load_model_config(config_dir=ROOT_DIR)
+    config["scoring_params"]["length"]["fallback_ratio_bounds"] = [
+        [1.2, 60, "Cropped", "Length ratio: cropped."],
+        [1.5, 100, None, "Length ratio: ideal."],
+        [9.9, 80, "Long", "Length ratio: long."],
+    ]
+    body = {"ChestWidth": 18.5}
+    assert_matches_rowwise(body, random_catalog(n=200, seed=4), compile_model(config))
+
+
+def model_without_weight():
+    """Core model with the weight aspect (and its params) removed: no interaction adjustments."""
+    config = load_model_config(config_dir=ROOT_DIR)
+    config["aspects"].pop("weight")
+    config["scoring_params"].pop("weight")
+    return compile_model(config, name="no_weight")
+
+
+def test_batch_matches_score_fit_without_weight_aspect():
+    model = model_without_weight()
+    assert model.weight_field is None
+    body = load_body_measurements(os.path.join(DATA_DIR, "sample_body.csv"))
+    assert_matches_rowwise(body, random_catalog(n=200, seed=7), model)
+
+
+@pytest.mark.parametrize("profile", ["relaxed", "slim", "boxy", "cropped", "vintage_90s"])
+def test_batch_matches_score_fit_with_style_model(profile):
+    body = load_body_measurements(os.path.join(DATA_DIR, "sample_body.csv"))
+    model = compile_model(load_model_config(style_profile=profile, config_dir=ROOT_DIR), name=profile)
+    assert_matches_rowwise(body, random_catalog(n=200, seed=6), model)
+
+
+def test_batch_no_measurements():
+    shirts = pd.DataFrame({"ShirtName": ["Blank"], "ChestWidth": [np.nan]})
+    result = score_fit_batch({"ChestWidth": 18.5}, shirts)
+    assert result.iloc[0]["FitScore"] == ""
+    assert result.iloc[0]["Confidence"] == 0
+
+
+def test_score_shirts_vectorized_matches_rowwise():
+    body = load_body_measurements(os.path.join(DATA_DIR, "sample_body.csv"))
+    shirts = random_catalog(n=100, seed=5)
+    fast = score_shirts(body, shirts, style_profile="slim")
+    slow = score_shirts(body, shirts, style_profile="slim", vectorized=False)
+    assert fast == slow
+
+
+def random_bodies(n=7, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "BodyId": [f"body{i}" for i in range(n)],
+        "ChestWidth": 18.5 + rng.choice(np.arange(-2, 2.5, 0.5), size=n),
+        "ShoulderWidth": 17.0 + rng.choice(np.arange(-2, 2.5, 0.5), size=n),
+        "TorsoLength": 27.0 + rng.choice(np.arange(-2, 2.5, 0.5), size=n),
+        "HemWidth": 18.0 + rng.choice(np.arange(-2, 2.5, 0.5), size=n),
+        "SleeveLength": 8.0 + rng.choice(np.arange(-1, 1.5, 0.5), size=n),
+    })
+    df.loc[1, "HemWidth"] = np.nan
+    return df
+
+
+def test_score_matrix_matches_score_fit_batch():
+    bodies = random_bodies()
+    shirts = random_catalog(n=120, seed=7)
+    # Tiny blocks so several body chunks are used
+    fit, conf = score_matrix(bodies, shirts, block_cells=250)
+    assert fit.shape == (len(bodies), len(shirts))
+    for i, body in enumerate(bodies.drop(columns="BodyId").to_dict(orient="records")):
+        expected = score_fit_batch(body, shirts)
+        exp_fit = pd.to_numeric(expected["FitScore"].replace("", np.nan)).to_numpy(dtype=float)
+        np.testing.assert_array_equal(fit[i], exp_fit.astype(np.float32))
+        np.testing.assert_array_equal(conf[i], expected["Confidence"].to_numpy(dtype=np.float32))
+
+
+def test_top_k_fits_matches_full_sort():
+    bodies = random_bodies(n=4, seed=2)
+    shirts = random_catalog(n=150, seed=8)
+    top = top_k_fits(bodies, shirts, k=5, block_cells=300)
+    assert len(top) == 4 * 5
+    for body_id, group in top.groupby("BodyId", sort=False):
+        body = bodies[bodies["BodyId"] == body_id].drop(columns="BodyId").iloc[0].to_dict()
+        full = score_fit_batch(body, shirts)
+        full["ShirtName"] = shirts["ShirtName"]
+        full["Rank"] = full["FitScore"].replace("", -1).astype(float)
+        full = full.sort_values(["Rank", "Confidence"], ascending=False, kind="stable")
+        assert group["ShirtName"].tolist() == full["ShirtName"].head(5).tolist()
+        assert group["FitScore"].tolist() == full["FitScore"].head(5).tolist()
+        assert group["Rationale"].tolist() == full["Rationale"].head(5).tolist()
+
+
+def test_merge_top_k_over_chunks_matches_single_call():
+    bodies = random_bodies(n=5, seed=3)
+    # Coarse values so many ties cross chunk boundaries
+    shirts = random_catalog(n=90, seed=9).round(0)
+    expected = top_k_fits(bodies, shirts, k=6)
+    frames = [top_k_fits(bodies, shirts.iloc[a:a + 25], k=6) for a in range(0, 90, 25)]
+    pd.testing.assert_frame_equal(merge_top_k(frames, 6), expected)
+
+
+def test_fit_results_render_selected_rows_only():
+    body = load_body_measurements(os.path.join(DATA_DIR, "sample_body.csv"))
+    shirts = random_catalog(n=60, seed=4)
+    full = score_fit_batch(body, shirts)
+    records = score_fit_records(body, shirts)
+    positions = [17, 3, 42]
+    pd.testing.assert_frame_equal(records.to_frame(positions), full.iloc[positions])
+    assert records.rationales([5]) == [full["Rationale"].iloc[5]]
+
+
+def test_batch_without_rationale():
+    body = load_body_measurements(os.path.join(DATA_DIR, "sample_body.csv"))
+    shirts = random_catalog(n=30, seed=5)
+    lean = score_fit_batch(body, shirts, rationale=False)
+    assert list(lean.columns) == ["FitScore", "Confidence", "Tags"]
+    pd.testing.assert_frame_equal(lean, score_fit_batch(body, shirts).drop(columns="Rationale"))
+    top = top_k_fits(random_bodies(n=2), shirts, k=3, rationale=False)
+    assert "Rationale" not in top.columns
+
+
+def test_shared_pass_matches_separate_scoring():
+    body = load_body_measurements(os.path.join(DATA_DIR, "sample_body.csv"))
+    shirts = random_catalog(n=300, seed=8)
+    models = [compile_model(load_model_config(p, config_dir=ROOT_DIR), name=p or "core")
+              for p in (None, "slim", "relaxed", "boxy")]
+    shared = SharedPass(body, shirts)
+    for model in models:
+        expected = score_fit_records(body, shirts, model).to_frame()
+        pd.testing.assert_frame_equal(shared.records(model).to_frame(), expected)
+    # Profiles only override some aspects; the rest come from the core evaluation
+    assert shared.reused > 0
+    assert shared.evaluated + shared.reused == sum(m.aspect_count for m in models)
@@ -0,0 +1,49 @@
+# tests/test_benchmarks.py
+
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from benchmarks.bench_scoring import compare, main as bench_main
+from benchmarks.synthetic import SHIRT_COLUMNS, make_bodies, make_shirts, write_shirts_csv
+from utils.data_loader import load_shirt_data
+
+
+def test_synthetic_shirts_are_seeded_and_chunk_independent():
+    # Rows 64000-75000 cross both internal draw-block boundaries
+    start, n, step = 64_000, 11_000, 2_500
+    whole = make_shirts(n, seed=7, missing=0.2, start=start)
+    chunks = pd.concat(
+        [make_shirts(min(step, n - i), seed=7, missing=0.2, start=start + i) for i in range(0, n, step)],
+        ignore_index=True,
+    )
+    pd.testing.assert_frame_equal(whole, chunks.set_axis(whole.index))
+    pd.testing.assert_frame_equal(whole, make_shirts(n, seed=7, missing=0.2, start=start))
+    assert not whole.equals(make_shirts(n, seed=8, missing=0.2, start=start))
+    assert list(whole.columns) == SHIRT_COLUMNS
+    assert whole["ChestWidth"].isna().mean() == pytest.approx(0.2, abs=0.03)
+    assert make_shirts(100, missing=0.0)["ChestWidth"].notna().all()
+
+
+def test_synthetic_tables_load_like_real_data(tmp_path):
+    path = write_shirts_csv(tmp_path / "shirts.csv", 300, seed=1, chunksize=128)
+    shirts = load_shirt_data(path)
+    assert len(shirts) == 300
+    np.testing.assert_allclose(shirts["Weight"], make_shirts(300, seed=1)["WeightOz"])
+    bodies = make_bodies(50, seed=1, missing=0.1)
+    assert len(bodies) == 50 and bodies["BodyId"].tolist() == list(range(50))
+
+
+def test_bench_scoring_writes_json_and_compares(tmp_path):
+    out = tmp_path / "bench.json"
+    assert bench_main(["--rows", "60,120", "--repeat", "1", "--fit_rows", "10", "--out", str(out)]) == 0
+    result = json.loads(out.read_text())
+    assert [r["rows"] for r in result["results"]] == [60, 120]
+    assert set(result["results"][0]["score_fit_records_s"]) == {"core", "bulk", "style"}
+    assert result["meta"]["seed"] == 0
+
+    slower = json.loads(out.read_text())
+    slower["results"][0]["evaluate_fit_s"] *= 2
+    lines, regressions = compare(result, slower)
+    assert regressions == 1
+    assert any("evaluate_fit_s" in line and "REGRESSION" in line for line in lines)
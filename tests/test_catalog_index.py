@@ -0,0 +1,62 @@
+# tests/test_catalog_index.py
+
+import pandas as pd
+import pytest
+from models.batch import score_fit_batch, top_k_fits
+from models.catalog_index import CatalogIndex
+from evaluate import load_models
+from tests.test_batch import model_without_weight, random_bodies, random_catalog
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_index_matches_full_top_k(seed):
+    bodies = random_bodies(n=6, seed=seed)
+    # Half-inch grid so many shirts tie on score
+    shirts = random_catalog(n=3000, seed=seed + 10)
+    index = CatalogIndex(shirts, block_size=64)
+    expected = top_k_fits(bodies, shirts, k=10)
+    pd.testing.assert_frame_equal(index.top_k_fits(bodies, k=10), expected)
+    assert index.scored_fraction < 1.0
+
+
+def test_index_matches_with_style_model():
+    _, slim = load_models("slim")
+    bodies = random_bodies(n=4, seed=5)
+    shirts = random_catalog(n=1500, seed=6)
+    index = CatalogIndex(shirts, slim, block_size=50)
+    pd.testing.assert_frame_equal(
+        index.top_k_fits(bodies, k=7, rationale=False),
+        top_k_fits(bodies, shirts, k=7, model=slim, rationale=False),
+    )
+
+
+def test_index_matches_without_weight_aspect():
+    model = model_without_weight()
+    bodies = random_bodies(n=4, seed=8)
+    shirts = random_catalog(n=1000, seed=9)
+    index = CatalogIndex(shirts, model, block_size=50)
+    pd.testing.assert_frame_equal(index.top_k_fits(bodies, k=5), top_k_fits(bodies, shirts, k=5, model=model))
+
+
+def test_block_bounds_are_upper_bounds():
+    bodies = random_bodies(n=3, seed=7)
+    shirts = random_catalog(n=800, seed=8, missing=0.4)
+    index = CatalogIndex(shirts, block_size=32)
+    for body in bodies.drop(columns="BodyId").to_dict(orient="records"):
+        full = score_fit_batch(body, shirts)
+        scores = pd.to_numeric(full["FitScore"], errors="coerce").fillna(-1).to_numpy()
+        confidence = full["Confidence"].to_numpy(dtype=float)
+        score_ub, conf_ub, first_pos = index.block_bounds(body)
+        for b, start in enumerate(index._starts):
+            rows = index._order[start:start + 32]
+            assert scores[rows].max() <= score_ub[b]
+            assert confidence[rows].max() <= conf_ub[b]
+            assert rows.min() == first_pos[b]
+
+
+def test_index_small_and_empty_catalogs():
+    bodies = random_bodies(n=2)
+    shirts = random_catalog(n=5, seed=3)
+    index = CatalogIndex(shirts, block_size=2)
+    pd.testing.assert_frame_equal(index.top_k_fits(bodies, k=10), top_k_fits(bodies, shirts, k=10))
+    assert len(CatalogIndex(shirts.iloc[:0]).top_k_fits(bodies, k=3)) == 0
@@ -0,0 +1,54 @@
+# tests/test_compiled.py
+
+import os
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from utils.config_loader import load_model_config
+from models.compiled import compile_model
+from models.fit_model import score_fit, DEFAULT_MODEL
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+BODY = {"ChestWidth": 18.5, "ShoulderWidth": 17.0, "TorsoLength": 27.0, "HemWidth": 18.0}
+SHIRT = {"ChestWidth": 21.0, "ShoulderWidth": 19.2, "BodyLength": 26.0, "HemWidth": 20.1, "Weight": 5.5}
+
+
+def test_compiled_model_is_immutable():
+    model = compile_model(load_model_config(config_dir=ROOT_DIR))
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        model.name = "other"
+    with pytest.raises(TypeError):
+        model.scoring_params["chest"]["relaxed_max"] = 9.0
+    assert abs(sum(model.normalized_weights.values()) - 1.0) < 1e-9
+
+
+def test_compile_copies_config():
+    config = load_model_config(config_dir=ROOT_DIR)
+    model = compile_model(config)
+    config["scoring_params"]["chest"]["relaxed_max"] = 99.0
+    assert model.scoring_params["chest"]["relaxed_max"] == 2.0
+
+
+def test_style_model_does_not_touch_default():
+    before = score_fit(BODY, SHIRT)
+    boxy = compile_model(load_model_config(style_profile="boxy", config_dir=ROOT_DIR), name="boxy")
+    boxy_result = score_fit(BODY, SHIRT, boxy)
+    assert boxy_result["Tags"] != before["Tags"]
+    assert score_fit(BODY, SHIRT) == before
+    assert DEFAULT_MODEL.scoring_params["chest"]["relaxed_max"] == 2.0
+
+
+def test_models_score_concurrently():
+    models = [compile_model(load_model_config(style_profile=p, config_dir=ROOT_DIR), name=p)
+              for p in ["relaxed", "slim", "boxy", "cropped"]]
+    expected = [score_fit(BODY, SHIRT, m) for m in models]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        got = list(pool.map(lambda m: score_fit(BODY, SHIRT, m), models * 10))
+    assert got == expected * 10
+
+
+def test_unknown_scorer_rejected():
+    config = load_model_config(config_dir=ROOT_DIR)
+    config["aspects"]["chest"]["scorer"] = "score_nope"
+    with pytest.raises(ValueError):
+        compile_model(config)
@@ -1,7 +1,12 @@
+import os
+import shutil
 import pytest
 import yaml
 from pathlib import Path
-from utils.config_loader import load_model_config, deep_merge_dicts
+import utils.config_loader as config_loader
+from utils.config_loader import (
+    load_model_config, deep_merge_dicts, invalidate_config_cache, compile_profiles, load_profile_bundle,
+)
 
 @pytest.fixture
 def base_config(tmp_path):
@@ -58,3 +63,87 @@ def test_loader_no_overlay_uses_base(tmp_path, base_config):
     config = load_model_config(config_dir=tmp_path)
     assert config['aspects']['chest']['weight'] == 0.20
     assert config['interaction_adjustments']['relaxed_heavy_bonus'] == 3
+
+def test_loader_returns_independent_copies(tmp_path, base_config):
+    first = load_model_config(config_dir=tmp_path)
+    first['aspects']['chest']['weight'] = 99
+    second = load_model_config(config_dir=tmp_path)
+    assert second['aspects']['chest']['weight'] == 0.20
+
+def test_frozen_config_is_shared_and_read_only(tmp_path, base_config):
+    frozen = load_model_config(config_dir=tmp_path, frozen=True)
+    assert load_model_config(config_dir=tmp_path, frozen=True) is frozen
+    with pytest.raises(TypeError):
+        frozen['aspects']['chest']['weight'] = 99
+
+def test_overlay_does_not_mutate_cached_base(tmp_path, base_config, relaxed_overlay):
+    load_model_config(style_profile="relaxed", config_dir=tmp_path)
+    config = load_model_config(config_dir=tmp_path)
+    assert config['aspects']['chest']['relaxed_max'] == 2.0
+    assert config['interaction_adjustments']['relaxed_heavy_bonus'] == 3
+
+def test_cache_reloads_when_file_changes(tmp_path, base_config):
+    frozen = load_model_config(config_dir=tmp_path, frozen=True)
+    cfg_path = tmp_path / 'config' / 'model_config.yaml'
+    data = yaml.safe_load(cfg_path.read_text())
+    data['aspects']['chest']['weight'] = 0.5
+    cfg_path.write_text(yaml.safe_dump(data))
+    st = cfg_path.stat()
+    os.utime(cfg_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    reloaded = load_model_config(config_dir=tmp_path, frozen=True)
+    assert reloaded is not frozen
+    assert reloaded['aspects']['chest']['weight'] == 0.5
+
+def test_invalidate_config_cache(tmp_path, base_config):
+    frozen = load_model_config(config_dir=tmp_path, frozen=True)
+    invalidate_config_cache(tmp_path)
+    assert load_model_config(config_dir=tmp_path, frozen=True) is not frozen
+
+@pytest.fixture
+def repo_config(tmp_path):
+    """Copy of the real config/ tree, so bundles can be written without touching the repo."""
+    shutil.copytree(Path(__file__).resolve().parent.parent / 'config', tmp_path / 'config')
+    return tmp_path
+
+def test_compiled_bundle_matches_yaml(repo_config):
+    expected = load_model_config(style_profile="relaxed", config_dir=repo_config)
+    bundle_path = compile_profiles(config_dir=repo_config)
+    assert bundle_path.exists()
+    configs = load_profile_bundle(repo_config)
+    assert set(configs) >= {"", "relaxed", "slim", "boxy", "cropped", "vintage_90s"}
+    assert configs["relaxed"] == expected
+    invalidate_config_cache()
+    assert load_model_config(style_profile="relaxed", config_dir=repo_config) == expected
+
+def test_stale_bundle_falls_back_to_yaml(repo_config):
+    compile_profiles(config_dir=repo_config)
+    overlay_path = repo_config / 'config' / 'style_profiles' / 'relaxed.yaml'
+    overlay = yaml.safe_load(overlay_path.read_text())
+    overlay['interaction_adjustments'] = {'relaxed_heavy_bonus': 11}
+    overlay_path.write_text(yaml.safe_dump(overlay))
+    assert load_profile_bundle(repo_config) is None
+    invalidate_config_cache()
+    config = load_model_config(style_profile="relaxed", config_dir=repo_config)
+    assert config['interaction_adjustments']['relaxed_heavy_bonus'] == 11
+
+def test_bundle_and_source_hash_are_reused_across_cache_misses(repo_config, monkeypatch):
+    compile_profiles(config_dir=repo_config)
+    invalidate_config_cache()
+    calls = []
+    real_hash = config_loader.profile_source_hash
+    monkeypatch.setattr(config_loader, "profile_source_hash", lambda root: calls.append(root) or real_hash(root))
+    for profile in (None, "relaxed", "slim", "boxy"):
+        load_model_config(style_profile=profile, config_dir=repo_config)
+    assert len(calls) == 1
+    # Editing a profile changes its stamp: hashed again, and the stale bundle is skipped
+    overlay_path = repo_config / 'config' / 'style_profiles' / 'slim.yaml'
+    overlay_path.write_text(overlay_path.read_text() + "\n# edited\n")
+    assert load_profile_bundle(repo_config) is None
+    assert len(calls) == 2
+
+def test_compile_profiles_rejects_invalid_config(tmp_path):
+    cfg_dir = tmp_path / 'config'
+    cfg_dir.mkdir()
+    (cfg_dir / 'model_config.yaml').write_text(yaml.safe_dump({'aspects': {'chest': {'weight': 1}}}))
+    with pytest.raises(ValueError):
+        compile_profiles(config_dir=tmp_path)
@@ -3,8 +3,9 @@
 import os
 import pandas as pd
 import tempfile
+import pytest
 
-from utils.data_loader import load_body_measurements, load_shirt_data
+from utils.data_loader import load_body_measurements, load_shirt_data, load_body_table, iter_shirt_chunks
 
 # --- Fixtures: create temp sample CSVs ---
 
@@ -100,3 +101,117 @@ def test_load_body_measurements_missing_cols():
     body = load_body_measurements(path)
     assert isinstance(body, dict)  # Should not error, just returns whatever mapping
     os.unlink(path)
+
+
+def test_load_body_table_wide():
+    csv = """BodyId,ChestWidth,ShoulderWidth
+a,18.5,17.0
+b,20.0,
+"""
+    path = write_temp_csv(csv)
+    df = load_body_table(path)
+    assert df["BodyId"].tolist() == ["a", "b"]
+    assert df.loc[1, "ChestWidth"] == 20.0
+    assert pd.isna(df.loc[1, "ShoulderWidth"])
+    os.unlink(path)
+
+
+def test_load_body_table_long():
+    csv = """BodyId,Measurement,Value
+a,ChestWidth,18.5
+a,ShoulderWidth,17.0
+b,ChestWidth,20.0
+"""
+    path = write_temp_csv(csv)
+    df = load_body_table(path)
+    assert df["BodyId"].tolist() == ["a", "b"]
+    assert df.loc[0, "ShoulderWidth"] == 17.0
+    assert pd.isna(df.loc[1, "ShoulderWidth"])
+    os.unlink(path)
+
+
+def test_load_body_table_without_ids():
+    csv = """ChestWidth,ShoulderWidth
+18.5,17.0
+19.0,17.5
+"""
+    path = write_temp_csv(csv)
+    df = load_body_table(path)
+    assert df["BodyId"].tolist() == [0, 1]
+    os.unlink(path)
+
+
+def test_iter_shirt_chunks_matches_full_load():
+    csv = """ShirtName,ChestWidth,Color,WeightOz
+A,19.0,red,5.5
+B,20.0,blue,6.0
+C,21.5,green,
+"""
+    path = write_temp_csv(csv)
+    chunks = list(iter_shirt_chunks(path, chunksize=2, columns=["ChestWidth"]))
+    assert [len(c) for c in chunks] == [2, 1]
+    assert "Color" not in chunks[0].columns
+    full = load_shirt_data(path)[["ShirtName", "ChestWidth", "WeightOz", "Weight"]]
+    pd.testing.assert_frame_equal(pd.concat(chunks), full)
+    os.unlink(path)
+
+
+CATALOG_CSV = """ShirtName,Brand,WeightOz,ChestWidth,ShoulderWidth,Fit Verdict
+A,Gildan,5.5,19.0,17.0,"Too boxy, keep for lounging"
+B,Uniqlo,,20.25,,
+C,Gildan,6.1,21.5,18.0,Fine
+"""
+
+
+def test_load_shirt_data_types_columns_from_schema():
+    path = write_temp_csv(CATALOG_CSV)
+    df = load_shirt_data(path)
+    assert df["ChestWidth"].dtype == "float64"
+    assert df["Brand"].dtype == "category"
+    assert "Fit Verdict" in df.columns
+
+    slim = load_shirt_data(path, columns=["ChestWidth"], float_dtype="float32")
+    assert list(slim.columns) == ["ShirtName", "WeightOz", "ChestWidth", "Weight"]
+    assert slim["ChestWidth"].dtype == "float32" and slim["Weight"].dtype == "float32"
+    assert slim["ChestWidth"].tolist() == [19.0, 20.25, 21.5]
+    os.unlink(path)
+
+
+def test_load_shirt_data_reports_malformed_values():
+    path = write_temp_csv("ShirtName,ChestWidth,WeightOz\nA,19.0,5.5\nB,twenty,6.0\n")
+    with pytest.raises(ValueError, match=r"line 3, column 'ChestWidth'.*'twenty'"):
+        load_shirt_data(path)
+    with pytest.raises(ValueError, match=r"line 3, column 'ChestWidth'"):
+        list(iter_shirt_chunks(path, chunksize=1))
+    os.unlink(path)
+
+    path = write_temp_csv("ShirtName,ChestWidth\nA,19.0\nB,20.0,extra,fields\n")
+    with pytest.raises(ValueError, match="Malformed shirt data"):
+        load_shirt_data(path)
+    os.unlink(path)
+
+
+def test_load_shirt_data_empty_file_warns():
+    path = write_temp_csv("")
+    assert load_shirt_data(path).empty
+    os.unlink(path)
+
+
+def test_load_shirt_data_pyarrow_engine_matches():
+    pytest.importorskip("pyarrow")
+    path = write_temp_csv(CATALOG_CSV)
+    expected = load_shirt_data(path, columns=["ChestWidth", "ShoulderWidth"])
+    got = load_shirt_data(path, columns=["ChestWidth", "ShoulderWidth"], engine="pyarrow")
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+    assert got["ChestWidth"].dtype == "float64"
+    os.unlink(path)
+
+
+def test_load_body_measurements_skips_notes():
+    csv = """Measurement,Value,Notes
+ChestWidth,18.5,"Measured twice, confident"
+ShoulderWidth,17.0,
+"""
+    path = write_temp_csv(csv)
+    assert load_body_measurements(path) == {"ChestWidth": 18.5, "ShoulderWidth": 17.0}
+    os.unlink(path)
@@ -4,7 +4,8 @@ import os
 import pandas as pd
 import pytest
 from utils.data_loader import load_body_measurements, load_shirt_data
-from evaluate import score_shirts, evaluate_fit
+from evaluate import main, score_shirts, evaluate_fit, evaluate_bodies, evaluate_fit_streaming
+from utils.profiling import PipelineProfiler
 
 # Paths to test data (relative to this test file)
 BODY_PATH = os.path.join(os.path.dirname(__file__), "sample_body.csv")
@@ -40,6 +41,11 @@ def test_evaluate_fit_pipeline(tmp_path):
 def test_score_shirts_with_style_profile():
     body = load_body_measurements(BODY_PATH)
     shirts = load_shirt_data(SHIRT_PATH)
+    # The sample shirts cross no relaxed threshold; a +2.25" chest is Oversized for
+    # core (relaxed_max 2.0) but a Relaxed Fit under the profile (+0.5 offset)
+    relaxed_tee = {"ShirtName": "Test Tee Relaxed", "ChestWidth": 20.75, "ShoulderWidth": 17.5,
+                   "BodyLength": 27.5, "HemWidth": 19.0, "SleeveLength": 8.5, "Weight": 4.6}
+    shirts = pd.concat([shirts, pd.DataFrame([relaxed_tee])], ignore_index=True)
     # Use a style profile that exists (e.g., 'relaxed'), adjust as needed
     results = score_shirts(body, shirts, style_profile="relaxed")
     assert isinstance(results, list)
@@ -68,3 +74,203 @@ def test_evaluate_fit_with_style_writes_correct_columns(tmp_path, profile):
         assert col in df.columns
     # Check that all rows have the correct StyleProfile
     assert all(df["StyleProfile"] == profile)
+
+
+def test_evaluate_bodies_writes_top_k(tmp_path):
+    bodies_path = os.path.join(os.path.dirname(__file__), "sample_bodies.csv")
+    out_path = tmp_path / "top_k.csv"
+    results = evaluate_bodies(bodies_path, SHIRT_PATH, str(out_path), top_k=2)
+    df = pd.read_csv(out_path)
+    assert len(df) == 3 * 2
+    assert df["BodyId"].tolist() == ["alex", "alex", "sam", "sam", "kai", "kai"]
+    assert df["Rank"].tolist() == [1, 2] * 3
+    assert len(results) == 6
+
+
+def test_score_shirts_parallel_matches_serial():
+    body = load_body_measurements(BODY_PATH)
+    shirts = pd.concat([load_shirt_data(SHIRT_PATH)] * 7, ignore_index=True)
+    serial = score_shirts(body, shirts, style_profile="slim")
+    parallel = score_shirts(body, shirts, style_profile="slim", workers=2)
+    assert parallel == serial
+
+
+def test_evaluate_bodies_parallel_matches_serial(tmp_path):
+    bodies_path = os.path.join(os.path.dirname(__file__), "sample_bodies.csv")
+    serial = evaluate_bodies(bodies_path, SHIRT_PATH, str(tmp_path / "a.csv"), top_k=3)
+    parallel = evaluate_bodies(bodies_path, SHIRT_PATH, str(tmp_path / "b.csv"), top_k=3, workers=2)
+    assert parallel == serial
+
+
+def test_score_shirts_with_several_profiles_is_wide():
+    body = load_body_measurements(BODY_PATH)
+    shirts = load_shirt_data(SHIRT_PATH)
+    wide = score_shirts(body, shirts, style_profile="slim,vintage_90s")
+    assert score_shirts(body, shirts, style_profile=["slim", "vintage_90s"]) == wide
+    assert score_shirts(body, shirts, style_profile="slim,vintage_90s", vectorized=False) == wide
+    for name, label in (("slim", "StyleSlim"), ("vintage_90s", "StyleVintage90s")):
+        single = score_shirts(body, shirts, style_profile=name)
+        for row, one in zip(wide, single):
+            for col in ("FitScore", "Confidence", "Tags", "Rationale"):
+                assert row[f"{label}{col}"] == one[f"Style{col}"]
+            assert row["CoreFitScore"] == one["CoreFitScore"]
+    assert "StyleProfile" not in wide[0]
+
+
+def test_evaluate_fit_all_profiles(tmp_path):
+    from utils.config_loader import list_style_profiles
+    results = evaluate_fit(BODY_PATH, SHIRT_PATH, str(tmp_path / "wide.csv"), style_profile="all")
+    df = pd.read_csv(tmp_path / "wide.csv")
+    profiles = list_style_profiles(os.path.dirname(os.path.dirname(__file__)))
+    assert len(profiles) > 1
+    assert {"StyleSlimFitScore", "StyleBoxyConfidence"} <= set(df.columns)
+    # Several profiles are compared against core, so rows sort by the core score
+    scores = [r["CoreFitScore"] for r in results]
+    assert scores == sorted(scores, reverse=True)
+    with pytest.raises(ValueError):
+        evaluate_bodies(os.path.join(os.path.dirname(__file__), "sample_bodies.csv"), SHIRT_PATH,
+                        str(tmp_path / "b.csv"), style_profile="slim,boxy")
+
+
+@pytest.fixture
+def big_catalog(tmp_path):
+    shirts = pd.concat([load_shirt_data(SHIRT_PATH)] * 9, ignore_index=True)
+    shirts["ShirtName"] = [f"{name} #{i}" for i, name in enumerate(shirts["ShirtName"])]
+    shirts["Notes"] = "unused column"
+    path = tmp_path / "catalog.csv"
+    shirts.to_csv(path, index=False)
+    return str(path)
+
+
+def test_streaming_writes_all_rows_in_catalog_order(tmp_path, big_catalog):
+    out_path = tmp_path / "stream.csv"
+    assert evaluate_fit_streaming(BODY_PATH, big_catalog, str(out_path), chunksize=4) == []
+    streamed = pd.read_csv(out_path)
+    expected = pd.DataFrame(score_shirts(load_body_measurements(BODY_PATH), load_shirt_data(big_catalog)))
+    assert len(streamed) == 27
+    assert streamed["ShirtName"].tolist() == expected["ShirtName"].tolist()
+    assert streamed["CoreRationale"].tolist() == expected["CoreRationale"].tolist()
+
+
+@pytest.mark.parametrize("flags", [["--cache", "cache.sqlite"], ["--workers", "2"], ["--incremental"]])
+def test_streaming_rejects_options_it_cannot_honour(monkeypatch, capsys, flags):
+    monkeypatch.setattr("sys.argv", ["evaluate.py", "--chunksize", "4"] + flags)
+    with pytest.raises(SystemExit) as exc:
+        main()
+    assert exc.value.code == 2
+    assert flags[0] in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("profile", [None, "slim"])
+def test_streaming_top_k_matches_in_memory(tmp_path, big_catalog, profile):
+    expected = evaluate_fit(BODY_PATH, big_catalog, str(tmp_path / "a.csv"), style_profile=profile, top_k=5)
+    streamed = evaluate_fit_streaming(
+        BODY_PATH, big_catalog, str(tmp_path / "b.csv"), style_profile=profile, chunksize=4, top_k=5
+    )
+    assert streamed == expected
+    assert pd.read_csv(tmp_path / "b.csv")["ShirtName"].tolist() == [r["ShirtName"] for r in expected]
+
+
+def test_evaluate_bodies_streaming_matches_in_memory(tmp_path, big_catalog):
+    bodies_path = os.path.join(os.path.dirname(__file__), "sample_bodies.csv")
+    expected = evaluate_bodies(bodies_path, big_catalog, str(tmp_path / "a.csv"), top_k=4)
+    streamed = evaluate_bodies(bodies_path, big_catalog, str(tmp_path / "b.csv"), top_k=4, chunksize=5)
+    assert streamed == expected
+
+
+def test_evaluate_bodies_index_matches_full_scan(tmp_path, big_catalog):
+    bodies_path = os.path.join(os.path.dirname(__file__), "sample_bodies.csv")
+    expected = evaluate_bodies(bodies_path, big_catalog, str(tmp_path / "a.csv"), top_k=4)
+    indexed = evaluate_bodies(bodies_path, big_catalog, str(tmp_path / "b.csv"), top_k=4, index=True)
+    assert indexed == expected
+
+
+def test_evaluate_fit_writes_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    out_path = tmp_path / "fit_results.parquet"
+    results = evaluate_fit(BODY_PATH, SHIRT_PATH, str(out_path))
+    df = pd.read_parquet(out_path)
+    assert df["ShirtName"].tolist() == [r["ShirtName"] for r in results]
+    assert str(df["CoreFitScore"].dtype).lower() == "uint8"
+
+
+def test_top_k_renders_only_winners(big_catalog):
+    body = load_body_measurements(BODY_PATH)
+    shirts = load_shirt_data(big_catalog)
+    full = pd.DataFrame(score_shirts(body, shirts, style_profile="slim"))
+    full = full.sort_values("StyleFitScore", ascending=False, kind="stable")
+    top = score_shirts(body, shirts, style_profile="slim", top_k=4)
+    assert top == full.head(4).to_dict(orient="records")
+    assert score_shirts(body, shirts, style_profile="slim", top_k=4, workers=2) == top
+
+
+def test_no_rationale_output(tmp_path):
+    out_path = tmp_path / "lean.csv"
+    results = evaluate_fit(BODY_PATH, SHIRT_PATH, str(out_path), style_profile="slim", rationale=False)
+    df = pd.read_csv(out_path)
+    assert not [col for col in df.columns if col.endswith("Rationale")]
+    assert "StyleProfile" in df.columns and len(results) == 3
+
+
+def _scored_rows(profiler):
+    return next(s["rows"] for s in profiler.stages if s["stage"] == "score")
+
+
+def test_incremental_rescores_only_changed_shirts(tmp_path, big_catalog):
+    out_path = str(tmp_path / "inc.csv")
+    first = evaluate_fit(BODY_PATH, big_catalog, out_path, style_profile="slim", incremental=True)
+    assert first == evaluate_fit(BODY_PATH, big_catalog, str(tmp_path / "full0.csv"), style_profile="slim")
+
+    shirts = pd.read_csv(big_catalog)
+    shirts.loc[4, "ChestWidth"] += 1.0
+    shirts = pd.concat([shirts.drop(index=7), shirts.iloc[[2]].assign(ShirtName="New Tee")], ignore_index=True)
+    changed = tmp_path / "catalog2.csv"
+    shirts.to_csv(changed, index=False)
+
+    with PipelineProfiler() as profiler:
+        merged = evaluate_fit(BODY_PATH, str(changed), out_path, style_profile="slim",
+                              incremental=True, profiler=profiler)
+    assert _scored_rows(profiler) == 2  # the edited row and the new one
+    full_path = tmp_path / "full.csv"
+    assert merged == evaluate_fit(BODY_PATH, str(changed), str(full_path), style_profile="slim")
+    assert (tmp_path / "inc.csv").read_text() == full_path.read_text()
+
+    # Another config rescores everything
+    with PipelineProfiler() as profiler:
+        evaluate_fit(BODY_PATH, str(changed), out_path, style_profile="boxy", incremental=True, profiler=profiler)
+    assert _scored_rows(profiler) == len(shirts)
+    with pytest.raises(ValueError):
+        evaluate_fit(BODY_PATH, str(changed), out_path, top_k=3, incremental=True)
+
+
+def test_incremental_bodies_rank_only_changed_bodies(tmp_path, big_catalog, caplog):
+    bodies = pd.read_csv(os.path.join(os.path.dirname(__file__), "sample_bodies.csv"))
+    bodies_path = tmp_path / "bodies.csv"
+    bodies.to_csv(bodies_path, index=False)
+    out_path = str(tmp_path / "top.csv")
+    evaluate_bodies(str(bodies_path), big_catalog, out_path, top_k=4, incremental=True)
+
+    bodies.loc[1, "ChestWidth"] += 1.5
+    bodies.to_csv(bodies_path, index=False)
+    with caplog.at_level("INFO", logger="evaluate"):
+        merged = evaluate_bodies(str(bodies_path), big_catalog, out_path, top_k=4, incremental=True)
+    assert "ranking 1 of 3 bodies" in caplog.text
+    full_path = tmp_path / "full.csv"
+    assert merged == evaluate_bodies(str(bodies_path), big_catalog, str(full_path), top_k=4)
+    assert (tmp_path / "top.csv").read_text() == full_path.read_text()
+
+
+def test_missing_data_is_logged_once_as_counts(caplog):
+    body = load_body_measurements(BODY_PATH)
+    shirts = load_shirt_data(SHIRT_PATH)
+    shirts.loc[[0, 2], "HemWidth"] = None
+    shirts.loc[1, "Weight"] = None
+    body.pop("HemWidth")
+    lines = []
+    for vectorized in (True, False):
+        caplog.clear()
+        with caplog.at_level("DEBUG"):
+            score_shirts(body, shirts, vectorized=vectorized)
+        assert not [r for r in caplog.records if r.levelname == "WARNING"]
+        lines.append([r.getMessage() for r in caplog.records if r.getMessage().startswith("Missing data")])
+    assert lines[0] == lines[1] == ["Missing data (shirts of 3 per aspect, scored as 50): hem 2, weight 1"]
@@ -0,0 +1,36 @@
+# tests/test_fingerprint.py
+
+import numpy as np
+from evaluate import load_models
+from utils.fingerprint import digest, load_run_state, model_fingerprint, row_fingerprints, save_run_state
+from tests.test_batch import random_catalog
+
+
+def test_row_fingerprints_track_row_content():
+    shirts = random_catalog(n=50, seed=3)
+    before = row_fingerprints(shirts, ["ShirtName", "ChestWidth", "Weight"])
+    edited = shirts.copy()
+    edited.loc[8, "ChestWidth"] += 0.25
+    edited.loc[11, "HemWidth"] += 1.0  # not a fingerprinted column
+    after = row_fingerprints(edited, ["ShirtName", "ChestWidth", "Weight"])
+    assert np.flatnonzero(before != after).tolist() == [8]
+    # Reordering rows moves fingerprints with them
+    assert row_fingerprints(shirts.iloc[::-1], ["ShirtName", "ChestWidth"]).tolist() == \
+        row_fingerprints(shirts, ["ShirtName", "ChestWidth"])[::-1].tolist()
+
+
+def test_model_fingerprint_follows_config_content():
+    core_model, slim_model = load_models("slim")
+    assert model_fingerprint(core_model) == model_fingerprint(load_models()[0])
+    assert model_fingerprint(core_model) != model_fingerprint(slim_model)
+    assert digest({"a": 1.0, "b": float("nan")}) == digest({"b": float("nan"), "a": 1.0})
+
+
+def test_run_state_is_stale_after_output_changes(tmp_path):
+    out_path = tmp_path / "results.csv"
+    out_path.write_text("ShirtName\nA\n")
+    save_run_state(out_path, "hash", [1])
+    assert load_run_state(out_path, "hash")["fingerprints"].tolist() == [1]
+    assert load_run_state(out_path, "other") is None
+    out_path.write_text("ShirtName\nA\nB\n")
+    assert load_run_state(out_path, "hash") is None
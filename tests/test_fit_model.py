@@ -1,10 +1,15 @@
 # tests/test_fit_model.py
 
 import os
+import subprocess
+import sys
+import pytest
+import models.fit_model as fit_model
 from utils.data_loader import load_body_measurements, load_shirt_data
 from models.fit_model import score_fit, bulk_projection_profile
 
 DATA_DIR = os.path.dirname(__file__)
+REPO_ROOT = os.path.dirname(DATA_DIR)
 
 
 def test_score_fit_on_sample_data():
@@ -91,3 +96,33 @@ def test_bulk_confidence_lower():
     assert (
         bulk["Confidence"] <= normal["Confidence"]
     ), "Bulk confidence should not exceed normal profile confidence"
+
+
+def test_import_does_not_load_config():
+    code = (
+        "import models.fit_model as fm, utils.config_loader as cl\n"
+        "assert fm._DEFAULT_MODEL is None and not cl._CONFIG_CACHE\n"
+        "fm.get_default_model()\n"
+        "assert fm._DEFAULT_MODEL is not None\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True)
+
+
+def test_import_from_other_working_directory(tmp_path):
+    code = (
+        "from models.fit_model import score_fit, ASPECTS\n"
+        "r = score_fit({'ChestWidth': 18.5}, {'ChestWidth': 21.0, 'ShoulderWidth': 18.0})\n"
+        "assert 'chest' in ASPECTS and r['Confidence'] > 0\n"
+    )
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=env, check=True)
+
+
+def test_legacy_module_views_match_default_model():
+    model = fit_model.get_default_model()
+    assert fit_model.DEFAULT_MODEL is model
+    assert fit_model.ASPECTS == model.aspect_names
+    assert fit_model.WEIGHTS is model.weights
+    assert fit_model.ASPECT_SCORERS["chest"]["scorer"] == "score_chest"
+    with pytest.raises(AttributeError):
+        fit_model.NOT_A_SETTING
@@ -0,0 +1,78 @@
+# tests/test_memo.py
+
+import gc
+import os
+import weakref
+import pytest
+from evaluate import load_models, score_shirts
+from models.fit_model import bulk_projection_profile, score_fit
+from models.compiled import compile_model
+from models.memo import ScoreMemo
+from utils.config_loader import load_model_config
+from utils.data_loader import load_body_measurements, load_shirt_data
+from tests.test_batch import random_catalog
+
+DATA_DIR = os.path.dirname(__file__)
+BODY = {"ChestWidth": 18.5, "ShoulderWidth": 17.0, "TorsoLength": 27.0, "HemWidth": 18.0, "SleeveLength": 8.0}
+
+
+def test_memo_matches_unmemoized_scores():
+    # Repeat every shirt so both whole-result and per-aspect entries get hits
+    shirts = random_catalog(n=150, seed=5)
+    rows = [row.to_dict() for _, row in shirts.iterrows()] * 3
+    core_model, style_model = load_models("slim")
+    memo = ScoreMemo()
+    for model in (core_model, style_model):
+        for row in rows:
+            assert score_fit(BODY, row, model, memo) == score_fit(BODY, row, model)
+    stats = memo.stats
+    assert stats["hits"] > 0 and stats["misses"] > 0
+    assert stats["size"] == len(memo) <= stats["maxsize"]
+
+
+def test_memo_evicts_least_recently_used():
+    memo = ScoreMemo(maxsize=2)
+    memo.put("a", 1)
+    memo.put("b", 2)
+    assert memo.get("a") == 1  # "b" is now least recently used
+    memo.put("c", 3)
+    assert memo.get("b") is None
+    assert memo.get("a") == 1 and memo.get("c") == 3
+    assert memo.stats == {"hits": 3, "misses": 1, "evictions": 1, "size": 2, "maxsize": 2, "hit_rate": 0.75}
+    with pytest.raises(ValueError):
+        ScoreMemo(maxsize=0)
+
+
+def test_memo_results_are_not_shared():
+    memo = ScoreMemo()
+    shirt = random_catalog(n=1, seed=1, missing=0).iloc[0].to_dict()
+    first = score_fit(BODY, shirt, memo=memo)
+    first["Tags"].append("Edited")
+    assert "Edited" not in score_fit(BODY, shirt, memo=memo)["Tags"]
+
+    projected = bulk_projection_profile(BODY, memo=memo)
+    projected["ChestWidth"] = 0.0
+    assert bulk_projection_profile(BODY, memo=memo) == bulk_projection_profile(BODY)
+
+
+def test_memo_does_not_keep_models_alive():
+    memo = ScoreMemo()
+    shirt = random_catalog(n=1, seed=2, missing=0).iloc[0].to_dict()
+    model = compile_model(load_model_config())
+    expected = score_fit(BODY, shirt, model, memo)
+    ref = weakref.ref(model)
+    del model
+    gc.collect()
+    assert ref() is None
+    # A recompiled model with the same content reuses the entries
+    size, hits = len(memo), memo.hits
+    assert score_fit(BODY, shirt, compile_model(load_model_config()), memo) == expected
+    assert len(memo) == size and memo.hits == hits + 1
+
+
+def test_rowwise_scoring_with_memo_matches_vectorized():
+    body = load_body_measurements(os.path.join(DATA_DIR, "sample_body.csv"))
+    shirts = load_shirt_data(os.path.join(DATA_DIR, "sample_shirts.csv"))
+    assert score_shirts(body, shirts, style_profile="relaxed", vectorized=False) == score_shirts(
+        body, shirts, style_profile="relaxed"
+    )
@@ -0,0 +1,209 @@
+# tests/test_piecewise.py
+
+import math
+import numpy as np
+import pytest
+from types import MappingProxyType
+from models import scorers
+from models.piecewise import PiecewiseTable, Piece, chest_table
+
+
+# Reference if-chains: the scorers as they were written before being compiled into tables.
+
+def chain_chest(d, p):
+    if d < -0.5:
+        return max(0, 100 + d * p["too_tight_penalty"]), "Too Tight", f'Chest: {d:+.1f}" vs body (tight).'
+    if d < 0:
+        return max(0, 100 + d * p["slim_penalty"]), "Slim Fit", f'Chest: {d:+.1f}" vs body (slim).'
+    if d < 0.5:
+        return 100, None, f'Chest: {d:+.1f}" vs body (close fit).'
+    if d < p["relaxed_max"]:
+        return 100, "Relaxed Fit", f'Chest: {d:+.1f}" vs body (relaxed).'
+    if d < p["oversized_max"]:
+        return 95, "Oversized", f'Chest: {d:+.1f}" vs body (oversized).'
+    if d < p["comically_oversized_max"]:
+        return (85 - (d - p["oversized_max"]) * p["very_oversized_penalty"], "Very Oversized",
+                f'Chest: {d:+.1f}" vs body (very oversized).')
+    return (70 - (d - p["comically_oversized_max"]) * p["very_oversized_penalty"], "Comically Oversized",
+            f'Chest: {d:+.1f}" vs body (comically oversized).')
+
+
+def chain_shoulder(d, p):
+    if d < -0.5:
+        return (max(0, 100 + d * p["too_narrow_penalty"]), "Shoulders Too Narrow",
+                f'Shoulder: {d:+.1f}" vs body (too narrow).')
+    if d < 0.5:
+        return 100, None, f'Shoulder: {d:+.1f}" vs body (fitted).'
+    if d < p["drop_max"]:
+        return 100, "Drop-Shoulder", f'Shoulder: {d:+.1f}" vs body (drop-shoulder).'
+    return (max(60, 100 - (d - p["drop_max"]) * p["very_oversized_penalty"]), "Very Oversized Shoulders",
+            f'Shoulder: {d:+.1f}" vs body (very oversized).')
+
+
+def chain_length(d, p):
+    for key, score, tag, label in [("cropped_min", 50, "Cropped", "cropped"), ("short_max", 70, "Short Length", "short"),
+                                   ("ideal_max", 100, None, "ideal"), ("long_max", 90, None, "long")]:
+        if d < p[key]:
+            return score, tag, f'Length: {d:+.1f}" vs body ({label}).'
+    return p["very_long_penalty"], "Very Long", f'Length: {d:+.1f}" vs body (very long).'
+
+
+def chain_hem_body(d, p):
+    if d < 0:
+        return max(0, 100 - abs(d) * p["too_tight_penalty"]), "Tight Waist", f'Hem: {d:+.1f}" vs body.'
+    if d < p["flared_min"]:
+        return 100, None, f'Hem: {d:+.1f}" vs body.'
+    return 90, "Flared Hem", f'Hem: {d:+.1f}" vs body.'
+
+
+def chain_hem_chest(d, p):
+    if d < -p["box_cut_max"]:
+        return p["tapered_penalty"], "Tapered Waist", f'Hem: {d:+.1f}" vs chest.'
+    if d < p["box_cut_max"]:
+        return 100, "Boxy Cut", f'Hem: {d:+.1f}" vs chest.'
+    return 90, "Flared Hem", f'Hem: {d:+.1f}" vs chest.'
+
+
+def chain_sleeve(d, p):
+    for key, score, tag, label in [("cap_min", "cap_score", "Cap Sleeve", "cap"),
+                                   ("short_max", "short_score", "Short Sleeve", "short"),
+                                   ("ideal_max", "ideal_score", None, "ideal"),
+                                   ("elbow_max", "elbow_score", None, "long")]:
+        if d < p[key]:
+            return p[score], tag, f'Sleeve: {d:+.1f}" vs body ({label}).'
+    return p["elbow_score"], "Elbow Sleeve", f'Sleeve: {d:+.1f}" vs body (elbow length).'
+
+
+def chain_weight(w, p):
+    for key, score, tag, label in [("light_max", "light_score", "Lightweight", "light"),
+                                   ("mid_max", "mid_score", "Midweight", "midweight"),
+                                   ("heavy_max", "heavy_score", "Heavyweight", "heavyweight")]:
+        if w < p[key]:
+            return p[score], tag, f"Weight: {w:.1f} oz ({label})."
+    return p["very_heavy_score"], "Very Heavy", f"Weight: {w:.1f} oz (very heavy)."
+
+
+def chain_ratio(r, p):
+    return scorers.score_by_ratio(r, p["fallback_ratio_bounds"])
+
+
+def random_params(rng):
+    """Random scoring params; thresholds are often out of order or equal."""
+    def threshold():
+        return float(rng.choice([rng.uniform(-4, 8), rng.integers(-4, 8), 0.5]))
+
+    def penalty():
+        return float(rng.choice([rng.uniform(0, 80), rng.integers(0, 80), 0.0]))
+
+    return {
+        "chest": {"too_tight_penalty": penalty(), "slim_penalty": penalty(), "relaxed_max": threshold(),
+                  "oversized_max": threshold(), "comically_oversized_max": threshold(),
+                  "very_oversized_penalty": penalty()},
+        "shoulder": {"too_narrow_penalty": penalty(), "drop_max": threshold(), "very_oversized_penalty": penalty()},
+        "length": {"cropped_min": threshold(), "short_max": threshold(), "ideal_max": threshold(),
+                   "long_max": threshold(), "very_long_penalty": int(rng.integers(0, 100)),
+                   "fallback_ratio_bounds": [
+                       (float(rng.uniform(1, 2)), int(rng.integers(0, 100)), f"T{i}", f"ratio {{{i}}}")
+                       for i in range(int(rng.integers(1, 5)))
+                   ]},
+        "hem": {"too_tight_penalty": penalty(), "flared_min": threshold(), "box_cut_max": threshold(),
+                "tapered_penalty": int(rng.integers(0, 100))},
+        "sleeve": {"cap_min": threshold(), "short_max": threshold(), "ideal_max": threshold(),
+                   "elbow_max": threshold(), "cap_score": 40, "short_score": 70.5, "ideal_score": 100,
+                   "elbow_score": int(rng.integers(0, 100))},
+        "weight": {"light_max": threshold(), "mid_max": threshold(), "heavy_max": threshold(), "light_score": 80,
+                   "mid_score": 100.0, "heavy_score": int(rng.integers(0, 100)), "very_heavy_score": 60},
+    }
+
+
+def probe_values(rng, params):
+    """Random diffs plus every threshold and its neighbouring floats."""
+    edges = [-0.5, 0.0, 0.5]
+    for aspect in params.values():
+        for value in aspect.values():
+            if isinstance(value, float):
+                edges += [value, -value]
+    edges += [upper for upper, _, _, _ in params["length"]["fallback_ratio_bounds"]]
+    edges = np.array(edges)
+    return np.concatenate([
+        rng.uniform(-10, 12, 200), np.round(rng.uniform(-10, 12, 100) * 2) / 2,
+        edges, np.nextafter(edges, -np.inf), np.nextafter(edges, np.inf),
+    ])
+
+
+ASPECTS = [
+    # (params aspect, reference chain, scalar scorer evaluated at diff d)
+    ("chest", chain_chest, lambda d, p: scorers.score_chest(0.0, d, p)),
+    ("shoulder", chain_shoulder, lambda d, p: scorers.score_shoulder(0.0, d, p)),
+    ("length", chain_length, lambda d, p: scorers.score_length(0.0, d, 20.0, p)),
+    ("hem", chain_hem_body, lambda d, p: scorers.score_hem(0.0, d, 20.0, p)),
+    ("hem", chain_hem_chest, lambda d, p: scorers.score_hem(None, d, 0.0, p)),
+    ("sleeve", chain_sleeve, lambda d, p: scorers.score_sleeve(0.0, d, None, p)),
+    ("weight", chain_weight, lambda d, p: scorers.score_weight(d, {}, {}, p)),
+    ("length", chain_ratio, lambda d, p: scorers.score_length(None, d, 1.0, p)),
+]
+
+
+def same(a, b):
+    """Bit-identical, and the same Python type (an int score stays an int)."""
+    if type(a) is not type(b):
+        return False
+    return (a == b and math.copysign(1, a) == math.copysign(1, b)) or (math.isnan(a) and math.isnan(b))
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_scalar_scorers_match_if_chains(seed):
+    rng = np.random.default_rng(seed)
+    params = random_params(rng)
+    for frozen in (False, True):
+        for aspect, chain, scorer in ASPECTS:
+            p = MappingProxyType(params[aspect]) if frozen else params[aspect]
+            for d in probe_values(rng, params).tolist():
+                expected, got = chain(d, p), scorer(d, p)
+                assert same(got[0], expected[0]) and got[1:] == expected[1:], (aspect, d, got, expected)
+
+
+def batch_reference(chain, p, d):
+    rows = [chain(v, p) for v in d.tolist()]
+    return np.array([float(r[0]) for r in rows]), [(r[1], r[2]) for r in rows]
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_batch_scorers_match_if_chains(seed):
+    rng = np.random.default_rng(seed)
+    params = {aspect: MappingProxyType(p) for aspect, p in random_params(rng).items()}
+    d = probe_values(rng, params)
+    zeros = np.zeros_like(d)
+    calls = [
+        ("chest", chain_chest, scorers.score_chest_batch(0.0, d, params["chest"])),
+        ("shoulder", chain_shoulder, scorers.score_shoulder_batch(0.0, d, params["shoulder"])),
+        ("length", chain_length, scorers.score_length_batch(0.0, d, zeros + 20.0, params["length"])),
+        ("hem", chain_hem_body, scorers.score_hem_batch(0.0, d, zeros + 20.0, params["hem"])),
+        ("hem", chain_hem_chest, scorers.score_hem_batch(np.nan, d, zeros, params["hem"])),
+        ("sleeve", chain_sleeve, scorers.score_sleeve_batch(0.0, d, zeros, params["sleeve"])),
+        ("weight", chain_weight, scorers.score_weight_batch(d, params["weight"])),
+        ("length", chain_ratio, scorers.score_length_batch(np.nan, d, zeros + 1.0, params["length"])),
+    ]
+    for aspect, chain, (scores, buckets, diffs, table) in calls:
+        expected_scores, expected_rows = batch_reference(chain, params[aspect], d)
+        assert scores.tobytes() == expected_scores.tobytes(), chain.__name__
+        rendered = [(table[b][0], table[b][1].format(diff=v)) for b, v in zip(buckets.tolist(), d.tolist())]
+        assert rendered == expected_rows, chain.__name__
+
+
+def test_tables_are_compiled_once_per_frozen_params():
+    params = MappingProxyType({"too_tight_penalty": 25, "slim_penalty": 10, "relaxed_max": 2.0, "oversized_max": 4.0,
+                               "comically_oversized_max": 6.0, "very_oversized_penalty": 5})
+    table = chest_table(params)
+    assert chest_table(params) is table
+    assert chest_table(dict(params)) is not table
+    assert table.thresholds == (-0.5, 0.0, 0.5, 2.0, 4.0, 6.0)
+    # Unsorted thresholds: a later, lower threshold can never fire
+    unsorted = PiecewiseTable.from_chain([1.0, 0.0, 2.0], [Piece(i) for i in range(4)])
+    assert unsorted.thresholds == (1.0, 1.0, 2.0)
+    assert [unsorted.bucket(v) for v in (0.5, 1.0, 1.5, 2.0, float("nan"))] == [0, 2, 2, 3, 3]
+    assert unsorted.lookup(1.5) == (2, None, "")
+    with pytest.raises(ValueError, match="pieces"):
+        PiecewiseTable((0.0,), (Piece(1),))
+    with pytest.raises(ValueError, match="diff"):
+        PiecewiseTable((), (Piece(1, template="{size}"),))
@@ -0,0 +1,67 @@
+# tests/test_profiling.py
+
+import json
+import os
+import pstats
+import pytest
+from evaluate import evaluate_fit, load_models
+from models.batch import score_fit_batch
+from utils.data_loader import load_body_measurements, load_shirt_data
+from utils.profiling import PipelineProfiler, stage
+
+DATA_DIR = os.path.dirname(__file__)
+BODY_PATH = os.path.join(DATA_DIR, "sample_body.csv")
+SHIRT_PATH = os.path.join(DATA_DIR, "sample_shirts.csv")
+
+
+def test_stages_record_time_rows_and_depth():
+    with PipelineProfiler() as profiler:
+        with profiler.stage("outer", rows=10):
+            with profiler.stage("inner") as record:
+                record["rows"] = 4
+        with stage(None, "ignored") as record:
+            record["rows"] = 1
+    outer, inner = profiler.stages
+    assert (outer["stage"], outer["depth"], outer["rows"]) == ("outer", 0, 10)
+    assert (inner["stage"], inner["depth"], inner["rows"]) == ("inner", 1, 4)
+    assert outer["seconds"] >= inner["seconds"] >= 0
+    assert profiler.report()["total_s"] >= outer["seconds"]
+
+
+def test_instrumented_model_counts_scorer_calls():
+    body = load_body_measurements(BODY_PATH)
+    shirts = load_shirt_data(SHIRT_PATH)
+    core_model, _ = load_models()
+    profiler = PipelineProfiler()
+    model = profiler.instrument(core_model)
+    with profiler.stage("batch"):
+        got = score_fit_batch(body, shirts, model)
+    assert got.equals(score_fit_batch(body, shirts, core_model))
+    counters = profiler.report()["aspects"]["batch"]
+    assert set(counters) == set(core_model.aspect_names)
+    assert all(c["calls"] == 1 and c["rows"] == len(shirts) for c in counters.values())
+
+
+def test_evaluate_fit_profile_report(tmp_path):
+    expected = evaluate_fit(BODY_PATH, SHIRT_PATH, str(tmp_path / "a.csv"), style_profile="slim")
+    with PipelineProfiler(cprofile=True) as profiler:
+        results = evaluate_fit(
+            BODY_PATH, SHIRT_PATH, str(tmp_path / "b.csv"), style_profile="slim", profiler=profiler
+        )
+    assert results == expected
+
+    profiler.write_report(tmp_path / "report.json")
+    report = json.loads((tmp_path / "report.json").read_text())
+    names = [s["stage"] for s in report["stages"]]
+    for name in ("load_body", "load_shirts", "score", "load_config", "score.core", "score.projections",
+                 "score.style", "render", "sort", "write"):
+        assert name in names
+    by_name = {s["stage"]: s for s in report["stages"]}
+    assert by_name["load_shirts"]["rows"] == len(expected)
+    assert by_name["score"]["rows_per_s"] > 0
+    assert set(report["aspects"]) == {"score.core", "score.projections", "score.style"}
+
+    profiler.dump_stats(tmp_path / "run.pstats")
+    assert pstats.Stats(str(tmp_path / "run.pstats")).total_calls > 0
+    with pytest.raises(ValueError):
+        PipelineProfiler().dump_stats(tmp_path / "none.pstats")
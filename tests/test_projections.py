@@ -0,0 +1,100 @@
+# tests/test_projections.py
+
+import os
+import pickle
+import pytest
+import yaml
+from evaluate import ROOT_DIR, load_models, score_shirts
+from models.batch import score_fit_records
+from models.fit_model import bulk_projection_profile
+from models.projections import (
+    Projection, load_projections, model_projection, projections_from_config, score_projections,
+)
+from utils.config_loader import load_projection_configs
+from utils.data_loader import load_body_measurements, load_shirt_data
+from tests.test_batch import random_catalog
+
+DATA_DIR = os.path.dirname(__file__)
+BODY = {"ChestWidth": 18.5, "ShoulderWidth": 17.0, "TorsoLength": 27.0, "HemWidth": 18.0, "SleeveLength": 8.0}
+
+
+def assert_same_results(got, expected):
+    for col in ("FitScore", "Confidence", "Tags", "Rationale"):
+        assert got[col].tolist() == expected[col].tolist(), col
+
+
+def test_stacked_scenarios_match_separate_scoring():
+    shirts = random_catalog(n=400, seed=7)
+    core_model, _ = load_models()
+    projections = load_projections(ROOT_DIR)
+    scored = score_projections(BODY, shirts, projections, core_model)
+    assert list(scored) == [p.name for p in projections]
+    for p in projections:
+        expected = score_fit_records(p.project_body(BODY), p.project_shirts(shirts), core_model).to_frame()
+        expected["Confidence"] = [int(round(c * p.confidence_mod)) for c in expected["Confidence"]]
+        assert_same_results(scored[p.name].to_frame(), expected)
+
+
+def test_bulk_projection_matches_bulk_profile():
+    shirts = random_catalog(n=200, seed=2)
+    core_model, _ = load_models()
+    bulk = model_projection(core_model)
+    assert bulk.project_body(BODY) == bulk_projection_profile(BODY, core_model)
+    got = score_projections(BODY, shirts, [bulk], core_model)["bulk"].to_frame()
+    expected = score_fit_records(bulk_projection_profile(BODY, core_model), shirts, core_model).to_frame()
+    assert got["FitScore"].tolist() == expected["FitScore"].tolist()
+    assert got["Confidence"].tolist() == [int(round(c * 0.85)) for c in expected["Confidence"]]
+
+
+def test_sweep_expands_into_named_scenarios():
+    config = {"increments": {"ShoulderWidth": 0.5}, "sweep": {"ChestWidth": [-1.0, 0.5]}, "confidence_mod": 0.9}
+    low, high = projections_from_config("chest_sweep", config)
+    assert (low.name, high.name) == ("chest_sweep-1", "chest_sweep+0.5")
+    assert (low.label, high.label) == ("ChestSweep-1", "ChestSweep+0.5")
+    assert dict(low.increments) == {"ShoulderWidth": 0.5, "ChestWidth": -1.0}
+    assert high.confidence_mod == 0.9
+
+
+def test_shrinkage_scores_shrunk_shirts():
+    shirts = random_catalog(n=300, seed=4)
+    shrink = Projection("wash", {}, shirt_shrinkage={"ChestWidth": 0.05, "BodyLength": 0.04})
+    shrunk = shirts.copy()
+    shrunk["ChestWidth"] = shrunk["ChestWidth"] * 0.95
+    shrunk["BodyLength"] = shrunk["BodyLength"] * 0.96
+    got = score_projections(BODY, shirts, [shrink])["wash"].to_frame()
+    assert_same_results(got, score_fit_records(BODY, shrunk).to_frame())
+
+
+def test_projection_configs_are_validated(tmp_path):
+    proj_dir = tmp_path / "config" / "projections"
+    proj_dir.mkdir(parents=True)
+    (proj_dir / "bad.yaml").write_text(yaml.safe_dump({"increments": {"ChestWidth": 1}, "confidence_mod": 1.5}))
+    with pytest.raises(ValueError, match="Projection 'bad'"):
+        load_projection_configs(tmp_path)
+    (proj_dir / "bad.yaml").write_text(yaml.safe_dump({"sweep": {"ChestWidth": 1}}))
+    with pytest.raises(ValueError, match="sweep"):
+        load_projection_configs(tmp_path)
+    (proj_dir / "bad.yaml").unlink()
+    with pytest.raises(ValueError, match="Unknown projection"):
+        load_projections(tmp_path, ["bulk"])
+
+
+def test_projection_pickles():
+    p = projections_from_config("cut", load_projection_configs(ROOT_DIR)["cut"])[0]
+    assert pickle.loads(pickle.dumps(p)) == p
+
+
+def test_score_shirts_adds_projection_columns():
+    body = load_body_measurements(os.path.join(DATA_DIR, "sample_body.csv"))
+    shirts = load_shirt_data(os.path.join(DATA_DIR, "sample_shirts.csv"))
+    projections = load_projections(ROOT_DIR, ["cut", "chest_sweep"])
+    plain = score_shirts(body, shirts)
+    results = score_shirts(body, shirts, projections=projections)
+    rowwise = score_shirts(body, shirts, projections=projections, vectorized=False)
+    assert results == rowwise
+    for row, base in zip(results, plain):
+        assert {k: row[k] for k in base} == base
+        for label in ("Cut", "ChestSweep-2", "ChestSweep+2"):
+            assert f"{label}FitScore" in row and f"{label}Rationale" in row
+    with pytest.raises(ValueError, match="overwrite"):
+        score_shirts(body, shirts, projections=[Projection("style", {})])
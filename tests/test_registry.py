@@ -0,0 +1,163 @@
+# tests/test_registry.py
+
+import os
+from collections import Counter
+import numpy as np
+import pandas as pd
+import pytest
+from utils.config_loader import load_model_config
+from models.batch import score_fit_records, score_matrix, top_k_fits
+from models.catalog_index import CatalogIndex
+from models.compiled import compile_model
+from models.fit_model import score_fit
+from models.registry import SCORER_FUNCS, get_scorer, register_scorer
+from tests.test_batch import assert_matches_rowwise, random_bodies, random_catalog
+from utils.profiling import PipelineProfiler
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+BODY = {"ChestWidth": 18.5, "ShoulderWidth": 17.0, "TorsoLength": 27.0, "HemWidth": 18.0, "NeckWidth": 6.5}
+
+
+# A neck opening scorer that also reads the chest aspect's score: a loose neck on a
+# tight chest reads as a stretched collar.
+def score_neck(body_neck, shirt_neck, chest_score, params):
+    if body_neck is None or shirt_neck is None:
+        return 50, None, "[No neck data]"
+    diff = shirt_neck - body_neck
+    if diff < params["snug_max"]:
+        return 100, None, f'Neck: {diff:+.1f}" vs body.'
+    if chest_score < 80:
+        return 60, "Stretched Collar", f'Neck: {diff:+.1f}" vs body (stretched).'
+    return 90, "Wide Neck", f'Neck: {diff:+.1f}" vs body (wide).'
+
+
+def score_neck_batch(body_neck, shirt_neck, chest_score, params):
+    diff = shirt_neck - body_neck
+    valid = ~np.isnan(diff)
+    snug = np.where(valid, diff, 0.0) < params["snug_max"]
+    buckets = np.where(snug, 0, np.where(chest_score < 80, 1, 2))
+    scores = np.array([100.0, 60.0, 90.0])[buckets]
+    table = [
+        (None, 'Neck: {diff:+.1f}" vs body.'),
+        ("Stretched Collar", 'Neck: {diff:+.1f}" vs body (stretched).'),
+        ("Wide Neck", 'Neck: {diff:+.1f}" vs body (wide).'),
+        (None, "[No neck data]"),
+    ]
+    return np.where(valid, scores, 50.0), np.where(valid, buckets, 3).astype(np.int16), diff, table
+
+
+register_scorer("score_neck", score_neck, score_neck_batch, inputs=("body", "shirt", "score:chest"), replace=True)
+
+
+def neck_config():
+    config = load_model_config(config_dir=ROOT_DIR)
+    # Listed first, so it has to be evaluated out of config order
+    config["aspects"] = {
+        "neck": {"scorer": "score_neck", "body_field": "NeckWidth", "shirt_field": "NeckOpening", "weight": 0.1},
+        **config["aspects"],
+    }
+    config["scoring_params"]["neck"] = {"snug_max": 0.5}
+    return config
+
+
+def neck_catalog(n, seed):
+    shirts = random_catalog(n=n, seed=seed)
+    rng = np.random.default_rng(seed)
+    shirts["NeckOpening"] = 6.5 + rng.choice(np.arange(-1, 2.5, 0.5), size=n)
+    shirts.loc[shirts.index % 7 == 0, "NeckOpening"] = np.nan
+    return shirts
+
+
+def test_registered_aspect_scores_in_every_path():
+    model = compile_model(neck_config())
+    assert [spec.name for spec in model.evaluation_order][:3] == ["chest", "neck", "shoulder"]
+    assert model.aspect_names[0] == "neck" and model.aspect("neck").depends_on == ("chest",)
+    assert "NeckOpening" in model.shirt_fields and "NeckWidth" in model.body_fields
+    assert SCORER_FUNCS["score_neck"] is score_neck and get_scorer("score_neck").batch is score_neck_batch
+
+    shirts = neck_catalog(300, seed=1)
+    assert_matches_rowwise(BODY, shirts, model)
+    result = score_fit(BODY, shirts.iloc[3].to_dict(), model)
+    assert result["Rationale"].startswith("Neck:")
+
+    bodies = random_bodies(n=4, seed=2)
+    bodies["NeckWidth"] = [6.0, 6.5, np.nan, 7.0]
+    fit_scores, _ = score_matrix(bodies, shirts, model)
+    for row, body in zip(fit_scores, bodies.drop(columns="BodyId").to_dict("records")):
+        expected = [score_fit(body, shirt, model)["FitScore"] for shirt in shirts.to_dict("records")]
+        assert np.array_equal(row, np.array([np.nan if s == "" else s for s in expected], dtype=np.float32),
+                              equal_nan=True)
+    index = CatalogIndex(shirts, model, block_size=32)
+    pd.testing.assert_frame_equal(index.top_k_fits(bodies, k=5), top_k_fits(bodies, shirts, k=5, model=model))
+
+
+def test_registry_rejects_bad_scorers_and_dependencies():
+    with pytest.raises(ValueError, match="already registered"):
+        register_scorer("score_chest", score_neck, score_neck_batch)
+    with pytest.raises(ValueError, match="Invalid scorer input"):
+        register_scorer("score_bad", score_neck, score_neck_batch, inputs=("body", "fabric"))
+
+    register_scorer("score_neck_loop", score_neck, score_neck_batch, inputs=("body", "shirt", "score:collar"),
+                    replace=True)
+    config = neck_config()
+    config["aspects"]["neck"]["scorer"] = "score_neck_loop"
+    with pytest.raises(ValueError, match="unknown aspect 'collar'"):
+        compile_model(config)
+    config["aspects"]["collar"] = {**config["aspects"]["neck"], "scorer": "score_neck"}
+    config["aspects"]["chest"]["scorer"] = "score_neck_loop"
+    config["scoring_params"]["chest"] = config["scoring_params"]["collar"] = {"snug_max": 0.5}
+    with pytest.raises(ValueError, match="depend on each other"):
+        compile_model(config)
+
+
+def test_aspects_without_required_inputs_are_skipped_and_counted(caplog):
+    model = compile_model(neck_config())
+    assert model.aspect("neck").requires == ((0, 1),)
+    assert model.aspect("hem").requires == ((0, 1), (1, 2)) and model.aspect("sleeve").requires == ((0, 1),)
+    # No ratio bounds in the default config: a body without TorsoLength has no length score
+    assert model.aspect("length").requires == ((0, 1),)
+
+    # Mostly missing (scored on the available rows only) and fully missing columns
+    shirts = random_catalog(n=400, seed=3, missing=0.7)
+    shirts["NeckOpening"] = np.nan
+    shirts.loc[shirts.index % 5 == 0, "NeckOpening"] = 7.0
+    body = {k: v for k, v in BODY.items() if k != "TorsoLength"}
+    for b in (body, {**body, "NeckWidth": None}, {}):
+        assert_matches_rowwise(b, shirts, model)
+
+    missing = Counter()
+    profiler = PipelineProfiler()
+    instrumented = profiler.instrument(model)
+    with caplog.at_level("DEBUG"), profiler.stage("rows"):
+        for shirt in shirts.to_dict("records"):
+            score_fit(body, shirt, instrumented, missing=missing)
+    assert not [r for r in caplog.records if r.levelname == "WARNING"]
+    with profiler.stage("batch"):
+        records = score_fit_records(body, shirts, instrumented)
+    assert records.missing_counts() == {name: missing[name] for name in model.aspect_names}
+    assert missing["length"] == len(shirts)
+    assert missing["neck"] == (shirts["NeckOpening"].isna()).sum()
+    counters = profiler.report()["aspects"]
+    assert "length" not in counters["rows"] and "length" not in counters["batch"]
+    assert counters["rows"]["neck"]["calls"] == counters["batch"]["neck"]["rows"] == len(shirts) - missing["neck"]
+
+    bodies = random_bodies(n=5, seed=4).drop(columns="TorsoLength")
+    bodies["NeckWidth"] = 6.5
+    index = CatalogIndex(shirts, model, block_size=64)
+    pd.testing.assert_frame_equal(index.top_k_fits(bodies, k=5), top_k_fits(bodies, shirts, k=5, model=model))
+
+
+def test_length_falls_back_to_ratio_only_with_bounds():
+    config = load_model_config(config_dir=ROOT_DIR)
+    config["scoring_params"]["length"]["fallback_ratio_bounds"] = [
+        [1.3, 70, "Short Length", "Length: short for the chest."], [9.0, 100, None, "Length: by chest ratio."],
+    ]
+    model = compile_model(config)
+    assert model.aspect("length").requires == ((0, 1), (1, 2))
+    body = {k: v for k, v in BODY.items() if k != "TorsoLength"}
+    shirts = random_catalog(n=200, seed=5)
+    assert_matches_rowwise(body, shirts, model)
+    assert "by chest ratio" in score_fit(body, {"ChestWidth": 20.0, "BodyLength": 28.0}, model)["Rationale"]
+    with pytest.raises(ValueError, match="not a body/shirt input"):
+        register_scorer("score_neck_bad", score_neck, score_neck_batch, inputs=("body", "shirt", "score:chest"),
+                        requires=[("body", "score:chest")])
@@ -0,0 +1,102 @@
+# tests/test_result_cache.py
+
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from evaluate import ROOT_DIR, score_shirts
+from models.projections import load_projections
+from utils.result_cache import ResultCache, fingerprint_items
+from tests.test_batch import random_catalog
+
+BODY = {"ChestWidth": 18.5, "ShoulderWidth": 17.0, "TorsoLength": 27.0, "HemWidth": 18.0, "SleeveLength": 8.0}
+
+
+def test_cached_score_shirts_matches_uncached(tmp_path):
+    shirts = random_catalog(n=300, seed=8)
+    shirts = shirts.iloc[list(range(300)) + list(range(50))].reset_index(drop=True)  # repeated rows
+    projections = load_projections(ROOT_DIR, ["cut"])
+    expected = score_shirts(BODY, shirts, style_profile="slim", projections=projections)
+    with ResultCache(tmp_path / "cache.sqlite") as cache:
+        assert score_shirts(BODY, shirts, style_profile="slim", projections=projections, cache=cache) == expected
+        assert cache.stats["misses"] == len(cache) == 300
+        assert score_shirts(BODY, shirts, style_profile="slim", projections=projections, cache=cache) == expected
+        assert cache.stats["hits"] == 300
+        # Another body, profile or option is another scope
+        other = {**BODY, "ChestWidth": 20.0}
+        assert score_shirts(other, shirts, cache=cache, top_k=5) == score_shirts(other, shirts, top_k=5)
+        assert score_shirts(BODY, shirts, rationale=False, cache=cache) == score_shirts(BODY, shirts, rationale=False)
+        assert len(cache) == 900
+
+    # A new process (here: a new connection) sees the stored rows
+    with ResultCache(tmp_path / "cache.sqlite") as cache:
+        assert score_shirts(BODY, shirts, style_profile="slim", projections=projections, cache=cache) == expected
+        assert cache.stats["misses"] == 0
+        assert cache.totals()["hits"] == 600
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite", max_entries=2, touch_interval=0)
+    scope = cache.scope("test")
+    cache.put(scope, 1, "a")
+    time.sleep(0.01)
+    cache.put(scope, 2, "b")
+    time.sleep(0.01)
+    assert cache.get(scope, 1) == "a"  # 2 is now least recently used
+    time.sleep(0.01)
+    cache.put(scope, 3, "c")
+    assert cache.get(scope, 2) is None
+    assert cache.get_many(scope, [1, 3]) == {1: "a", 3: "c"}
+    assert cache.stats == {
+        "hits": 3, "misses": 1, "writes": 3, "evictions": 1, "size": 2, "max_entries": 2, "hit_rate": 0.75,
+    }
+    cache.put_many(scope, {1: "a2", 3: "c2"})  # replacing keeps the size
+    assert cache.stats["size"] == 2 and cache.stats["evictions"] == 1
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.totals()["hits"] == 3
+    with pytest.raises(ValueError):
+        ResultCache(tmp_path / "other.sqlite", max_entries=0)
+
+
+def test_warm_lookups_do_not_write(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite")
+    scope = cache.scope("test")
+    cache.put_many(scope, {1: "a", 2: "b"})
+    conn = cache._connection()
+    changes = conn.total_changes
+    for _ in range(5):
+        assert cache.get_many(scope, [1, 2, 3]) == {1: "a", 2: "b"}
+    assert conn.total_changes == changes
+    assert cache.totals()["hits"] == 10 and cache.totals()["misses"] == 5
+
+
+def test_entry_count_is_backfilled_for_older_files(tmp_path):
+    with ResultCache(tmp_path / "cache.sqlite") as cache:
+        cache.put_many(cache.scope("test"), {1: "a", 2: "b", 3: "c"})
+        cache._connection().execute("DELETE FROM counters WHERE name = 'entries'")
+    with ResultCache(tmp_path / "cache.sqlite", max_entries=2) as cache:
+        assert len(cache) == 3
+        cache.put(cache.scope("test"), 4, "d")
+        assert len(cache) == 2 and cache.stats["evictions"] == 2
+
+
+def _hammer(args):
+    cache, worker = args
+    scope = cache.scope("shared")
+    for i in range(50):
+        cache.put_many(scope, {worker * 1000 + i: (worker, i), i: i})
+        assert cache.get(scope, i) == i
+    cache.close()  # adds the pending hit counts to the file
+    return worker
+
+
+def test_cache_is_shared_between_processes(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite")
+    assert pickle.loads(pickle.dumps(cache)).path == cache.path
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_hammer, [(cache, w) for w in range(1, 5)]))
+    assert len(cache) == 4 * 50 + 50
+    totals = cache.totals()
+    assert totals["hits"] == 200 and totals["misses"] == 0
+    assert fingerprint_items([2 ** 64 - 1]) == [-1]
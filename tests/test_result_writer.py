@@ -0,0 +1,80 @@
+# tests/test_result_writer.py
+
+import pandas as pd
+import pytest
+from utils.result_writer import ResultWriter, output_format, read_results, to_columnar, write_results
+
+
+def sample_results():
+    return pd.DataFrame({
+        "ShirtName": ["A", "B", "C"],
+        "CoreFitScore": [95, "", 40],
+        "CoreConfidence": [83, 0, 67],
+        "CoreTags": ["Relaxed Fit; Ideal Length", "", "Relaxed Fit; Ideal Length"],
+        "CoreRationale": ["Chest: +0.5\" vs body (relaxed).", "No measurements available for this shirt.", "x"],
+    })
+
+
+def test_output_format_from_extension():
+    assert output_format("out/results.csv") == "csv"
+    assert output_format("out/results.PARQUET") == "parquet"
+    assert output_format("results.feather") == "feather"
+    assert output_format("results.txt") == "csv"
+
+
+def test_to_columnar_dtypes():
+    df = to_columnar(sample_results())
+    assert str(df["CoreFitScore"].dtype) == "UInt8"
+    assert df["CoreFitScore"].isna().tolist() == [False, True, False]
+    assert str(df["CoreConfidence"].dtype) == "UInt8"
+    assert isinstance(df["CoreTags"].dtype, pd.CategoricalDtype)
+    assert len(df["CoreTags"].cat.categories) == 2
+
+
+def test_csv_layout_unchanged(tmp_path):
+    path = tmp_path / "results.csv"
+    write_results(sample_results(), path)
+    expected = tmp_path / "expected.csv"
+    sample_results().to_csv(expected, index=False)
+    assert path.read_text() == expected.read_text()
+
+
+@pytest.mark.parametrize("name", ["results.parquet", "results.feather"])
+def test_columnar_round_trip(tmp_path, name):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / name
+    write_results(sample_results(), path)
+    read = pd.read_parquet(path) if name.endswith(".parquet") else pd.read_feather(path)
+    pd.testing.assert_frame_equal(read, to_columnar(sample_results()), check_dtype=False)
+    assert isinstance(read["CoreTags"].dtype, pd.CategoricalDtype)
+
+
+@pytest.mark.parametrize("name", ["results.csv", "results.parquet"])
+def test_read_results_restores_pipeline_values(tmp_path, name):
+    if name.endswith(".parquet"):
+        pytest.importorskip("pyarrow")
+    path = tmp_path / name
+    write_results(sample_results(), path)
+    read = read_results(path)
+    assert read.to_dict(orient="records") == sample_results().to_dict(orient="records")
+    # Written again, the file is unchanged
+    write_results(read, tmp_path / f"again_{name}")
+    if name.endswith(".csv"):
+        assert (tmp_path / f"again_{name}").read_text() == path.read_text()
+
+
+def test_streaming_parquet_chunks_with_different_tags(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "results.parquet"
+    df = sample_results()
+    with ResultWriter(path) as writer:
+        writer.write(df.iloc[:1])
+        writer.write(df.iloc[1:])
+    read = pd.read_parquet(path)
+    assert read["ShirtName"].tolist() == ["A", "B", "C"]
+    assert read["CoreFitScore"].isna().tolist() == [False, True, False]
+
+
+def test_streaming_feather_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Feather"):
+        ResultWriter(tmp_path / "results.feather")
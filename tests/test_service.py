@@ -0,0 +1,110 @@
+import io
+import json
+import os
+import threading
+import urllib.request
+import pandas as pd
+import pytest
+from evaluate import load_models
+from models.batch import top_k_fits
+from service import LatencyStats, ScoringService, make_http_server, serve_jsonl
+from utils.data_loader import load_shirt_data
+
+SHIRT_PATH = os.path.join(os.path.dirname(__file__), "sample_shirts.csv")
+BODIES = pd.read_csv(os.path.join(os.path.dirname(__file__), "sample_bodies.csv"))
+
+
+def _body(i):
+    return BODIES.drop(columns="BodyId").iloc[i].to_dict()
+
+
+def _expected(i, k, style_profile=None):
+    core_model, style_model = load_models(style_profile)
+    df = top_k_fits(BODIES.iloc[[i]], load_shirt_data(SHIRT_PATH), k=k, model=style_model or core_model)
+    return df.drop(columns="BodyId").to_dict(orient="records")
+
+
+@pytest.fixture
+def service():
+    with ScoringService(load_shirt_data(SHIRT_PATH), style_profiles=["slim"], max_wait_ms=50) as svc:
+        yield svc
+
+
+def test_service_matches_top_k_fits(service):
+    response = service.handle({"id": "a", "body": _body(0), "top_k": 3})
+    assert response == {"id": "a", "results": _expected(0, 3)}
+    response = service.handle({"id": "b", "body": _body(1), "top_k": 2, "style_profile": "slim"})
+    assert response["results"] == _expected(1, 2, "slim")
+
+
+def test_concurrent_requests_share_a_batch(service):
+    futures = [service.submit({"id": i, "body": _body(i % 2), "top_k": 1 + i % 3}) for i in range(6)]
+    responses = [f.result() for f in futures]
+    for i, response in enumerate(responses):
+        assert response == {"id": i, "results": _expected(i % 2, 1 + i % 3)}
+    stats = service.stats()
+    assert stats["requests"] == 6
+    assert stats["batches"] < 6
+    assert stats["p50_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+
+
+def test_bad_requests_get_errors(service):
+    assert "error" in service.handle({"id": 1, "body": {}})
+    assert "error" in service.handle({"id": 2, "body": _body(0), "top_k": 0})
+    assert "unknown style profile" in service.handle({"id": 3, "body": _body(0), "style_profile": "nope"})["error"]
+    assert service.stats()["requests"] == 0
+
+
+def test_reserved_body_keys_do_not_fail_the_batch(service):
+    good = service.submit({"id": "good", "body": _body(0), "top_k": 2})
+    bad = service.submit({"id": "bad", "body": {**_body(1), "BodyId": 7}, "top_k": 2})
+    assert good.result() == {"id": "good", "results": _expected(0, 2)}
+    assert "reserved keys: BodyId" in bad.result()["error"]
+
+
+def test_serve_jsonl_answers_in_order(service):
+    lines = [json.dumps({"id": i, "body": _body(i % 2), "top_k": 2}) for i in range(4)]
+    lines += ["not json", json.dumps({"op": "stats"})]
+    out = io.StringIO()
+    serve_jsonl(service, io.StringIO("\n".join(lines) + "\n"), out)
+    responses = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["id"] for r in responses[:4]] == [0, 1, 2, 3]
+    assert responses[0]["results"] == _expected(0, 2)
+    assert "invalid JSON" in responses[4]["error"]
+    assert "p99_ms" in responses[5]["stats"]
+
+
+def test_http_server_scores_and_reports_stats(service):
+    server = make_http_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        request = urllib.request.Request(
+            f"{base}/score",
+            data=json.dumps({"id": 7, "body": _body(1), "top_k": 2}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request) as resp:
+            assert json.load(resp) == {"id": 7, "results": _expected(1, 2)}
+        with urllib.request.urlopen(f"{base}/stats") as resp:
+            assert json.load(resp)["requests"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_index_backed_service_matches(service):
+    with ScoringService(load_shirt_data(SHIRT_PATH), index=True) as indexed:
+        assert indexed.handle({"body": _body(0), "top_k": 4}) == service.handle({"body": _body(0), "top_k": 4})
+
+
+def test_latency_stats_percentiles():
+    stats = LatencyStats(window=100)
+    assert stats.snapshot()["p50_ms"] is None
+    for ms in range(1, 101):
+        stats.record(ms / 1000.0)
+    snap = stats.snapshot()
+    assert snap["requests"] == 100
+    assert snap["p50_ms"] == pytest.approx(50.5)
+    assert snap["max_ms"] == pytest.approx(100.0)
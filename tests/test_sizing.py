@@ -0,0 +1,85 @@
+# tests/test_sizing.py
+
+import os
+import pandas as pd
+import pytest
+from evaluate import ROOT_DIR, evaluate_sizes, load_models
+from models.batch import score_fit_batch
+from models.sizing import best_sizes, grade_size_chart, load_size_chart, size_chart_from_table
+from utils.config_loader import load_size_grading, validate_size_grading
+from tests.test_batch import random_catalog
+
+DATA_DIR = os.path.dirname(__file__)
+BODY = {"ChestWidth": 20.0, "ShoulderWidth": 18.0, "TorsoLength": 28.0, "HemWidth": 19.5, "SleeveLength": 8.0}
+
+
+def expected_best(body, chart, model=None):
+    """Best size per garment by scoring the long table row by row (first wins ties)."""
+    long = chart.to_frame()
+    scored = score_fit_batch(body, long, model)
+    key = pd.to_numeric(scored["FitScore"], errors="coerce").fillna(-1) * 1000 + scored["Confidence"].astype(float)
+    best = key.groupby(long["ShirtName"], sort=False).idxmax()
+    rows = long.loc[best.to_numpy(), ["ShirtName", "Size"]].reset_index(drop=True)
+    rows["FitScore"] = scored.loc[best.to_numpy(), "FitScore"].tolist()
+    rows["Confidence"] = scored.loc[best.to_numpy(), "Confidence"].tolist()
+    rows["Tags"] = ["; ".join(tags) for tags in scored.loc[best.to_numpy(), "Tags"]]
+    rows["Rationale"] = scored.loc[best.to_numpy(), "Rationale"].tolist()
+    return rows
+
+
+def test_graded_best_sizes_match_row_scoring():
+    grading = load_size_grading(ROOT_DIR)
+    shirts = random_catalog(n=300, seed=11)
+    shirts["Tag Size"] = ["S", "M", "L", "", "XL"] * 60
+    chart = grade_size_chart(shirts, grading)
+    assert chart.shape == (300, len(grading["sizes"]))
+    # A garment measured at L is graded down for M and up for XL
+    m_col, grade = chart.sizes.index("M"), grading["grades"]["ChestWidth"]
+    assert chart.measurements["ChestWidth"][2, m_col] == shirts.loc[2, "ChestWidth"] - grade
+    _, slim = load_models("slim")
+    for model in (None, slim):
+        got = best_sizes(BODY, chart, model=model)
+        pd.testing.assert_frame_equal(got, expected_best(BODY, chart, model), check_dtype=False)
+
+
+def test_long_chart_only_offers_listed_sizes():
+    long = grade_size_chart(random_catalog(n=80, seed=3), load_size_grading(ROOT_DIR)).to_frame()
+    long = long[~long["Size"].isin(["XS", "S"]) | ((long.index // 6) % 2 == 0)].sample(frac=1.0, random_state=1)
+    chart = size_chart_from_table(long)
+    assert chart.sizes[:3] == ("XS", "S", "M")
+    got = best_sizes(BODY, chart)
+    offered = set(zip(long["ShirtName"], long["Size"]))
+    assert all((name, size) in offered for name, size in zip(got["ShirtName"], got["Size"]))
+    pd.testing.assert_frame_equal(got, expected_best(BODY, chart), check_dtype=False)
+
+    with pytest.raises(ValueError, match="more than once"):
+        size_chart_from_table(pd.concat([long, long.iloc[:1]]))
+    with pytest.raises(ValueError, match="size column"):
+        size_chart_from_table(long.drop(columns="Size"))
+
+
+def test_best_sizes_for_many_bodies():
+    chart = grade_size_chart(random_catalog(n=40, seed=5), load_size_grading(ROOT_DIR))
+    bodies = pd.read_csv(os.path.join(DATA_DIR, "sample_bodies.csv"))
+    # Small blocks so several body blocks are scored
+    got = best_sizes(bodies, chart, rationale=False, block_cells=500)
+    assert got.columns.tolist() == ["BodyId", "ShirtName", "Size", "FitScore", "Confidence", "Tags"]
+    for body_id, rows in got.groupby("BodyId", sort=False):
+        body = bodies[bodies["BodyId"] == body_id].iloc[0].drop("BodyId").to_dict()
+        expected = best_sizes(body, chart, rationale=False)
+        pd.testing.assert_frame_equal(rows.drop(columns="BodyId").reset_index(drop=True), expected,
+                                      check_dtype=False)
+
+
+def test_evaluate_sizes_writes_best_sizes(tmp_path):
+    out = tmp_path / "sizes.csv"
+    results = evaluate_sizes(
+        os.path.join(DATA_DIR, "sample_shirts.csv"), out, body_path=os.path.join(DATA_DIR, "sample_body.csv"),
+        grade=True,
+    )
+    assert len(results) == len(pd.read_csv(os.path.join(DATA_DIR, "sample_shirts.csv")))
+    assert pd.read_csv(out)["Size"].isin(load_size_grading(ROOT_DIR)["sizes"]).all()
+    chart = load_size_chart(os.path.join(DATA_DIR, "sample_shirts.csv"), grading=load_size_grading(ROOT_DIR))
+    assert chart.shape[1] == len(load_size_grading(ROOT_DIR)["sizes"])
+    with pytest.raises(ValueError, match="base_size"):
+        validate_size_grading({"sizes": ["S", "M"], "base_size": "L", "grades": {}})
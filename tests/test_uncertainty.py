@@ -0,0 +1,93 @@
+# tests/test_uncertainty.py
+
+import os
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from evaluate import evaluate_uncertainty
+from models.fit_model import get_default_model, score_fit
+from models.uncertainty import MeasurementNoise, _percentiles, load_noise, score_uncertainty
+from tests.test_batch import random_catalog
+from utils.config_loader import validate_measurement_noise
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+DATA_DIR = os.path.dirname(__file__)
+BODY = {"ChestWidth": 18.5, "ShoulderWidth": 17.0, "TorsoLength": 27.0, "HemWidth": 18.0, "SleeveLength": 8.0}
+
+
+def test_samples_match_score_fit_on_the_same_draws():
+    shirts = random_catalog(n=40, seed=2)
+    shirts.loc[3] = [shirts.loc[3, "ShirtName"]] + [np.nan] * 6
+    noise = MeasurementNoise(body={"ChestWidth": 0.5}, shirt={"ChestWidth": 0.5, "Fabric": 1.0}, samples=300,
+                             interval=0.8, seed=7)
+    got = score_uncertainty(BODY, shirts, noise)
+
+    # Same draws: body fields (sorted), then one block of shirts per noisy shirt field (sorted)
+    rng = np.random.default_rng(7)
+    body_chest = BODY["ChestWidth"] + rng.normal(0.0, 0.5, (300, 1))[:, 0]
+    shirt_chest = shirts["ChestWidth"].to_numpy() + rng.normal(0.0, 0.5, (300, len(shirts)))
+    for i, shirt in enumerate(shirts.to_dict("records")):
+        scores = np.array([
+            score_fit({**BODY, "ChestWidth": body_chest[s]}, {**shirt, "ChestWidth": shirt_chest[s, i]})["FitScore"]
+            for s in range(300)
+        ], dtype=object)
+        row = got.iloc[i]
+        assert row["FitScore"] == score_fit(BODY, shirt)["FitScore"]
+        if i == 3:
+            assert (scores == "").all() and row[1:].isna().all()
+            continue
+        scores = scores.astype(float)
+        assert row["FitScoreMean"] == pytest.approx(scores.mean())
+        assert row["FitScoreStd"] == pytest.approx(scores.std())
+        low, high = np.percentile(scores, [10, 90])
+        assert (row["FitScoreLow"], row["FitScoreHigh"]) == pytest.approx((low, high))
+        assert row["MarginOfError"] == pytest.approx((high - low) / 2)
+
+
+def test_zero_noise_and_blocks():
+    shirts = random_catalog(n=60, seed=3)
+    exact = score_uncertainty(BODY, shirts, MeasurementNoise(samples=5), block_cells=7)
+    fit = pd.to_numeric(exact["FitScore"].replace("", np.nan))
+    for col in ("FitScoreMean", "FitScoreLow", "FitScoreHigh"):
+        assert np.array_equal(exact[col].to_numpy(), fit.to_numpy(dtype=float), equal_nan=True)
+    assert (exact["FitScoreStd"].fillna(0) == 0).all()
+
+    noise = load_noise(ROOT_DIR)
+    assert noise.samples > 1 and noise.percentiles == pytest.approx((5.0, 95.0))
+    a = score_uncertainty(BODY, shirts, noise)
+    pd.testing.assert_frame_equal(a, score_uncertainty(BODY, shirts, noise))
+    assert (a["FitScoreLow"] <= a["FitScoreHigh"]).all() and (a["FitScoreStd"] > 0).any()
+    assert score_uncertainty(BODY, shirts.iloc[:0], noise).empty
+
+
+def test_percentiles_match_numpy():
+    rng = np.random.default_rng(0)
+    scores = rng.integers(0, 100, (51, 20)).astype(float)
+    scores[rng.random(scores.shape) < 0.3] = np.nan
+    scores[:, 4] = np.nan
+    scores[1:, 5] = np.nan
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        expected = np.nanpercentile(scores, [2.5, 50, 97.5], axis=0)
+    assert np.allclose(_percentiles(scores, [2.5, 50, 97.5]), expected, equal_nan=True)
+
+
+def test_evaluate_uncertainty_and_config_validation(tmp_path):
+    out = tmp_path / "moe.csv"
+    results = evaluate_uncertainty(
+        os.path.join(DATA_DIR, "sample_body.csv"), os.path.join(DATA_DIR, "sample_shirts.csv"), str(out),
+        samples=200, seed=1,
+    )
+    assert len(results) == 3 and list(pd.read_csv(out).columns)[:3] == ["ShirtName", "FitScore", "FitScoreMean"]
+    assert [r["FitScore"] for r in results] == sorted((r["FitScore"] for r in results), reverse=True)
+    assert all(r["MarginOfError"] >= 0 for r in results)
+
+    validate_measurement_noise({"samples": 10, "body": {"ChestWidth": 0.2}})
+    for bad in ({"samples": 0}, {"interval": 1.0}, {"seed": "x"}, {"shirt": {"Weight": -1}}, {"body": [1]}):
+        with pytest.raises(ValueError, match="Measurement noise"):
+            validate_measurement_noise(bad)
+    # The default noise covers every measurement the core model reads
+    noise = load_noise(ROOT_DIR)
+    model = get_default_model()
+    assert set(noise.body) == model.body_fields and set(noise.shirt) == model.shirt_fields
@@ -1,5 +1,14 @@
-import yaml
+import copy
+import hashlib
+import logging
+import os
+import pickle
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
+import yaml
+
+logger = logging.getLogger(__name__)
 
 
 def deep_merge_dicts(base, overlay):
@@ -28,7 +37,7 @@ def apply_overlays_to_aspects(base_aspects, overlay_aspects):
     for aspect, core_vals in base_aspects.items():
         merged_vals = core_vals.copy()
         if aspect in overlay_aspects:
-            for k, v in overlay_aspects[aspect].items():
+            for k, v in (overlay_aspects[aspect] or {}).items():
                 if k.endswith("_multiplier"):
                     base_key = k[: -len("_multiplier")]
                     if base_key in merged_vals:
@@ -54,7 +63,7 @@ def apply_overlay_to_adjustments(base_adj, overlay_adj):
     Similar logic for interaction_adjustments.
     """
     merged_adj = base_adj.copy()
-    for k, v in overlay_adj.items():
+    for k, v in (overlay_adj or {}).items():
         if k.endswith("_multiplier"):
             base_key = k[: -len("_multiplier")]
             if base_key in merged_adj:
@@ -78,39 +87,69 @@ def _find_root_dir(config_dir=None):
     return Path.cwd()
 
 
-def load_model_config(style_profile=None, config_dir=None):
+def _find_overlay_path(root_dir, style_profile):
     """
-    Loads `config/model_config.yaml` (core) and, if provided, merges in a style overlay.
+    Style overlays live in `config/style_profiles/`; a bare `style_profiles/`
+    next to the config directory is also accepted.
+    """
+    for candidate in (
+        root_dir / "style_profiles" / f"{style_profile}.yaml",
+        root_dir / "config" / "style_profiles" / f"{style_profile}.yaml",
+    ):
+        if candidate.exists():
+            return candidate
+    return None
 
-    - Overlay keys ending in `_multiplier` or `_offset` are applied to the core values, not simply replaced.
+
+def _split_aspect_overlay(base_config, overlay_aspects):
     """
-    root_dir = _find_root_dir(config_dir)
-    base_path = root_dir / "config" / "model_config.yaml"
-    with open(base_path) as f:
-        base_config = yaml.safe_load(f)
+    Style profiles list threshold tweaks (e.g. `relaxed_max_offset`) under `aspects`,
+    but the thresholds themselves live in `scoring_params`. Keys whose base name is a
+    scoring param (and not an aspect setting) are routed there.
+    """
+    aspect_overlay, param_overlay = {}, {}
+    base_aspects = base_config.get("aspects", {})
+    base_params = base_config.get("scoring_params") or {}
+    for aspect, vals in overlay_aspects.items():
+        aspect_overlay[aspect] = {}
+        for k, v in (vals or {}).items():
+            base_key = k
+            for suffix in ("_multiplier", "_offset"):
+                if k.endswith(suffix):
+                    base_key = k[: -len(suffix)]
+            if base_key in base_params.get(aspect, {}) and base_key not in base_aspects.get(aspect, {}):
+                param_overlay.setdefault(aspect, {})[k] = v
+            else:
+                aspect_overlay[aspect][k] = v
+    return aspect_overlay, param_overlay
 
-    if not style_profile:
-        return base_config
 
-    overlay_path = root_dir / "style_profiles" / f"{style_profile}.yaml"
-    if not overlay_path.exists():
-        return base_config
+def merge_style_overlay(base_config, overlay):
+    """
+    Returns a new config: `base_config` with a style overlay applied.
+    Neither argument is modified.
 
-    with open(overlay_path) as f:
-        overlay = yaml.safe_load(f)
+    - Overlay keys ending in `_multiplier` or `_offset` are applied to the core values, not simply replaced.
+    """
+    base_config = copy.deepcopy(base_config)
+    overlay = overlay or {}
 
-    # 1) Apply overlay to aspects
+    # 1) Apply overlay to aspects (threshold keys are split off for step 2)
+    param_overlay = {}
     if "aspects" in overlay:
+        aspect_overlay, param_overlay = _split_aspect_overlay(base_config, overlay.get("aspects") or {})
         base_config["aspects"] = apply_overlays_to_aspects(
-            base_config.get("aspects", {}), overlay.get("aspects", {})
+            base_config.get("aspects", {}), aspect_overlay
         )
+    for aspect, vals in (overlay.get("scoring_params") or {}).items():
+        param_overlay.setdefault(aspect, {}).update(vals or {})
 
     # 2) Apply overlay to scoring_params for each aspect (offsets/multipliers in scoring_params)
-    if "scoring_params" in overlay:
-        for aspect, overlay_vals in overlay["scoring_params"].items():
+    if param_overlay:
+        for aspect, overlay_vals in param_overlay.items():
             if aspect in base_config["scoring_params"]:
                 # Reconstruct that nested dict similarly
-                for k, v in overlay_vals.items():
+                for k, v in (overlay_vals or {}).items():
                     if k.endswith("_multiplier"):
                         base_key = k[: -len("_multiplier")]
                         base_config["scoring_params"][aspect][base_key] = (
@@ -127,11 +166,375 @@ def load_model_config(style_profile=None, config_dir=None):
     # 3) Apply overlay to interaction_adjustments
     if "interaction_adjustments" in overlay:
         base_config["interaction_adjustments"] = apply_overlay_to_adjustments(
-            base_config.get("interaction_adjustments", {}), overlay.get("interaction_adjustments", {})
+            base_config.get("interaction_adjustments", {}), overlay.get("interaction_adjustments")
         )
 
     # 4) Any other top‐level keys (e.g. projection_config) are fully replaced, as before
     if "projection_config" in overlay:
-        base_config["projection_config"] = overlay["projection_config"]
+        base_config["projection_config"] = copy.deepcopy(overlay["projection_config"])
 
     return base_config
+
+
+# --- Parsed-config cache ---
+# (root_dir, style_profile) -> (file stamps, merged config, frozen view).
+# A stamp is (path, mtime_ns, size) for the base file and the overlay (if any), so
+# editing either YAML file invalidates the entry on the next call.
+_CONFIG_CACHE = {}
+
+
+def _file_stamp(path):
+    if path is None:
+        return None
+    st = path.stat()
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+def _read_yaml(path):
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+def freeze_config(value):
+    """
+    Returns a read-only deep copy: dicts become MappingProxyType, lists become tuples.
+    """
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze_config(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_config(v) for v in value)
+    return value
+
+
+def invalidate_config_cache(config_dir=None):
+    """
+    Drops cached configs: all of them, or only those loaded from `config_dir`.
+    """
+    if config_dir is None:
+        _CONFIG_CACHE.clear()
+        _SOURCE_HASH_CACHE.clear()
+        _BUNDLE_CACHE.clear()
+        return
+    root = str(Path(config_dir).resolve())
+    for key in [k for k in _CONFIG_CACHE if k[0] == root]:
+        del _CONFIG_CACHE[key]
+    _SOURCE_HASH_CACHE.pop(root, None)
+    _BUNDLE_CACHE.pop(root, None)
+
+
+def load_model_config(style_profile=None, config_dir=None, frozen=False):
+    """
+    Loads `config/model_config.yaml` (core) and, if provided, merges in a style overlay.
+
+    Parsed configs are cached per process and re-read only when the base or overlay
+    file changes (mtime/size) or after `invalidate_config_cache()`. On a cache miss a
+    fresh `config/compiled_profiles.pkl` bundle (see `compile_profiles`) is used
+    instead of the YAML files.
+
+    Returns a private deep copy the caller may edit, or with `frozen=True` the shared
+    read-only (MappingProxyType) config, which costs no copy.
+    """
+    root_dir = _find_root_dir(config_dir)
+    base_path = root_dir / "config" / "model_config.yaml"
+    overlay_path = _find_overlay_path(root_dir, style_profile) if style_profile else None
+    key = (str(root_dir.resolve()), style_profile or None)
+    stamps = (_file_stamp(base_path), _file_stamp(overlay_path))
+
+    cached = _CONFIG_CACHE.get(key)
+    if cached is None or cached[0] != stamps:
+        config = _bundled_config(root_dir, style_profile if overlay_path is not None else None)
+        if config is None:
+            config = _read_yaml(base_path)
+            if overlay_path is not None:
+                config = merge_style_overlay(config, _read_yaml(overlay_path))
+        cached = (stamps, config, freeze_config(config))
+        _CONFIG_CACHE[key] = cached
+
+    if frozen:
+        return cached[2]
+    return copy.deepcopy(cached[1])
+
+
+# --- Precompiled profile bundle ---
+# `compile_profiles` merges the base config with every style profile, validates the
+# results and pickles them with a hash of the YAML sources. `load_model_config`
+# uses the bundle only while that hash still matches; otherwise it reads the YAML.
+# Per root_dir, the source hash is kept with the stamps of the files it covers and
+# the loaded bundle with its own stamp, so config cache misses re-read neither.
+_SOURCE_HASH_CACHE = {}  # root -> (source stamps, source hash)
+_BUNDLE_CACHE = {}  # root -> ((bundle stamp, source hash), configs or None)
+BUNDLE_FILENAME = "compiled_profiles.pkl"
+BUNDLE_FORMAT = 1
+_BASE_KEY = ""
+
+
+def _bundle_path(root_dir):
+    return root_dir / "config" / BUNDLE_FILENAME
+
+
+def _profile_sources(root_dir):
+    """
+    Base config path plus {profile name: overlay path}, resolved the same way
+    `_find_overlay_path` resolves a single profile.
+    """
+    profiles = {}
+    for style_dir in (root_dir / "style_profiles", root_dir / "config" / "style_profiles"):
+        if style_dir.is_dir():
+            for path in sorted(style_dir.glob("*.yaml")):
+                profiles.setdefault(path.stem, path)
+    return root_dir / "config" / "model_config.yaml", profiles
+
+
+def list_style_profiles(config_dir=None):
+    """Names of the available style profiles (overlay file stems), sorted."""
+    _, profiles = _profile_sources(_find_root_dir(config_dir))
+    return sorted(profiles)
+
+
+def _projection_sources(root_dir):
+    """{projection name: path} for every `*.yaml` in `config/projections/`."""
+    proj_dir = root_dir / "config" / "projections"
+    return {path.stem: path for path in sorted(proj_dir.glob("*.yaml"))} if proj_dir.is_dir() else {}
+
+
+def list_projections(config_dir=None):
+    """Names of the available projection configs (file stems), sorted."""
+    return sorted(_projection_sources(_find_root_dir(config_dir)))
+
+
+def load_projection_configs(config_dir=None):
+    """
+    Reads and validates every projection config in `config/projections/`.
+    Returns {name (file stem): frozen config}, sorted by name.
+    """
+    configs = {}
+    for name, path in _projection_sources(_find_root_dir(config_dir)).items():
+        config = _read_yaml(path) or {}
+        validate_projection_config(config, name)
+        configs[name] = freeze_config(config)
+    return configs
+
+
+SIZE_CHART_FILENAME = "size_chart.yaml"
+MEASUREMENT_NOISE_FILENAME = "measurement_noise.yaml"
+
+
+def load_size_grading(config_dir=None):
+    """Reads and validates `config/size_chart.yaml` (size order, base size, grades); frozen."""
+    path = _find_root_dir(config_dir) / "config" / SIZE_CHART_FILENAME
+    if not path.exists():
+        raise FileNotFoundError(f"Size grading config not found: {path}")
+    config = _read_yaml(path) or {}
+    validate_size_grading(config)
+    return freeze_config(config)
+
+
+def load_measurement_noise(config_dir=None):
+    """Reads and validates `config/measurement_noise.yaml` (samples, interval, noise per field); frozen."""
+    path = _find_root_dir(config_dir) / "config" / MEASUREMENT_NOISE_FILENAME
+    if not path.exists():
+        raise FileNotFoundError(f"Measurement noise config not found: {path}")
+    config = _read_yaml(path) or {}
+    validate_measurement_noise(config)
+    return freeze_config(config)
+
+
+def profile_source_hash(root_dir):
+    """SHA-256 over the base config and every style profile (names and bytes)."""
+    base_path, profiles = _profile_sources(Path(root_dir))
+    digest = hashlib.sha256()
+    for name, path in [(_BASE_KEY, base_path)] + sorted(profiles.items()):
+        digest.update(name.encode() + b"\0")
+        digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _cached_source_hash(root_dir):
+    """`profile_source_hash`, recomputed only when a source file's stamp (or the file set) changes."""
+    base_path, profiles = _profile_sources(root_dir)
+    stamps = tuple(_file_stamp(path) for path in [base_path] + [profiles[name] for name in sorted(profiles)])
+    key = str(root_dir.resolve())
+    cached = _SOURCE_HASH_CACHE.get(key)
+    if cached is None or cached[0] != stamps:
+        cached = (stamps, profile_source_hash(root_dir))
+        _SOURCE_HASH_CACHE[key] = cached
+    return cached[1]
+
+
+def validate_config(config, name="core"):
+    """
+    Raises ValueError if `config` is not a usable model config.
+    """
+    aspects = config.get("aspects")
+    if not isinstance(aspects, Mapping) or not aspects:
+        raise ValueError(f"Config '{name}': 'aspects' must be a non-empty mapping")
+    total = 0.0
+    for aspect, aspect_cfg in aspects.items():
+        if not isinstance(aspect_cfg, Mapping):
+            raise ValueError(f"Config '{name}': aspect '{aspect}' must be a mapping")
+        for field in ("scorer", "weight", "body_field", "shirt_field"):
+            if field not in aspect_cfg:
+                raise ValueError(f"Config '{name}': aspect '{aspect}' is missing '{field}'")
+        weight = aspect_cfg["weight"]
+        if not isinstance(weight, (int, float)) or weight < 0:
+            raise ValueError(f"Config '{name}': aspect '{aspect}' has invalid weight {weight!r}")
+        total += weight
+    if total <= 0:
+        raise ValueError(f"Config '{name}': aspect weights sum to zero")
+    for aspect, params in (config.get("scoring_params") or {}).items():
+        for key, value in (params or {}).items():
+            if not isinstance(value, (int, float, list)):
+                raise ValueError(
+                    f"Config '{name}': scoring_params.{aspect}.{key} must be numeric, got {value!r}"
+                )
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_projection_config(config, name):
+    """
+    Raises ValueError if `config` is not a usable projection config: numeric
+    `increments` (body fields, inches), an optional `sweep` of one field to a list
+    of extra increments, optional `shirt_shrinkage` fractions in [0, 1) per shirt
+    field, and a `confidence_mod` in (0, 1].
+    """
+    if not isinstance(config, Mapping):
+        raise ValueError(f"Projection '{name}': config must be a mapping")
+    for section in ("increments", "shirt_shrinkage"):
+        values = config.get(section) or {}
+        if not isinstance(values, Mapping):
+            raise ValueError(f"Projection '{name}': '{section}' must be a mapping")
+        for field, value in values.items():
+            if not _is_number(value):
+                raise ValueError(f"Projection '{name}': {section}.{field} must be numeric, got {value!r}")
+            if section == "shirt_shrinkage" and not 0 <= value < 1:
+                raise ValueError(f"Projection '{name}': {section}.{field} must be in [0, 1), got {value!r}")
+    sweep = config.get("sweep")
+    if sweep is not None:
+        if not isinstance(sweep, Mapping) or len(sweep) != 1:
+            raise ValueError(f"Projection '{name}': 'sweep' must map exactly one body field to a list")
+        (field, steps), = sweep.items()
+        if not isinstance(steps, (list, tuple)) or not steps or not all(_is_number(v) for v in steps):
+            raise ValueError(f"Projection '{name}': sweep.{field} must be a non-empty list of numbers")
+    mod = config.get("confidence_mod", 1.0)
+    if not _is_number(mod) or not 0 < mod <= 1:
+        raise ValueError(f"Projection '{name}': 'confidence_mod' must be in (0, 1], got {mod!r}")
+
+
+def validate_size_grading(config, name="size_chart"):
+    """
+    Raises ValueError if `config` is not a usable size grading: a non-empty list of
+    distinct `sizes` (smallest first), a `base_size` among them and numeric `grades`
+    per shirt field.
+    """
+    if not isinstance(config, Mapping):
+        raise ValueError(f"Size grading '{name}': config must be a mapping")
+    sizes = config.get("sizes")
+    if not isinstance(sizes, (list, tuple)) or not sizes or len(set(map(str, sizes))) != len(sizes):
+        raise ValueError(f"Size grading '{name}': 'sizes' must be a non-empty list of distinct labels")
+    base_size = config.get("base_size")
+    if str(base_size) not in map(str, sizes):
+        raise ValueError(f"Size grading '{name}': 'base_size' must be one of the sizes, got {base_size!r}")
+    grades = config.get("grades") or {}
+    if not isinstance(grades, Mapping):
+        raise ValueError(f"Size grading '{name}': 'grades' must be a mapping")
+    for field, value in grades.items():
+        if not _is_number(value):
+            raise ValueError(f"Size grading '{name}': grades.{field} must be numeric, got {value!r}")
+
+
+def validate_measurement_noise(config, name="measurement_noise"):
+    """
+    Raises ValueError if `config` is not a usable noise config: a positive integer
+    `samples`, an `interval` in (0, 1), an integer (or null) `seed` and non-negative
+    standard deviations per field under `body` and `shirt`.
+    """
+    if not isinstance(config, Mapping):
+        raise ValueError(f"Measurement noise '{name}': config must be a mapping")
+    samples = config.get("samples", 1)
+    if not isinstance(samples, int) or isinstance(samples, bool) or samples < 1:
+        raise ValueError(f"Measurement noise '{name}': 'samples' must be a positive integer, got {samples!r}")
+    interval = config.get("interval", 0.9)
+    if not _is_number(interval) or not 0 < interval < 1:
+        raise ValueError(f"Measurement noise '{name}': 'interval' must be in (0, 1), got {interval!r}")
+    seed = config.get("seed")
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+        raise ValueError(f"Measurement noise '{name}': 'seed' must be an integer, got {seed!r}")
+    for section in ("body", "shirt"):
+        values = config.get(section) or {}
+        if not isinstance(values, Mapping):
+            raise ValueError(f"Measurement noise '{name}': '{section}' must be a mapping")
+        for field, value in values.items():
+            if not _is_number(value) or value < 0:
+                raise ValueError(
+                    f"Measurement noise '{name}': {section}.{field} must be a non-negative number, got {value!r}"
+                )
+
+
+def compile_profiles(config_dir=None, out_path=None):
+    """
+    Resolves the base config and every style profile into fully merged, validated
+    configs and writes them to one pickle bundle. Returns the bundle path.
+    """
+    root_dir = _find_root_dir(config_dir)
+    base_path, profiles = _profile_sources(root_dir)
+    source_hash = profile_source_hash(root_dir)
+    base = _read_yaml(base_path)
+    configs = {_BASE_KEY: base}
+    for name, path in profiles.items():
+        configs[name] = merge_style_overlay(base, _read_yaml(path))
+    for name, config in configs.items():
+        validate_config(config, name or "core")
+
+    out_path = Path(out_path) if out_path else _bundle_path(root_dir)
+    tmp_path = out_path.with_suffix(out_path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump(
+            {"format": BUNDLE_FORMAT, "source_hash": source_hash, "configs": configs},
+            f, protocol=pickle.HIGHEST_PROTOCOL,
+        )
+    os.replace(tmp_path, out_path)
+    logger.info(f"Compiled {len(configs) - 1} style profiles into '{out_path}'")
+    return out_path
+
+
+def load_profile_bundle(config_dir=None):
+    """
+    Returns {profile name ("" for core): merged config} from the compiled bundle,
+    or None when there is no bundle or its source hash no longer matches the YAML.
+    """
+    root_dir = _find_root_dir(config_dir)
+    path = _bundle_path(root_dir)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as f:
+            bundle = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError) as e:
+        logger.warning(f"Ignoring unreadable profile bundle '{path}': {e}")
+        return None
+    if bundle.get("format") != BUNDLE_FORMAT or bundle.get("source_hash") != _cached_source_hash(root_dir):
+        logger.info(f"Profile bundle '{path}' is stale; falling back to YAML configs")
+        return None
+    return bundle["configs"]
+
+
+def _bundled_config(root_dir, style_profile):
+    """Merged config for `style_profile` from a fresh bundle, else None."""
+    path = _bundle_path(root_dir)
+    if not path.exists():
+        return None
+    key = str(root_dir.resolve())
+    stamp = (_file_stamp(path), _cached_source_hash(root_dir))
+    cached = _BUNDLE_CACHE.get(key)
+    if cached is None or cached[0] != stamp:
+        cached = (stamp, load_profile_bundle(root_dir))
+        _BUNDLE_CACHE[key] = cached
+    configs = cached[1]
+    if configs is None:
+        return None
+    config = configs.get(style_profile or _BASE_KEY)
+    return copy.deepcopy(config) if config is not None else None
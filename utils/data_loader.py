@@ -5,11 +5,23 @@ Handles flexible formats, robust column cleaning, and automatic weight field det
 """
 
 import logging
-from typing import Dict
+from typing import Dict, Iterable, Iterator, Optional
 import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+# Accepted spellings of the shirt weight column, in order of preference
+WEIGHT_COLUMNS = ["Weight", "WeightOz", "weight", "weightoz"]
+# Shirt measurement columns, always parsed as floats
+MEASUREMENT_COLUMNS = [
+    "ChestWidth", "ShoulderWidth", "BodyLength", "SleeveLength", "SleeveOpening", "NeckOpening", "HemWidth",
+]
+# Short label columns, parsed as categoricals
+CATEGORY_COLUMNS = ["Brand", "Primary Color", "Tag Size", "Size", "Evaluation", "Keep / Sell / Tailor"]
+# Cell text read_csv treats as missing by default
+_NA_STRINGS = {"", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+               "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"}
+
 
 def load_body_measurements(path: str) -> Dict[str, float]:
     """
@@ -18,9 +30,17 @@ def load_body_measurements(path: str) -> Dict[str, float]:
       1. 'Measurement', 'Value' columns (vertical)
       2. Single-row key-value mapping (horizontal)
     Returns a dictionary mapping measurement names to float values.
+    In the vertical format only the two used columns are parsed (notes are skipped).
     """
     try:
-        df = pd.read_csv(path)
+        header = [col.strip() for col in pd.read_csv(path, nrows=0).columns]
+        usecols = None
+        if "Measurement" in header and "Value" in header:
+
+            def usecols(col):
+                return col.strip() in ("Measurement", "Value")
+
+        df = pd.read_csv(path, usecols=usecols)
         if df.empty:
             logger.warning(f"Body measurements file '{path}' is empty.")
             return {}
@@ -37,35 +57,162 @@ def load_body_measurements(path: str) -> Dict[str, float]:
         return {}
 
 
-def load_shirt_data(path: str) -> pd.DataFrame:
+def load_shirt_data(
+    path: str,
+    columns: Optional[Iterable[str]] = None,
+    float_dtype: str = "float64",
+    engine: Optional[str] = None,
+) -> pd.DataFrame:
     """
     Loads shirt data from a CSV file, normalizing weight and column names.
     Adds a 'Weight' column if needed, using 'WeightOz' or 'weight' if present.
-    Returns a pandas DataFrame.
+
+    Columns are typed from a schema instead of inferred: measurement columns (the
+    known shirt measurements, any weight spelling and everything in `columns`) are
+    parsed as `float_dtype`, and short label columns (brand, color, size) as
+    categoricals. With `columns` (e.g. `model.shirt_fields`), only those columns plus
+    'ShirtName' and the weight column are parsed; other columns are never read.
+
+    `float_dtype="float32"` halves measurement memory but is opt-in only: a float32
+    value can land on the other side of a threshold (float32(4.2) < 4.2), which
+    changes buckets. `engine="pyarrow"` uses the optional pyarrow CSV reader.
+
+    Returns a pandas DataFrame (empty, with a warning, for an empty file).
+    Raises ValueError naming the file, line and column for a value that is not a
+    number, or for rows with the wrong number of fields (the C reader only notices
+    those when every column is parsed).
     """
     try:
-        df = pd.read_csv(path)
-        if df.empty:
-            logger.warning(f"Shirt data file '{path}' is empty.")
-            return pd.DataFrame()
-        # Clean column names
-        df.columns = [col.strip() for col in df.columns]
+        df = _read_shirt_csv(path, columns, float_dtype, engine)
+    except pd.errors.EmptyDataError:
+        df = pd.DataFrame()
+    if df.empty:
+        logger.warning(f"Shirt data file '{path}' is empty.")
+        return pd.DataFrame()
+    return _normalize_shirt_columns(df, float_dtype)
 
-        # Normalize 'Weight' column (auto-detect various possible names)
-        weight_col = None
-        for candidate in ["Weight", "WeightOz", "weight", "weightoz"]:
-            if candidate in df.columns:
-                weight_col = candidate
-                break
-        if weight_col and weight_col != "Weight":
-            df["Weight"] = df[weight_col].astype(float)
-        elif "Weight" in df.columns:
-            df["Weight"] = df["Weight"].astype(float)
-        else:
-            # No weight column, add as NaN for consistency
-            df["Weight"] = float("nan")
 
-        return df
-    except Exception as e:
-        logger.error(f"Failed to load shirt data from '{path}': {e}")
-        return pd.DataFrame()
+def _normalize_shirt_columns(df: pd.DataFrame, float_dtype: str = "float64") -> pd.DataFrame:
+    # Clean column names
+    df.columns = [col.strip() for col in df.columns]
+
+    # Normalize 'Weight' column (auto-detect various possible names)
+    weight_col = None
+    for candidate in WEIGHT_COLUMNS:
+        if candidate in df.columns:
+            weight_col = candidate
+            break
+    if weight_col and weight_col != "Weight":
+        df["Weight"] = df[weight_col].astype(float_dtype)
+    elif "Weight" in df.columns:
+        df["Weight"] = df["Weight"].astype(float_dtype)
+    else:
+        # No weight column, add as NaN for consistency
+        df["Weight"] = pd.Series(float("nan"), index=df.index, dtype=float_dtype)
+
+    return df
+
+
+def _shirt_schema(path: str, columns: Optional[Iterable[str]], float_dtype: str):
+    """(usecols, dtype) keyed by the file's raw header names, matched after stripping."""
+    header = list(pd.read_csv(path, nrows=0).columns)
+    numeric = set(MEASUREMENT_COLUMNS) | set(WEIGHT_COLUMNS) | set(columns or ())
+    wanted = None if columns is None else set(columns) | {"ShirtName"} | set(WEIGHT_COLUMNS)
+    usecols, dtype = [], {}
+    for raw in header:
+        name = raw.strip()
+        if wanted is not None and name not in wanted:
+            continue
+        usecols.append(raw)
+        if name in numeric:
+            dtype[raw] = float_dtype
+        elif name in CATEGORY_COLUMNS:
+            dtype[raw] = "category"
+    # Without a column list every field is parsed, so ragged rows are reported
+    return (usecols if wanted is not None else None), dtype
+
+
+def _read_shirt_csv(path, columns, float_dtype, engine=None, chunksize=None):
+    usecols, dtype = _shirt_schema(path, columns, float_dtype)
+    if engine == "pyarrow":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "engine='pyarrow' requires the optional 'pyarrow' package (pip install pyarrow)"
+            ) from e
+    try:
+        return pd.read_csv(path, usecols=usecols, dtype=dtype, engine=engine, chunksize=chunksize)
+    except (ValueError, pd.errors.ParserError) as e:
+        raise _malformed_error(path, usecols, dtype, e) from e
+
+
+def _malformed_error(path, usecols, dtype, error):
+    """ValueError pointing at the first bad value, or wrapping the parser's message."""
+    if isinstance(error, pd.errors.ParserError):
+        return ValueError(f"Malformed shirt data in '{path}': {error}")
+    numeric = [col for col, kind in dtype.items() if kind != "category"]
+    try:
+        raw = pd.read_csv(path, usecols=usecols, dtype=str, keep_default_na=False)
+    except (ValueError, pd.errors.ParserError) as e:
+        return ValueError(f"Malformed shirt data in '{path}': {e}")
+    for col in numeric:
+        text = raw[col].str.strip()
+        parsed = pd.to_numeric(text, errors="coerce")
+        bad = parsed.isna() & ~text.isin(_NA_STRINGS)
+        if bad.any():
+            row = int(bad.to_numpy().argmax())
+            # +2: header line, 1-based line numbers
+            return ValueError(
+                f"Malformed shirt data in '{path}' line {row + 2}, column '{col.strip()}': "
+                f"expected a number, got {raw[col].iloc[row]!r}"
+            )
+    return ValueError(f"Malformed shirt data in '{path}': {error}")
+
+
+def iter_shirt_chunks(
+    path: str, chunksize: int, columns: Optional[Iterable[str]] = None, float_dtype: str = "float64"
+) -> Iterator[pd.DataFrame]:
+    """
+    Streams shirt data from a CSV file in DataFrames of at most `chunksize` rows,
+    typed and normalized like `load_shirt_data`.
+    If `columns` is given, only those columns (plus 'ShirtName' and any weight
+    column) are parsed; other columns are skipped by the CSV reader.
+    The row index continues across chunks, as if the file had been read at once.
+    """
+    usecols, dtype = _shirt_schema(path, columns, float_dtype)
+    chunks = _read_shirt_csv(path, columns, float_dtype, chunksize=chunksize)
+    while True:
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        except (ValueError, pd.errors.ParserError) as e:
+            raise _malformed_error(path, usecols, dtype, e) from e
+        yield _normalize_shirt_columns(chunk, float_dtype)
+
+
+def load_body_table(path: str) -> pd.DataFrame:
+    """
+    Loads many body profiles from a CSV file, one row per body.
+    Supports two formats:
+      1. Wide: one row per body, measurement columns plus an optional 'BodyId'
+      2. Long: 'BodyId', 'Measurement', 'Value' columns
+    Returns a DataFrame with a 'BodyId' column (row number if none was given).
+    """
+    df = pd.read_csv(path)
+    df.columns = [col.strip() for col in df.columns]
+    if df.empty:
+        logger.warning(f"Body table '{path}' is empty.")
+        return pd.DataFrame(columns=["BodyId"])
+
+    if {"BodyId", "Measurement", "Value"} <= set(df.columns):
+        df = df.pivot_table(index="BodyId", columns="Measurement", values="Value", aggfunc="first", sort=False)
+        df.columns.name = None
+        df = df.reset_index()
+    elif "BodyId" not in df.columns:
+        df.insert(0, "BodyId", range(len(df)))
+
+    measurement_cols = [col for col in df.columns if col != "BodyId"]
+    df[measurement_cols] = df[measurement_cols].apply(pd.to_numeric, errors="coerce")
+    return df.reset_index(drop=True)
@@ -0,0 +1,134 @@
+# utils/fingerprint.py
+"""
+Content fingerprints for incremental evaluation.
+
+- `row_fingerprints(df, columns)` gives one uint64 per row over the listed
+  columns (pandas' row hash), so a row keeps its fingerprint until one of those
+  values changes.
+- `model_fingerprint(model)` hashes everything a CompiledFitModel scores with:
+  aspects, fields, weights, params, adjustments and projection config.
+- `digest(*parts)` hashes any mix of configs, models, projections, bodies and flags.
+
+`load_run_state` / `save_run_state` keep a sidecar next to a results file with the
+run hash and the fingerprints of the rows it holds. The stored size and mtime of
+the results file make a sidecar left behind by a non-incremental overwrite count
+as stale.
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import math
+import os
+import pickle
+from collections.abc import Mapping
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Bump when scoring code changes its output, so saved results are not reused
+SCORING_VERSION = 1
+STATE_FORMAT = 1
+STATE_SUFFIX = ".state"
+
+
+def _plain(value):
+    """JSON-ready form of configs, frozen mappings, dataclasses and numpy scalars."""
+    if isinstance(value, Mapping):
+        return {str(k): _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {f.name: _plain(getattr(value, f.name)) for f in dataclasses.fields(value)}
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return "nan"
+    return value
+
+
+def digest(*parts):
+    """SHA-256 hex digest over `parts` (anything `_plain` understands)."""
+    text = json.dumps([SCORING_VERSION, *(_plain(p) for p in parts)], sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def model_fingerprint(model):
+    """Digest of the scoring-relevant content of a CompiledFitModel (not its callables)."""
+    return digest({
+        "name": model.name,
+        "aspects": [
+            {
+                "name": spec.name,
+                "scorer": spec.scorer_name,
+                "body_field": spec.body_field,
+                "shirt_field": spec.shirt_field,
+                "weight": spec.weight,
+                "needs_chest": spec.needs_chest,
+                "inputs": spec.inputs,
+                "params": spec.params,
+            }
+            for spec in model.aspects
+        ],
+        "scoring_params": model.scoring_params,
+        "interaction_adjustments": model.interaction_adjustments,
+        "projection_config": model.projection_config,
+    })
+
+
+def row_fingerprints(df, columns, index=False):
+    """
+    uint64 fingerprint per row of `df` over `columns` (those present), in row order.
+    With `index=True` the row label is part of the fingerprint.
+    """
+    cols = [col for col in columns if col in df.columns]
+    return pd.util.hash_pandas_object(df[cols], index=index).to_numpy(dtype=np.uint64)
+
+
+def state_path(out_path):
+    return f"{out_path}{STATE_SUFFIX}"
+
+
+def _output_stamp(out_path):
+    st = os.stat(out_path)
+    return st.st_size, st.st_mtime_ns
+
+
+def load_run_state(out_path, run_hash):
+    """
+    The state saved with `out_path` by `save_run_state`, or None when there is none,
+    it is unreadable, it was saved for another run hash or the results file changed since.
+    """
+    path = state_path(out_path)
+    if not (os.path.exists(path) and os.path.exists(out_path)):
+        return None
+    try:
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError) as e:
+        logger.warning(f"Ignoring unreadable run state '{path}': {e}")
+        return None
+    if state.get("format") != STATE_FORMAT or state.get("output_stamp") != _output_stamp(out_path):
+        logger.info(f"Run state '{path}' does not match '{out_path}'; rescoring everything")
+        return None
+    if state.get("run_hash") != run_hash:
+        logger.info("Config, body or options changed since the last run; rescoring everything")
+        return None
+    return state
+
+
+def save_run_state(out_path, run_hash, fingerprints, **extra):
+    """Records `fingerprints` (one per results row or group, in file order) for `out_path`."""
+    state = {
+        "format": STATE_FORMAT,
+        "run_hash": run_hash,
+        "fingerprints": np.asarray(fingerprints, dtype=np.uint64),
+        "output_stamp": _output_stamp(out_path),
+        **extra,
+    }
+    tmp = state_path(out_path) + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, state_path(out_path))
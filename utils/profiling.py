@@ -0,0 +1,160 @@
+# utils/profiling.py
+"""
+Opt-in instrumentation for the evaluation pipeline.
+
+A `PipelineProfiler` records, per stage (CSV parsing, config loading, each
+scoring scenario, sorting, writing, ...), the wall time, row count, rows/sec and
+the process peak RSS when the stage ended. Models passed through `instrument()`
+also count calls, rows and cumulative time of every aspect scorer, attributed
+to the stage that was running. `report()` returns it all as a JSON-ready dict;
+with `cprofile=True` the run is also recorded by cProfile for `dump_stats()`.
+
+Code paths take an optional profiler and use `stage(profiler, name)`, which is
+a no-op when profiling is off.
+"""
+
+import cProfile
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import replace
+
+# Environment variable naming a report path; turns profiling on like --profile
+PROFILE_ENV_VAR = "FIT_PROFILE"
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MiB, or None where unsupported."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def stage(profiler, name, rows=None):
+    """`profiler.stage(name, rows)`, or a no-op context when `profiler` is None."""
+    return profiler.stage(name, rows) if profiler is not None else nullcontext({})
+
+
+class PipelineProfiler:
+    """Collects per-stage timings and per-aspect scorer counters for one run."""
+
+    def __init__(self, cprofile=False):
+        self.stages = []
+        self.aspects = {}
+        self._wrappers = {}
+        self._active = []
+        self._cprofile = cProfile.Profile() if cprofile else None
+        self._started = None
+        self._elapsed = None
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        if self._cprofile is not None:
+            self._cprofile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        self._elapsed = time.perf_counter() - self._started
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Times the enclosed block as stage `name`. Yields the stage record; set
+        `record["rows"]` inside the block when the count is only known there.
+        Nested stages are listed in start order with their depth.
+        """
+        record = {"stage": name, "depth": len(self._active), "rows": rows}
+        self.stages.append(record)
+        self._active.append(name)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - start
+            self._active.pop()
+            record["seconds"] = seconds
+            rows = record["rows"]
+            record["rows_per_s"] = rows / seconds if rows and seconds > 0 else None
+            record["peak_rss_mb"] = peak_rss_mb()
+
+    def instrument(self, model):
+        """
+        Copy of a CompiledFitModel whose aspect scorers (scalar and batch) report
+        calls, rows scored and time to this profiler. A scorer shared by several
+        models gets one wrapper, so `SharedPass` still reuses identical aspects.
+        """
+        aspects = tuple(
+            replace(
+                spec,
+                scorer=self._timed(spec.name, spec.scorer, batch=False),
+                batch_scorer=self._timed(spec.name, spec.batch_scorer, batch=True),
+            )
+            for spec in model.aspects
+        )
+        instrumented = replace(model, aspects=aspects)
+        # The no-data tables come from probing the batch scorers; that is not a call to report
+        instrumented.__dict__["no_data_tables"] = model.no_data_tables
+        return instrumented
+
+    def _timed(self, aspect, func, batch):
+        key = (aspect, func, batch)
+        if key not in self._wrappers:
+            self._wrappers[key] = self._wrap(aspect, func, batch)
+        return self._wrappers[key]
+
+    def _wrap(self, aspect, func, batch):
+        def timed(*args):
+            start = time.perf_counter()
+            result = func(*args)
+            seconds = time.perf_counter() - start
+            stage_name = self._active[-1] if self._active else None
+            counters = self.aspects.setdefault(stage_name, {}).setdefault(
+                aspect, {"calls": 0, "rows": 0, "seconds": 0.0}
+            )
+            counters["calls"] += 1
+            counters["rows"] += int(result[0].size) if batch else 1
+            counters["seconds"] += seconds
+            return result
+
+        return timed
+
+    def report(self):
+        total = self._elapsed
+        if total is None and self._started is not None:
+            total = time.perf_counter() - self._started
+        return {
+            "total_s": total,
+            "peak_rss_mb": peak_rss_mb(),
+            "stages": self.stages,
+            "aspects": {str(name): counters for name, counters in self.aspects.items()},
+        }
+
+    def write_report(self, path):
+        os.makedirs(os.path.dirname(str(path)) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+            f.write("\n")
+
+    def dump_stats(self, path):
+        """Writes the cProfile data (pstats format); needs `cprofile=True`."""
+        if self._cprofile is None:
+            raise ValueError("cProfile was not enabled; create the profiler with cprofile=True")
+        self._cprofile.dump_stats(path)
+
+    def summary_lines(self):
+        lines = []
+        for record in self.stages:
+            rate = f", {record['rows_per_s']:,.0f} rows/s" if record.get("rows_per_s") else ""
+            rows = f", {record['rows']:,} rows" if record.get("rows") is not None else ""
+            lines.append(
+                f"{'  ' * record['depth']}{record['stage']}: {record.get('seconds', 0.0):.3f}s{rows}{rate}"
+            )
+        return lines
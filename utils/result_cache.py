@@ -0,0 +1,263 @@
+# utils/result_cache.py
+"""
+Persistent on-disk cache of fit results, shared across runs and processes.
+
+Entries live in one SQLite file, keyed by (scope, item):
+
+- `scope` hashes everything a result depends on besides the shirt: the compiled
+  model fingerprints, projections, output options and the body measurements
+  (see `ResultCache.scope`);
+- `item` is a shirt fingerprint (`utils.fingerprint.row_fingerprints` over the
+  measured fields, as a signed 64-bit integer via `fingerprint_items`).
+
+Only whole-catalog lookups (`score_shirts`) pay off: a SQLite round trip costs
+more than scoring one row, which per-row callers cache in a `ScoreMemo`.
+
+The cache holds at most `max_entries` rows; each write evicts the least recently
+used rows beyond that. `stats` reports this process's hits, misses, writes and
+evictions; `totals()` the counters accumulated in the file by every process.
+Lookups only write when a hit needs its last-used time refreshed; hit and miss
+counts are kept in memory and added to the file with the next write, `totals()`
+or `close()`.
+
+Several processes may share one file: the database runs in WAL mode (readers
+never block the writer), writes take the write lock up front and wait up to
+`timeout` seconds for it. A `ResultCache` can be pickled into worker processes;
+each process (and fork) opens its own connection.
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import numpy as np
+from utils.fingerprint import digest
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1_000_000
+DEFAULT_TIMEOUT = 30.0
+# Hits refresh an entry's last-used time at most this often (seconds), so warm
+# reads rarely write; eviction order is least recently used at this granularity
+DEFAULT_TOUCH_INTERVAL = 60.0
+# Host parameters per IN (...) query; stays under SQLite's default limit
+_BATCH = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    scope TEXT NOT NULL,
+    item INTEGER NOT NULL,
+    value BLOB NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (scope, item)
+);
+CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0), ('writes', 0), ('evictions', 0);
+"""
+
+
+def fingerprint_items(fingerprints):
+    """uint64 row fingerprints as the signed 64-bit item keys SQLite stores."""
+    return np.asarray(fingerprints, dtype=np.uint64).view(np.int64).tolist()
+
+
+class ResultCache:
+    """Size-bounded SQLite cache of pickled results with hit/miss/eviction counters."""
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, timeout=DEFAULT_TIMEOUT,
+                 touch_interval=DEFAULT_TOUCH_INTERVAL):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be at least 1, got {max_entries}")
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.touch_interval = touch_interval
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._pending = {"hits": 0, "misses": 0}  # not yet added to the file's counters
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection()
+
+    def __getstate__(self):
+        return {"path": self.path, "max_entries": self.max_entries, "timeout": self.timeout,
+                "touch_interval": self.touch_interval}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _connection(self):
+        # A forked child must not reuse its parent's connection
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            if conn.execute("SELECT 1 FROM counters WHERE name = 'entries'").fetchone() is None:
+                # Files from before the entry count was kept: count once
+                self._write(conn, lambda c: c.execute(
+                    "INSERT OR IGNORE INTO counters SELECT 'entries', COUNT(*) FROM entries"
+                ))
+            if self._pid is not None:
+                # Counts pending in the parent are the parent's to flush
+                self._pending = {"hits": 0, "misses": 0}
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def scope(self, *parts):
+        """Scope key: a digest of `parts` (model fingerprints, body, options; see `digest`)."""
+        return digest("result_cache", *parts)
+
+    def get_many(self, scope, items):
+        """
+        {item: value} for the cached ones among `items` (see `fingerprint_items`);
+        found entries become the most recently used.
+        """
+        unique = list(dict.fromkeys(items))
+        found, stale = {}, []
+        cutoff = time.time() - self.touch_interval
+        with self._lock:
+            conn = self._connection()
+            for start in range(0, len(unique), _BATCH):
+                batch = unique[start:start + _BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT item, value, used FROM entries WHERE scope = ? AND item IN ({marks})", [scope, *batch]
+                ).fetchall()
+                for item, value, used in rows:
+                    found[item] = pickle.loads(value)
+                    if used <= cutoff:
+                        stale.append(item)
+            hits, misses = len(found), len(unique) - len(found)
+            self.hits += hits
+            self.misses += misses
+            self._pending["hits"] += hits
+            self._pending["misses"] += misses
+            if stale:
+                self._write(conn, self._touch, scope, stale)
+        return found
+
+    def put_many(self, scope, entries):
+        """Stores {item: value}, then evicts the least recently used rows over `max_entries`."""
+        if not entries:
+            return
+        rows = [(item, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)) for item, value in entries.items()]
+        with self._lock:
+            self._write(self._connection(), self._insert, scope, rows)
+
+    def get(self, scope, item):
+        """Cached value for one item, or None."""
+        return self.get_many(scope, [item]).get(item)
+
+    def put(self, scope, item, value):
+        self.put_many(scope, {item: value})
+
+    def _write(self, conn, body, *args):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            body(conn, *args)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _touch(self, conn, scope, items):
+        now = time.time()
+        conn.executemany("UPDATE entries SET used = ? WHERE scope = ? AND item = ?",
+                         [(now, scope, item) for item in items])
+        self._flush_counts(conn)
+
+    def _flush_counts(self, conn):
+        """Adds the pending hit/miss counts to the file's counters (inside a write)."""
+        if any(self._pending.values()):
+            conn.executemany("UPDATE counters SET value = value + ? WHERE name = ?",
+                             [(count, name) for name, count in self._pending.items()])
+            self._pending = {"hits": 0, "misses": 0}
+
+    def _insert(self, conn, scope, rows):
+        now = time.time()
+        # Replaced rows do not grow the cache; the entry count is kept in `counters`
+        replaced = 0
+        for start in range(0, len(rows), _BATCH):
+            batch = [item for item, _ in rows[start:start + _BATCH]]
+            replaced += conn.execute(
+                f"SELECT COUNT(*) FROM entries WHERE scope = ? AND item IN ({','.join('?' * len(batch))})",
+                [scope, *batch],
+            ).fetchone()[0]
+        conn.executemany(
+            "INSERT OR REPLACE INTO entries (scope, item, value, used) VALUES (?, ?, ?, ?)",
+            [(scope, item, value, now) for item, value in rows],
+        )
+        conn.execute("UPDATE counters SET value = value + ? WHERE name = 'entries'", (len(rows) - replaced,))
+        size = conn.execute("SELECT value FROM counters WHERE name = 'entries'").fetchone()[0]
+        evicted = 0
+        if size > self.max_entries:
+            evicted = conn.execute(
+                "DELETE FROM entries WHERE (scope, item) IN "
+                "(SELECT scope, item FROM entries ORDER BY used LIMIT ?)", (size - self.max_entries,)
+            ).rowcount
+        self.writes += len(rows)
+        self.evictions += evicted
+        conn.executemany("UPDATE counters SET value = value + ? WHERE name = ?",
+                         [(len(rows), "writes"), (evicted, "evictions"), (-evicted, "entries")])
+        self._flush_counts(conn)
+
+    def __len__(self):
+        with self._lock:
+            return self._connection().execute("SELECT value FROM counters WHERE name = 'entries'").fetchone()[0]
+
+    def totals(self):
+        """Counters accumulated in the cache file by every process that used it."""
+        with self._lock:
+            conn = self._connection()
+            if any(self._pending.values()):
+                self._write(conn, self._flush_counts)
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        lookups = counters["hits"] + counters["misses"]
+        counters["hit_rate"] = counters["hits"] / lookups if lookups else 0.0
+        return counters
+
+    def clear(self):
+        """Drops every entry; counters are kept."""
+        with self._lock:
+            self._write(self._connection(), self._clear)
+
+    def _clear(self, conn):
+        conn.execute("DELETE FROM entries")
+        conn.execute("UPDATE counters SET value = 0 WHERE name = 'entries'")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                if any(self._pending.values()):
+                    self._write(self._conn, self._flush_counts)
+                self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "size": len(self),
+            "max_entries": self.max_entries,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
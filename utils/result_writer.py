@@ -0,0 +1,196 @@
+# utils/result_writer.py
+"""
+Writers for fit results, chosen from the output file extension.
+
+CSV keeps the historical layout (plain columns, "; "-joined tag strings).
+Parquet and Feather store a compact columnar form: scores, confidences and
+ranks as small nullable integers and tag / profile columns as dictionary-encoded
+categoricals. Both need the optional `pyarrow` package.
+
+`read_results` loads a results file back into the value types the pipeline
+produces, so previously written rows can be merged with new ones (incremental
+runs) and written again unchanged.
+"""
+
+import logging
+import os
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+}
+
+# Column-name suffixes -> compact dtype in columnar output
+_SCORE_SUFFIXES = ("FitScore", "Confidence")  # 0-100, "" when unscored
+_CATEGORY_SUFFIXES = ("Tags", "StyleProfile")
+
+
+def output_format(path):
+    """Returns 'csv', 'parquet' or 'feather' for `path`; unknown extensions write CSV."""
+    ext = os.path.splitext(str(path))[1].lower()
+    return OUTPUT_FORMATS.get(ext, "csv")
+
+
+def _require_pyarrow(fmt):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            f"Writing {fmt} output requires the optional 'pyarrow' package "
+            f"(pip install pyarrow), or use a .csv output path."
+        ) from e
+
+
+def to_columnar(df):
+    """
+    Converts a results frame to compact dtypes for columnar output:
+    scores/confidences -> UInt8 (missing scores become <NA>), Rank -> UInt32,
+    tag strings and StyleProfile -> category. Other columns are left as is.
+    """
+    out = df.copy()
+    for col in out.columns:
+        if col.endswith(_SCORE_SUFFIXES):
+            out[col] = pd.to_numeric(out[col], errors="coerce").astype("UInt8")
+        elif col == "Rank":
+            out[col] = out[col].astype("UInt32")
+        elif col.endswith(_CATEGORY_SUFFIXES):
+            out[col] = out[col].astype("category")
+    return out.reset_index(drop=True)
+
+
+def _arrow_table(df):
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(to_columnar(df), preserve_index=False)
+    # Fixed-width dictionary indices so chunks with different tag sets share a schema
+    fields = [
+        pa.field(f.name, pa.dictionary(pa.int32(), f.type.value_type))
+        if pa.types.is_dictionary(f.type) else f
+        for f in table.schema
+    ]
+    return table.cast(pa.schema(fields))
+
+
+def write_results(df, path):
+    """
+    Writes a results frame to `path` in the format given by its extension.
+
+    Returns:
+        str: The format written ('csv', 'parquet' or 'feather').
+    """
+    fmt = output_format(path)
+    os.makedirs(os.path.dirname(str(path)) or ".", exist_ok=True)
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+        return fmt
+
+    _require_pyarrow(fmt)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(_arrow_table(df), path)
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(_arrow_table(df), path)
+    return fmt
+
+
+def _restore_scores(values):
+    # "" / <NA> stays "", everything else becomes the int it was written from
+    numbers = pd.to_numeric(values, errors="coerce")
+    return pd.Series(numbers, dtype="Int64").astype(object).where(numbers.notna(), "")
+
+
+def read_results(path):
+    """
+    Reads a results file written by `write_results` back as object columns holding
+    what the pipeline produced: scores and confidences as int ("" when unscored),
+    Rank as int, text columns as str, BodyId numeric when every value is.
+    """
+    fmt = output_format(path)
+    if fmt == "csv":
+        try:
+            import pyarrow  # noqa: F401
+            engine = "pyarrow"  # same strings, a few times faster on wide rationale text
+        except ImportError:
+            engine = "c"
+        df = pd.read_csv(path, dtype=str, keep_default_na=False, engine=engine)
+    else:
+        _require_pyarrow(fmt)
+        df = pd.read_parquet(path) if fmt == "parquet" else pd.read_feather(path)
+    out = pd.DataFrame(index=df.index)
+    for col in df.columns:
+        if col.endswith(_SCORE_SUFFIXES):
+            out[col] = _restore_scores(df[col])
+        elif col == "Rank":
+            out[col] = pd.Series([int(v) for v in df[col].tolist()], index=df.index, dtype=object)
+        elif col == "BodyId":
+            try:
+                out[col] = pd.to_numeric(df[col])
+            except (ValueError, TypeError):
+                out[col] = df[col].astype(object)
+        else:
+            out[col] = df[col].astype(object)
+    return out
+
+
+class ResultWriter:
+    """
+    Appends result frames to `path` chunk by chunk (CSV or Parquet).
+
+    Feather files cannot be appended to, so they are only available through
+    `write_results`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.format = output_format(path)
+        if self.format == "feather":
+            raise ValueError(
+                f"Cannot stream results to '{path}': Feather output is written in one go; "
+                f"use a .parquet or .csv path"
+            )
+        if self.format == "parquet":
+            _require_pyarrow(self.format)
+        os.makedirs(os.path.dirname(str(path)) or ".", exist_ok=True)
+        self.rows = 0
+        self._csv = None
+        self._parquet = None
+        self._schema = None
+
+    def write(self, df):
+        if self.format == "csv":
+            if self._csv is None:
+                self._csv = open(self.path, "w", newline="")
+                df.to_csv(self._csv, index=False)
+            else:
+                df.to_csv(self._csv, header=False, index=False)
+        else:
+            table = _arrow_table(df)
+            if self._parquet is None:
+                import pyarrow.parquet as pq
+                self._schema = table.schema
+                self._parquet = pq.ParquetWriter(self.path, self._schema)
+            self._parquet.write_table(table.cast(self._schema))
+        self.rows += len(df)
+
+    def close(self):
+        if self._csv is not None:
+            self._csv.close()
+        elif self._parquet is not None:
+            self._parquet.close()
+        elif self.format == "csv":
+            open(self.path, "w").close()
+        else:
+            logger.warning(f"No results to write; '{self.path}' was not created.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()